@@ -0,0 +1,131 @@
+"""
+Bulk analysis of game records.
+
+Replays every game of one or more record files and scores each move of
+each position with the Hard AI search, spreading the games over worker
+processes. Positions shared by several games, or mirror images of each
+other, are only searched once per worker.
+
+Usage:
+    python analyze.py game_records.txt --depth 4 --workers 8 --output analysis.jsonl
+"""
+
+import argparse
+import json
+import time
+from multiprocessing import Pool, cpu_count
+
+from src.functions import canonical_key, get_available_columns, mirror_column
+from src.records import read_records, replay
+from src.search import MinimaxSearch
+
+# Search state of a worker process per geometry, kept between games
+_searches = {}
+_scores_cache = {}
+_cache_hits = 0
+
+
+def score_position(board, player, depth, geometry):
+    """
+    Score every valid move of a position.
+
+    Results are cached on the mirror-canonical board, so a position and
+    its mirror image share one search.
+
+    Returns:
+        Dict column -> score for the player
+    """
+    global _cache_hits
+    key, mirrored = canonical_key(board)
+    key = (key, player, geometry)
+
+    scores = _scores_cache.get(key)
+    if scores is None:
+        if geometry not in _searches:
+            _searches[geometry] = MinimaxSearch(geometry=geometry)
+        search = _searches[geometry]
+        scores = {
+            column: search.score_move(board, player, column, depth)
+            for column in get_available_columns(board, geometry)
+        }
+        # Store in the canonical orientation
+        if mirrored:
+            scores = {mirror_column(column, geometry): score for column, score in scores.items()}
+        _scores_cache[key] = scores
+    else:
+        _cache_hits += 1
+
+    if mirrored:
+        scores = {mirror_column(column, geometry): score for column, score in scores.items()}
+    return scores
+
+
+def analyze_game(args):
+    """
+    Annotate every position of a game (worker entry point).
+
+    Args:
+        args: Tuple of (GameRecord, search depth)
+
+    Returns:
+        Tuple of (annotated game dict, positions analyzed, cache hits)
+    """
+    record, depth = args
+    hits_before = _cache_hits
+
+    annotations = []
+    geometry = record.geometry
+    for board, player, column in replay(record.moves, geometry):
+        scores = score_position(board, player, depth, geometry)
+        best_column = max(scores, key=scores.get)
+        annotations.append({
+            "played": column + 1,
+            "score": scores[column],
+            "best": best_column + 1,
+            "best_score": scores[best_column],
+        })
+
+    game = {
+        "moves": record.move_string,
+        "result": record.result,
+        "metadata": record.metadata,
+        "annotations": annotations,
+    }
+    return game, len(annotations), _cache_hits - hits_before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Annotate game records with engine scores")
+    parser.add_argument("records", nargs="+", help="Game record files")
+    parser.add_argument("--depth", type=int, default=4, help="Search depth per move")
+    parser.add_argument("--workers", type=int, default=cpu_count(), help="Worker processes")
+    parser.add_argument("--output", default="analysis.jsonl", help="Annotated games (JSON lines)")
+    args = parser.parse_args()
+
+    tasks = [(record, args.depth) for path in args.records for record in read_records(path)]
+    print(f"Analyzing {len(tasks)} games at depth {args.depth} with {args.workers} workers...")
+
+    start_time = time.time()
+    positions, hits = 0, 0
+    pool = Pool(args.workers) if args.workers > 1 else None
+    try:
+        results = pool.imap(analyze_game, tasks, chunksize=16) if pool else map(analyze_game, tasks)
+        with open(args.output, "w") as output:
+            for game, game_positions, game_hits in results:
+                output.write(json.dumps(game) + "\n")
+                positions += game_positions
+                hits += game_hits
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    elapsed = time.time() - start_time
+    print(f"Positions analyzed: {positions}")
+    print(f"Cache hits: {hits} ({100 * hits / max(positions, 1):.1f}%)")
+    print(f"Time: {elapsed:.2f}s ({positions / max(elapsed, 1e-9):.0f} positions/second)")
+    print(f"Annotations written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
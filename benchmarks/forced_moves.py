@@ -0,0 +1,112 @@
+"""
+Benchmark the forced-move detector.
+
+Plays seeded Hard AI vs Easy AI games twice, with the Hard AI's
+forced-move shortcut on and off, and reports how many moves each AI
+resolved without searching, the Hard AI's thinking time both ways and
+whether every game was played the same. Then times the detector against
+the scan it replaced (a board copy per column and player and a win
+check on each) over every position of those games.
+
+Usage:
+    python -m benchmarks.forced_moves [--games 50] [--depth 4] [--seed 0]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from montecarlo import play_game
+from src.forced_moves import find_forced_moves
+from src.functions import check_win, drop_token, get_available_columns
+from src.players.easy_ai import EasyAI
+from src.players.hard_ai import HardAI
+from src.search import drop_row
+
+
+def copy_scan(board, player):
+    """Wins and blocks found the way EasyAI used to: copies and win checks."""
+    board_copy = np.copy(board)
+    wins, blocks = [], []
+    for column in get_available_columns(board_copy):
+        if check_win(drop_token(board_copy, column, player), column, player):
+            wins.append(column)
+        opponent = 3 - player
+        if check_win(drop_token(board_copy, column, opponent), column, opponent):
+            blocks.append(column)
+    return wins, blocks
+
+
+def play_games(games, depth, seed, forced):
+    """
+    Play the benchmark games.
+
+    Returns:
+        Tuple of (move lists, Hard AI seconds, (played, forced) per AI)
+    """
+    random.seed(seed)
+    hard_ai = HardAI(depth=depth, forced=forced)
+    easy_ai = EasyAI()
+    all_moves, seconds = [], 0.0
+    for game in range(games):
+        moves, times = [], []
+        # Alternate colours so the Hard AI also has to defend
+        if game % 2 == 0:
+            play_game(hard_ai, easy_ai, moves=moves, times=times)
+        else:
+            play_game(easy_ai, hard_ai, moves=moves, times=times)
+        seconds += sum(times[game % 2::2])
+        all_moves.append(moves)
+    counts = {
+        "HardAI": (hard_ai.moves_played, hard_ai.moves_forced),
+        "EasyAI": (easy_ai.moves_played, easy_ai.moves_forced),
+    }
+    return all_moves, seconds, counts
+
+
+def game_positions(all_moves):
+    """Every (board, player to move) reached in the games."""
+    positions = []
+    for moves in all_moves:
+        board, player = [[0] * 7 for _ in range(6)], 1
+        for column in moves:
+            positions.append((np.array(board), player))
+            board[drop_row(board, column)][column] = player
+            player = 3 - player
+    return positions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forced-move detector benchmark")
+    parser.add_argument("--games", type=int, default=50, help="Games played each way")
+    parser.add_argument("--depth", type=int, default=4, help="Hard AI search depth")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the Easy AI's random moves")
+    args = parser.parse_args()
+
+    searched_moves, searched_time, _ = play_games(args.games, args.depth, args.seed, forced=False)
+    forced_moves, forced_time, counts = play_games(args.games, args.depth, args.seed, forced=True)
+
+    print(f"{args.games} games, Hard AI depth {args.depth} vs Easy AI")
+    for name, (played, resolved) in counts.items():
+        print(f"  {name:<7} {resolved}/{played} moves resolved without search "
+              f"({100 * resolved / max(played, 1):.1f}%)")
+    print(f"  Hard AI thinking time: {searched_time:.2f}s searched, {forced_time:.2f}s with forced moves "
+          f"({searched_time / max(forced_time, 1e-9):.2f}x)")
+    print(f"  Same games: {'yes' if searched_moves == forced_moves else 'NO'}")
+
+    positions = game_positions(forced_moves)
+    print()
+    print(f"Detector over {len(positions)} positions:")
+    found = {}
+    for name, detect in (("copy scan", copy_scan), ("masks", find_forced_moves)):
+        start = time.perf_counter()
+        found[name] = [detect(board, player)[:2] for board, player in positions]
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<10} {1e6 * elapsed / len(positions):>8.1f} us per position")
+    print(f"  Same wins and blocks: {'yes' if found['copy scan'] == found['masks'] else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
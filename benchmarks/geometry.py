@@ -0,0 +1,93 @@
+"""
+Benchmark win detection, evaluation and search on each board geometry.
+
+Plays random games on every geometry in src.geometry.GEOMETRIES and
+times check_win and evaluate_position on each position reached, then
+searches a few positions to a fixed depth and reports nodes per second.
+Because both functions walk precomputed rays of the geometry, their cost
+per call should stay flat as the board grows.
+
+Usage:
+    python -m benchmarks.geometry [--positions 20000] [--depth 4]
+"""
+
+import argparse
+import random
+import time
+
+from src.functions import check_win, evaluate_position, get_available_columns
+from src.geometry import GEOMETRIES
+from src.search import MinimaxSearch, drop_row
+
+
+def random_positions(geometry, count, seed=0):
+    """
+    Collect (board, player, move) samples from random games.
+
+    Each sample is the board right after player made move (row, col).
+    """
+    rng = random.Random(seed)
+    samples = []
+    while len(samples) < count:
+        board = geometry.empty_board()
+        player = 1
+        while True:
+            columns = get_available_columns(board, geometry)
+            if not columns:
+                break
+            column = rng.choice(columns)
+            row = drop_row(board, column, geometry)
+            board[row][column] = player
+            samples.append(([r[:] for r in board], player, (row, column)))
+            if check_win(board, column, player, geometry):
+                break
+            player = 3 - player
+    return samples[:count]
+
+
+def time_per_call(function, samples):
+    """Average time of function(*sample) in microseconds."""
+    start = time.perf_counter()
+    for sample in samples:
+        function(*sample)
+    return 1e6 * (time.perf_counter() - start) / len(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Board geometry benchmark")
+    parser.add_argument("--positions", type=int, default=20000, help="Random positions per geometry")
+    parser.add_argument("--depth", type=int, default=4, help="Search depth")
+    parser.add_argument("--searches", type=int, default=20, help="Positions searched per geometry")
+    args = parser.parse_args()
+
+    print(f"{'board':>7} {'lines':>6} {'check_win (us)':>15} {'evaluate (us)':>14} "
+          f"{'nodes':>9} {'nodes/s':>9}")
+
+    for name, geometry in GEOMETRIES.items():
+        samples = random_positions(geometry, args.positions)
+
+        win_time = time_per_call(
+            lambda board, player, move: check_win(board, move[1], player, geometry), samples
+        )
+        eval_time = time_per_call(
+            lambda board, player, move: evaluate_position(
+                player, 3 - player, board, move, player, 5, 10, geometry
+            ),
+            samples
+        )
+
+        # Fixed-depth search from early positions (fresh table per geometry)
+        search = MinimaxSearch(geometry=geometry)
+        start = time.perf_counter()
+        for board, player, _ in samples[:args.searches]:
+            opponent = 3 - player
+            for column in get_available_columns(board, geometry):
+                search.score_move(board, opponent, column, args.depth)
+        elapsed = time.perf_counter() - start
+
+        print(f"{name:>7} {len(geometry.lines):>6} {win_time:>15.2f} {eval_time:>14.2f} "
+              f"{search.nodes:>9} {search.nodes / elapsed:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
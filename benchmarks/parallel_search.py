@@ -0,0 +1,87 @@
+"""
+Benchmark parallel root splitting for the Hard AI.
+
+Measures the time HardAI needs to search a fixed set of positions at
+increasing depths for several worker counts, checks that every worker
+count returns the same move as the serial search, and reports the
+speedup relative to the first worker count (1 by default).
+
+Usage:
+    python -m benchmarks.parallel_search [--depths 4 5] [--workers 1 2 4]
+"""
+
+import argparse
+import time
+from multiprocessing import cpu_count
+
+from src.players.hard_ai import HardAI
+
+# Move sequences (columns, 0-indexed) leading to the benchmark positions
+POSITIONS = [
+    [3],
+    [3, 3, 2, 4],
+    [3, 2, 3, 3, 4, 2],
+    [3, 3, 3, 3, 2, 4, 4, 2],
+    [2, 3, 4, 3, 3, 2, 4, 4, 1, 5],
+]
+
+
+def build_board(moves, rows=6, columns=7):
+    """Play a sequence of columns from the empty board."""
+    board = [[0] * columns for _ in range(rows)]
+    player = 1
+    for column in moves:
+        for row in range(rows - 1, -1, -1):
+            if board[row][column] == 0:
+                board[row][column] = player
+                break
+        player = 3 - player
+    return board, player
+
+
+def time_to_depth(depth, workers):
+    """
+    Search every benchmark position at a fixed depth.
+
+    Returns:
+        Tuple of (elapsed seconds, list of chosen columns)
+    """
+    ai = HardAI(depth=depth, workers=workers)
+    # Start the pool before timing so process start-up is not measured
+    if workers > 1:
+        board, player = build_board(POSITIONS[0])
+        ai.get_move(board, player)
+
+    moves = []
+    start = time.perf_counter()
+    for sequence in POSITIONS:
+        board, player = build_board(sequence)
+        moves.append(ai.get_move(board, player))
+    elapsed = time.perf_counter() - start
+    ai.close()
+    return elapsed, moves
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel root splitting benchmark")
+    parser.add_argument("--depths", type=int, nargs="+", default=[4, 5])
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, cpu_count()}))
+    args = parser.parse_args()
+
+    print(f"Available cores: {cpu_count()}")
+    print(f"{'depth':>5} {'workers':>7} {'time (s)':>10} {'speedup':>8} {'same move':>10}")
+
+    for depth in args.depths:
+        serial_time, serial_moves = None, None
+        for workers in args.workers:
+            elapsed, moves = time_to_depth(depth, workers)
+            if serial_time is None:
+                serial_time, serial_moves = elapsed, moves
+            speedup = serial_time / elapsed if elapsed > 0 else float("inf")
+            same = "yes" if moves == serial_moves else "NO"
+            print(f"{depth:>5} {workers:>7} {elapsed:>10.3f} {speedup:>7.2f}x {same:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Headless rendering benchmark for the Pygame client.
+
+Runs the Game drawing code under SDL's dummy video driver, so no display
+is needed, through scripted states: the main menu, a game in progress
+and the end screen over a finished board. Each frame makes the same
+draw calls as Game.run for that state, followed by the display update.
+Reports frame times per state and the cost of every draw function, both
+inclusive and self time (without the draw functions it calls: the self
+time of draw_end_screen is its overlay and text).
+
+Usage:
+    python -m benchmarks.rendering [--frames 300] [--board 7x6]
+"""
+
+import argparse
+import os
+import random
+import time
+
+# Must be set here, before src.game is imported: importing it (through
+# src.configs) initializes pygame, and nothing in src/ sets these
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from src.game import Game  # noqa: E402
+from src.geometry import parse_geometry  # noqa: E402
+from src.search import drop_row  # noqa: E402
+
+DRAW_FUNCTIONS = [
+    "draw_background", "draw_header", "draw_menu_box", "draw_board",
+    "draw_main_menu", "draw_end_screen",
+]
+
+
+def scripted_board(geometry, fill, seed=0):
+    """A board with about fill of its cells played, alternating players."""
+    rng = random.Random(seed)
+    board = geometry.empty_board()
+    for ply in range(int(fill * geometry.cells)):
+        columns = [column for column in range(geometry.columns) if board[0][column] == 0]
+        column = rng.choice(columns)
+        board[drop_row(board, column, geometry)][column] = 1 + ply % 2
+    return board
+
+
+def instrument(game, totals):
+    """
+    Replace the draw methods of a game with timed wrappers.
+
+    Each call adds (inclusive seconds, self seconds) to totals[name].
+    """
+    # Seconds spent in nested draw calls, one counter per open call
+    children = []
+    for name in DRAW_FUNCTIONS:
+        method = getattr(game, name)
+
+        def timed(*args, _method=method, _name=name, **kwargs):
+            children.append(0.0)
+            start = time.perf_counter()
+            try:
+                return _method(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = children.pop()
+                if children:
+                    children[-1] += elapsed
+                totals.setdefault(_name, []).append((elapsed, elapsed - nested))
+
+        setattr(game, name, timed)
+
+
+def draw_frame(game):
+    """Draw one frame of the current state, as Game.run does."""
+    game.render_frame()
+    pygame.display.update()
+
+
+def timing_summary(seconds):
+    """Count, mean, p50/p95/p99 (nearest rank) and max of durations, in milliseconds."""
+    values = sorted(seconds)
+    if not values:
+        return {"count": 0}
+
+    def percentile(fraction):
+        return values[min(len(values) - 1, int(fraction * len(values)))]
+
+    return {
+        "count": len(values),
+        "mean": round(1000 * sum(values) / len(values), 3),
+        "p50": round(1000 * percentile(0.50), 3),
+        "p95": round(1000 * percentile(0.95), 3),
+        "p99": round(1000 * percentile(0.99), 3),
+        "max": round(1000 * values[-1], 3),
+    }
+
+
+def set_state(game, state):
+    game.reset_game()
+    if state == "menu":
+        return
+    game.show_menu = False
+    if state == "midgame":
+        game.board = scripted_board(game.geometry, 0.5)
+    else:
+        game.board = scripted_board(game.geometry, 0.9)
+        game.show_end_screen = True
+        game.game_result = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Pygame rendering benchmark")
+    parser.add_argument("--frames", type=int, default=300, help="Frames drawn per state")
+    parser.add_argument("--board", default="7x6", help="Board geometry")
+    args = parser.parse_args()
+
+    try:
+        geometry = parse_geometry(args.board)
+    except ValueError as error:
+        parser.error(str(error))
+    game = Game(geometry)
+    print(f"Video driver: {pygame.display.get_driver()}, window {game.width}x{game.height}, "
+          f"{args.frames} frames per state")
+    print()
+    print(f"{'state':<10} {'fps':>8} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)")
+
+    calls = {}
+    for state in ("menu", "midgame", "end"):
+        set_state(game, state)
+        draw_frame(game)  # warm-up: font glyphs and surfaces
+        totals = {}
+        instrument(game, totals)
+        frames = []
+        for _ in range(args.frames):
+            start = time.perf_counter()
+            draw_frame(game)
+            frames.append(time.perf_counter() - start)
+        # Restore the plain methods before the next state
+        for name in DRAW_FUNCTIONS:
+            delattr(game, name)
+
+        summary = timing_summary(frames)
+        print(f"{state:<10} {1000 / summary['mean']:>8.0f} {summary['mean']:>8.3f} {summary['p50']:>8.3f} "
+              f"{summary['p95']:>8.3f} {summary['p99']:>8.3f} {summary['max']:>8.3f}")
+        for name, seconds in totals.items():
+            calls.setdefault(name, []).extend(seconds)
+
+    print()
+    print(f"{'draw function':<18} {'calls':>7} {'mean (ms)':>10} {'p95 (ms)':>10} "
+          f"{'self (ms)':>10} {'total (s)':>10}")
+    for name in DRAW_FUNCTIONS:
+        if name in calls:
+            inclusive = [elapsed for elapsed, _ in calls[name]]
+            own = sum(own for _, own in calls[name])
+            summary = timing_summary(inclusive)
+            print(f"{name:<18} {summary['count']:>7} {summary['mean']:>10.3f} {summary['p95']:>10.3f} "
+                  f"{1000 * own / len(inclusive):>10.3f} {sum(inclusive):>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
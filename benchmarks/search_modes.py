@@ -0,0 +1,85 @@
+"""
+Benchmark the Hard AI search modes.
+
+Searches the positions of the parallel search benchmark by iterative
+deepening in every mode and reports, for each depth, the nodes visited
+and the time taken over all positions, the reduction relative to plain
+minimax, and whether every mode chose the same moves as minimax.
+
+Usage:
+    python -m benchmarks.search_modes [--depth 6] [--modes minimax pvs mtdf] [--pv]
+"""
+
+import argparse
+import time
+
+from benchmarks.parallel_search import POSITIONS, build_board
+from src.players.hard_ai import HardAI
+from src.search import SEARCH_MODES
+
+
+def run_mode(mode, max_depth):
+    """
+    Search every benchmark position to max_depth in one mode.
+
+    Each position gets a fresh AI so no table entries are shared.
+
+    Returns:
+        Tuple of (per-depth [nodes, seconds] totals, chosen columns per
+        depth, principal variations at max_depth); totals are cumulative,
+        since reaching a depth includes searching the shallower ones
+    """
+    totals = [[0, 0.0] for _ in range(max_depth)]
+    moves = [[] for _ in range(max_depth)]
+    variations = []
+
+    for sequence in POSITIONS:
+        board, player = build_board(sequence)
+        ai = HardAI(depth=max_depth, mode=mode)
+        start = time.perf_counter()
+        for depth, scored_moves in ai.iterative_deepening(board, player, max_depth):
+            totals[depth - 1][0] += ai.search.nodes
+            totals[depth - 1][1] += time.perf_counter() - start
+            moves[depth - 1].append(ai.find_best_move(scored_moves, player))
+        variations.append(ai.principal_variation(board, player, moves[-1][-1], max_depth))
+        ai.close()
+
+    return totals, moves, variations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search mode benchmark")
+    parser.add_argument("--depth", type=int, default=6, help="Deepest search depth")
+    parser.add_argument("--modes", nargs="+", choices=SEARCH_MODES, default=list(SEARCH_MODES))
+    parser.add_argument("--pv", action="store_true", help="Print the principal variations")
+    args = parser.parse_args()
+
+    # Minimax is the reference for node counts and moves
+    modes = ["minimax"] + [mode for mode in args.modes if mode != "minimax"]
+    results = {mode: run_mode(mode, args.depth) for mode in modes}
+    base_totals, base_moves, _ = results["minimax"]
+
+    print(f"{len(POSITIONS)} positions, iterative deepening to depth {args.depth}")
+    print(f"{'depth':>5} {'mode':>9} {'nodes':>10} {'time (s)':>10} {'nodes/minimax':>14} "
+          f"{'speedup':>8} {'same move':>10}")
+    for depth in range(1, args.depth + 1):
+        base_nodes, base_time = base_totals[depth - 1]
+        for mode in modes:
+            totals, moves, _ = results[mode]
+            nodes, elapsed = totals[depth - 1]
+            speedup = base_time / elapsed if elapsed > 0 else float("inf")
+            same = "yes" if moves[depth - 1] == base_moves[depth - 1] else "NO"
+            print(f"{depth:>5} {mode:>9} {nodes:>10} {elapsed:>10.3f} "
+                  f"{nodes / base_nodes:>14.3f} {speedup:>7.2f}x {same:>10}")
+
+    if args.pv:
+        print()
+        for mode in modes:
+            print(f"{mode}:")
+            for sequence, variation in zip(POSITIONS, results[mode][2]):
+                moves = "".join(str(column + 1) for column in sequence)
+                print(f"  {moves:<12} pv {' '.join(str(column + 1) for column in variation)}")
+
+
+if __name__ == '__main__':
+    main()
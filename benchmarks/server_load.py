@@ -0,0 +1,162 @@
+"""
+Load test for the engine server.
+
+Opens many concurrent client connections, each playing games against the
+engine (the client plays random moves), and reports throughput, the move
+latency seen by clients and the server's own metrics. Use --spawn to
+start a server for the duration of the test.
+
+Usage:
+    python -m benchmarks.server_load --spawn --workers 4 --clients 32 --games 2
+    python -m benchmarks.server_load --port 7654 --clients 64 --time 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import signal
+import subprocess
+import sys
+import time
+
+from tournament import percentile
+
+
+class Client:
+    """A connection to the server sending one request at a time."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def request(self, **fields):
+        self.writer.write((json.dumps(fields) + "\n").encode())
+        await self.writer.drain()
+        reply = json.loads(await self.reader.readline())
+        if not reply["ok"]:
+            raise RuntimeError(reply["error"])
+        return reply
+
+
+async def connect(args):
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    return Client(reader, writer)
+
+
+async def play_games(args, index, latencies, counters):
+    """Play args.games games on one connection, alternating who starts."""
+    rng = random.Random(index)
+    client = await connect(args)
+    try:
+        for game in range(args.games):
+            session = (await client.request(
+                cmd="new", player=args.player, time=args.time, board=args.board
+            ))["session"]
+            engine_to_move = (index + game) % 2 == 0
+            columns = list(range(int(args.board.split("x")[0])))
+            result = None
+            while result is None:
+                if engine_to_move:
+                    start = time.perf_counter()
+                    try:
+                        reply = await client.request(cmd="go", session=session)
+                    except RuntimeError as error:
+                        if str(error) != "busy":
+                            raise
+                        counters["busy"] += 1
+                        await asyncio.sleep(0.05)
+                        continue
+                    latencies.append(time.perf_counter() - start)
+                    counters["moves"] += 1
+                else:
+                    # Random client move; retry on full columns
+                    try:
+                        reply = await client.request(
+                            cmd="move", session=session, column=rng.choice(columns)
+                        )
+                    except RuntimeError:
+                        continue
+                result = reply["result"]
+                engine_to_move = not engine_to_move
+            await client.request(cmd="close", session=session)
+            counters["games"] += 1
+    finally:
+        client.writer.close()
+
+
+async def wait_for_server(args, timeout=30):
+    deadline = time.time() + timeout
+    while True:
+        try:
+            return await connect(args)
+        except OSError:
+            if time.time() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def run(args):
+    latencies = []
+    counters = {"games": 0, "moves": 0, "busy": 0}
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        play_games(args, index, latencies, counters) for index in range(args.clients)
+    ))
+    elapsed = time.perf_counter() - start
+
+    client = await connect(args)
+    metrics = await client.request(cmd="metrics")
+    client.writer.close()
+
+    latencies.sort()
+    print(f"Clients: {args.clients}  Games: {counters['games']}  Engine moves: {counters['moves']}")
+    print(f"Time: {elapsed:.2f}s ({counters['moves'] / elapsed:.1f} moves/s, "
+          f"{counters['games'] / elapsed:.2f} games/s)")
+    print(f"Busy replies: {counters['busy']}")
+    print("Client latency (ms): " + "  ".join(
+        f"{name} {1000 * percentile(latencies, fraction):.1f}"
+        for name, fraction in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))
+    ) + f"  max {1000 * latencies[-1]:.1f}")
+    print(f"Server metrics: {json.dumps(metrics)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine server load test")
+    parser.add_argument("--host", default="127.0.0.1", help="Server host")
+    parser.add_argument("--port", type=int, default=7654, help="Server port")
+    parser.add_argument("--unix", metavar="PATH", help="Connect to a Unix socket instead")
+    parser.add_argument("--spawn", action="store_true", help="Start a server for the test")
+    parser.add_argument("--workers", type=int, default=2, help="Workers of a spawned server")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent connections")
+    parser.add_argument("--games", type=int, default=2, help="Games per connection")
+    parser.add_argument("--player", default="hard:depth=4", help="Engine spec (see tournament.py)")
+    parser.add_argument("--time", type=float, default=1.0, help="Engine time budget per move")
+    parser.add_argument("--board", default="7x6", help="Board geometry")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        command = [sys.executable, "server.py", "--workers", str(args.workers)]
+        command += ["--unix", args.unix] if args.unix else ["--port", str(args.port)]
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+
+    try:
+        if server:
+            async def ready():
+                (await wait_for_server(args)).writer.close()
+            asyncio.run(ready())
+        asyncio.run(run(args))
+    finally:
+        if server:
+            # Interrupt (not kill) so the server shuts its worker pool down
+            server.send_signal(signal.SIGINT)
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
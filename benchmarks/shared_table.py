@@ -0,0 +1,94 @@
+"""
+Benchmark the shared-memory transposition table.
+
+Several processes search the positions of the parallel search benchmark
+at the same time, each starting at a different position, first with a
+private table each and then all attached to one shared table. Reports
+the wall time, the nodes searched over all processes, the table hit
+rate and, for the shared table, the share of probes answered by an
+entry another process wrote. Every process must choose the same moves
+either way.
+
+Usage:
+    python -m benchmarks.shared_table [--processes 4] [--depth 6] [--mode pvs]
+"""
+
+import argparse
+import time
+from multiprocessing import Pool, cpu_count
+
+from benchmarks.parallel_search import POSITIONS, build_board
+from src.players.hard_ai import HardAI
+from src.search import SEARCH_MODES
+from src.shared_table import SharedTranspositionTable
+
+
+def search_positions(args):
+    """
+    Search every position, starting at a different one per process.
+
+    Returns:
+        Tuple of (nodes, probes, hits, chosen columns in POSITIONS order)
+    """
+    index, depth, mode, shared_table = args
+    ai = HardAI(depth=depth, mode=mode, shared_table=shared_table)
+    moves = {}
+    for offset in range(len(POSITIONS)):
+        position = (index + offset) % len(POSITIONS)
+        board, player = build_board(POSITIONS[position])
+        moves[position] = ai.get_move(board, player)
+    table = ai.search.table
+    if shared_table is not None:
+        table.flush()
+    return ai.search.nodes, table.probes, table.hits, [moves[i] for i in range(len(POSITIONS))]
+
+
+def run(processes, depth, mode, shared_table=None):
+    """
+    Returns:
+        Tuple of (elapsed seconds, per-process results)
+    """
+    tasks = [(index, depth, mode, shared_table) for index in range(processes)]
+    with Pool(processes) as pool:
+        start = time.perf_counter()
+        results = pool.map(search_positions, tasks, chunksize=1)
+        elapsed = time.perf_counter() - start
+    return elapsed, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared transposition table benchmark")
+    parser.add_argument("--processes", type=int, default=max(cpu_count(), 2), help="Searching processes")
+    parser.add_argument("--depth", type=int, default=6, help="Search depth")
+    parser.add_argument("--mode", default="pvs", choices=SEARCH_MODES, help="Search mode")
+    parser.add_argument("--entries", type=int, default=1 << 20, help="Shared table entries")
+    args = parser.parse_args()
+
+    print(f"{args.processes} processes, {len(POSITIONS)} positions each, depth {args.depth}, "
+          f"{args.mode} (available cores: {cpu_count()})")
+    private_time, private = run(args.processes, args.depth, args.mode)
+
+    table = SharedTranspositionTable(entries=args.entries)
+    try:
+        shared_time, shared = run(args.processes, args.depth, args.mode, table.name)
+        stats = table.stats()
+    finally:
+        table.close()
+
+    print(f"{'table':>8} {'time (s)':>10} {'nodes':>10} {'hit rate':>9} {'cross-process':>14}")
+    nodes = sum(result[0] for result in private)
+    probes = sum(result[1] for result in private)
+    hits = sum(result[2] for result in private)
+    print(f"{'private':>8} {private_time:>10.3f} {nodes:>10} {hits / max(probes, 1):>9.1%} {'-':>14}")
+    nodes = sum(result[0] for result in shared)
+    print(f"{'shared':>8} {shared_time:>10.3f} {nodes:>10} {stats['hit_rate'] or 0:>9.1%} "
+          f"{stats['shared_hit_rate'] or 0:>14.1%}")
+    print(f"Speedup: {private_time / shared_time:.2f}x, "
+          f"table {stats['occupied']} of {stats['entries']} slots used")
+
+    same = all(a[3] == b[3] for a, b in zip(private, shared))
+    print(f"Same moves: {'yes' if same else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
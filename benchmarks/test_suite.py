@@ -0,0 +1,230 @@
+"""
+Test-suite benchmark: search strength and speed on solved positions.
+
+The test sets in benchmarks/positions hold standard-board positions
+grouped by game phase (moves played), each solved exactly by the solver
+of src/solver.py: the outcome (win, draw or loss for the player to move)
+of the position and of every move. A move is correct when it keeps the
+position's outcome, so the accuracy of an engine is the share of
+positions where it picked one of the best moves. Positions where every
+move has the same outcome are left out of the sets.
+
+Every engine (a tournament player spec, see tournament.py) searches
+each position with a fresh AI, and the report gives, per phase, the
+accuracy, the mean and max time per move, the nodes searched and the
+nodes per second, so a slower but deeper search can be told apart from
+a faster but weaker one. The report can be saved as JSON to compare
+runs.
+
+Usage:
+    python -m benchmarks.test_suite hard:depth=4 hard:depth=6,mode=pvs [--json report.json]
+    python -m benchmarks.test_suite hard:depth=42,time=0.5 --phases late
+    python -m benchmarks.test_suite --generate [--count 30]   # rebuild the test sets
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+
+from src.forced_moves import find_forced_moves
+from src.functions import get_available_columns
+from src.geometry import STANDARD_GEOMETRY
+from src.records import parse_move_string
+from src.search import drop_row
+from src.solver import Solver, outcome
+from tournament import create_player
+
+POSITIONS_DIR = os.path.join(os.path.dirname(__file__), "positions")
+
+# Moves played in the positions of each phase (early positions that the
+# solver cannot settle within its budget are skipped when generating)
+PHASES = {
+    "early": (12, 16),
+    "mid": (17, 24),
+    "late": (25, 32),
+}
+
+SET_HEADER = (
+    "# Solved positions: moves (1-indexed columns), outcome for the player to move\n"
+    "# (W/D/L) and the outcome of each column ('-' when full)\n"
+    "# Generated by: python -m benchmarks.test_suite --generate\n"
+)
+
+
+def build_position(moves, geometry=STANDARD_GEOMETRY):
+    """Board and player to move after a list of columns."""
+    board = geometry.empty_board()
+    player = 1
+    for column in moves:
+        board[drop_row(board, column, geometry)][column] = player
+        player = 3 - player
+    return board, player
+
+
+def load_set(path):
+    """
+    Read a test set.
+
+    Returns:
+        List of (moves, outcome, column outcomes) tuples
+
+    Raises:
+        ValueError: If a line is not a valid test position
+    """
+    positions = []
+    with open(path) as file:
+        for number, line in enumerate(file, 1):
+            if not line.strip() or line.startswith("#"):
+                continue
+            try:
+                moves, result, columns = line.split()
+                positions.append((parse_move_string(moves), result, columns))
+            except ValueError as error:
+                raise ValueError(f"{path}:{number}: invalid test position ({error})")
+    return positions
+
+
+# =============================================================================
+# Generation
+# =============================================================================
+
+def random_position(rng, plies, geometry=STANDARD_GEOMETRY):
+    """
+    Random play to a position, blocking every immediate threat.
+
+    Returns:
+        List of columns, or None if the game was decided on the way
+    """
+    board, player, moves = geometry.empty_board(), 1, []
+    for _ in range(plies):
+        wins, blocks, _ = find_forced_moves(board, player, geometry)
+        if wins or len(blocks) > 1:
+            return None
+        column = blocks[0] if blocks else rng.choice(get_available_columns(board, geometry))
+        board[drop_row(board, column, geometry)][column] = player
+        moves.append(column)
+        player = 3 - player
+    if find_forced_moves(board, player, geometry)[0]:
+        return None
+    return moves
+
+
+def generate_set(rng, low, high, count, max_nodes):
+    """Solve random positions until count of them have moves of different outcomes."""
+    solver = Solver()
+    positions = []
+    while len(positions) < count:
+        moves = random_position(rng, rng.randint(low, high))
+        if moves is None:
+            continue
+        board, player = build_position(moves)
+        solver.table.clear()
+        scores = solver.move_scores(board, player, max_nodes, outcome_only=True)
+        if scores is None or len({outcome(score) for score in scores.values()}) < 2:
+            continue
+        columns = "".join(
+            outcome(scores[column]) if column in scores else "-"
+            for column in range(STANDARD_GEOMETRY.columns)
+        )
+        positions.append((moves, outcome(max(scores.values())), columns))
+        print(f"  {len(positions)}/{count}", end="\r", flush=True)
+    return positions
+
+
+def write_set(path, positions):
+    with open(path, "w") as file:
+        file.write(SET_HEADER)
+        for moves, result, columns in positions:
+            file.write(f"{''.join(str(column + 1) for column in moves)} {result} {columns}\n")
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def run_engine(spec, positions):
+    """
+    Search every position of a set with an engine.
+
+    Returns:
+        Dict of positions, correct moves, accuracy, mean and max seconds
+        per move, nodes and nodes per second (None for engines that do
+        not search)
+    """
+    correct, times, nodes = 0, [], None
+    for moves, result, columns in positions:
+        board, player = build_position(moves)
+        ai = create_player(spec)
+        search = getattr(ai, "search", None)
+        start_nodes = search.nodes if search is not None else 0
+        start = time.perf_counter()
+        column = ai.get_move(board, player)
+        times.append(time.perf_counter() - start)
+        if search is not None:
+            nodes = (nodes or 0) + search.nodes - start_nodes
+        if hasattr(ai, "close"):
+            ai.close()
+        correct += columns[column] == result
+
+    elapsed = sum(times)
+    return {
+        "positions": len(positions),
+        "correct": correct,
+        "accuracy": round(correct / len(positions), 4),
+        "mean_time": round(elapsed / len(positions), 6),
+        "max_time": round(max(times), 6),
+        "nodes": nodes,
+        "nps": round(nodes / elapsed) if nodes is not None and elapsed > 0 else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solved-position test-suite benchmark")
+    parser.add_argument("engines", nargs="*", help="Player specs, e.g. hard:depth=6,mode=pvs")
+    parser.add_argument("--phases", nargs="+", choices=list(PHASES), default=list(PHASES))
+    parser.add_argument("--json", metavar="PATH", help="Write the report to a JSON file")
+    parser.add_argument("--generate", action="store_true", help="Rebuild the test sets")
+    parser.add_argument("--count", type=int, default=30, help="Positions per generated set")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated positions")
+    parser.add_argument("--max-nodes", type=int, default=500_000,
+                        help="Solver nodes allowed per generated position")
+    args = parser.parse_args()
+
+    if args.generate:
+        rng = random.Random(args.seed)
+        os.makedirs(POSITIONS_DIR, exist_ok=True)
+        for phase in args.phases:
+            print(f"Solving {args.count} {phase} positions...")
+            low, high = PHASES[phase]
+            positions = generate_set(rng, low, high, args.count, args.max_nodes)
+            write_set(os.path.join(POSITIONS_DIR, f"{phase}.txt"), positions)
+        return
+    if not args.engines:
+        parser.error("give at least one engine (or --generate)")
+
+    sets = {phase: load_set(os.path.join(POSITIONS_DIR, f"{phase}.txt")) for phase in args.phases}
+    report = {"phases": {phase: len(positions) for phase, positions in sets.items()}, "engines": {}}
+
+    print(f"{'engine':<28} {'phase':<6} {'accuracy':>9} {'mean (ms)':>10} {'max (ms)':>10} "
+          f"{'nodes':>10} {'nodes/s':>9}")
+    for spec in args.engines:
+        report["engines"][spec] = {}
+        for phase, positions in sets.items():
+            result = run_engine(spec, positions)
+            report["engines"][spec][phase] = result
+            nodes = result["nodes"] if result["nodes"] is not None else "-"
+            nps = result["nps"] if result["nps"] is not None else "-"
+            print(f"{spec:<28} {phase:<6} {100 * result['accuracy']:>8.1f}% "
+                  f"{1000 * result['mean_time']:>10.1f} {1000 * result['max_time']:>10.1f} "
+                  f"{nodes:>10} {nps:>9}")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Report written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
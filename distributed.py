@@ -0,0 +1,456 @@
+"""
+Distributed tournament games: a coordinator and worker processes on
+any number of hosts.
+
+The tournament runner becomes the coordinator when started with
+--listen: instead of a local process pool, every batch of games is
+handed out to the workers connected to it. A worker announces how many
+games it can play at once, receives batches of game specs (players,
+seed, colours) up to that capacity and streams each result back as soon
+as the game ends.
+
+Workers send a heartbeat every few seconds. A worker that disconnects
+or goes silent is dropped and its unfinished games are handed to the
+other workers. Each game has an id and only the first result for an id
+is counted, so every game is accounted exactly once. Games between
+fixed-depth players are reproducible from their seed, so a game played
+again after a retry gives the same result; players with time or node
+limits depend on the clock and on each worker's transposition table.
+
+Protocol: one JSON object per line in each direction.
+
+    worker -> {"type": "hello", "capacity": 4, "host": "node1"}
+    coordinator -> {"type": "jobs", "jobs": [{"id": 1, "task": [...]}, ...]}
+    worker -> {"type": "result", "id": 1, "score": 1.0, "moves": [...], "times": [...], "cache": {...}}
+    worker -> {"type": "error", "id": 1, "error": "..."}
+    worker -> {"type": "heartbeat"}
+    coordinator -> {"type": "done"}
+
+Usage:
+    python tournament.py hard:depth=4 hard:depth=5 --listen 0.0.0.0:7655 --batch-size 64
+    python distributed.py --connect coordinator-host:7655 --processes 8
+"""
+
+import argparse
+import json
+import socket
+import threading
+import time
+from collections import deque
+from multiprocessing import Pool, cpu_count
+
+from src.geometry import parse_geometry
+from tournament import init_worker, run_game
+
+DEFAULT_PORT = 7655
+
+# Seconds between worker heartbeats, and of silence before a worker is dropped
+HEARTBEAT_INTERVAL = 5.0
+HEARTBEAT_TIMEOUT = 30.0
+
+# Times a game is handed out before the tournament gives up on it
+MAX_ATTEMPTS = 3
+
+# Seconds between checks that the local worker processes are still running
+LOCAL_POLL_INTERVAL = 1.0
+
+
+def parse_address(address, default_host="127.0.0.1"):
+    """Split 'host:port' (or just 'port') into a (host, port) tuple."""
+    host, _, port = address.rpartition(":")
+    return host or default_host, int(port)
+
+
+def encode_task(task):
+    """JSON form of a run_game task (the geometry is sent by name)."""
+    *fields, geometry = task
+    return fields + [geometry.name]
+
+
+def decode_task(fields):
+    *fields, geometry = fields
+    return tuple(fields) + (parse_geometry(geometry),)
+
+
+class Connection:
+    """A JSON-lines socket that several threads may write to."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.reader = sock.makefile("rb")
+        self.write_lock = threading.Lock()
+
+    def send(self, **message):
+        data = (json.dumps(message) + "\n").encode()
+        with self.write_lock:
+            self.sock.sendall(data)
+
+    def receive(self):
+        """
+        Read the next message.
+
+        Raises:
+            ConnectionError: If the connection closed
+        """
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed")
+        return json.loads(line)
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+# =============================================================================
+# Coordinator
+# =============================================================================
+
+class Job:
+    """A game handed out to workers until one returns its result."""
+
+    def __init__(self, task):
+        self.task = task
+        self.attempts = 0
+        self.result = None
+
+
+class RemoteWorker:
+    """Coordinator side of a worker connection."""
+
+    def __init__(self, connection, name, capacity):
+        self.connection = connection
+        self.name = name
+        self.capacity = capacity
+        self.assigned = set()
+        self.alive = True
+
+
+class Coordinator:
+    """
+    Plays tournament games on remote workers.
+
+    Stands in for the process pool of run_tournament: map() hands the
+    tasks to the connected workers and returns the results in order.
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT,
+                 heartbeat_timeout=HEARTBEAT_TIMEOUT, max_attempts=MAX_ATTEMPTS):
+        """
+        Args:
+            host: Interface to listen on ("0.0.0.0" for other hosts)
+            port: TCP port to listen on
+            heartbeat_timeout: Seconds of silence after which a worker is dropped
+            max_attempts: Times a game is handed out before map() fails
+        """
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_attempts = max_attempts
+        self.server = socket.create_server((host, port))
+        self.address = self.server.getsockname()[:2]
+
+        self.changed = threading.Condition()
+        self.jobs = {}
+        self.pending = deque()
+        self.next_job_id = 1
+        self.workers = []
+        self.error = None
+        self.closed = False
+        # Worker processes started on this machine (see watch)
+        self.local_processes = []
+
+        self.workers_seen = 0
+        self.workers_lost = 0
+        self.completed = 0
+        self.retried = 0
+        self.duplicates = 0
+
+        threading.Thread(target=self.accept_workers, daemon=True).start()
+
+    def map(self, function, tasks):
+        """
+        Play run_game tasks on the workers.
+
+        Returns:
+            The results of run_game, in the order of the tasks
+
+        Raises:
+            ValueError: If function is not run_game (workers only play games)
+            RuntimeError: If a game failed on max_attempts workers
+        """
+        # Compared by name: the tournament script runs as __main__
+        if getattr(function, "__name__", None) != run_game.__name__:
+            raise ValueError("Only run_game tasks can be played on remote workers")
+
+        with self.changed:
+            ids = []
+            for task in tasks:
+                self.jobs[self.next_job_id] = Job(task)
+                self.pending.append(self.next_job_id)
+                ids.append(self.next_job_id)
+                self.next_job_id += 1
+            self.changed.notify_all()
+
+            while self.error is None and any(self.jobs[job_id].result is None for job_id in ids):
+                self.changed.wait(LOCAL_POLL_INTERVAL if self.local_processes else None)
+                self.check_local_processes()
+            if self.error is not None:
+                raise self.error
+            return [self.jobs.pop(job_id).result for job_id in ids]
+
+    def watch(self, processes):
+        """
+        Watch worker processes started on this machine: once all of them
+        have exited and no other worker is connected, map() fails instead
+        of waiting for workers that will never come.
+
+        Args:
+            processes: subprocess.Popen objects of the local workers
+        """
+        with self.changed:
+            self.local_processes = list(processes)
+            self.changed.notify_all()
+
+    def check_local_processes(self):
+        """Fail the games if every local worker has exited (lock held)."""
+        if not self.local_processes or self.workers or self.error is not None:
+            return
+        codes = [process.poll() for process in self.local_processes]
+        if None not in codes:
+            self.error = RuntimeError(
+                f"Every local worker exited (exit codes {', '.join(map(str, codes))}) "
+                f"and no other worker is connected"
+            )
+
+    def close(self):
+        """Tell every worker the tournament is over and stop listening."""
+        with self.changed:
+            self.closed = True
+            workers = list(self.workers)
+            self.changed.notify_all()
+        for worker in workers:
+            try:
+                worker.connection.send(type="done")
+            except OSError:
+                pass
+        self.server.close()
+
+    def stats(self):
+        with self.changed:
+            return {
+                "workers_seen": self.workers_seen,
+                "workers_connected": len(self.workers),
+                "workers_lost": self.workers_lost,
+                "games_completed": self.completed,
+                "games_retried": self.retried,
+                "duplicate_results": self.duplicates,
+            }
+
+    # -------------------------------------------------------------------------
+    # Worker connections
+    # -------------------------------------------------------------------------
+
+    def accept_workers(self):
+        while True:
+            try:
+                sock, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.serve_worker, args=(sock,), daemon=True).start()
+
+    def serve_worker(self, sock):
+        """Read the messages of one worker until it is done or lost."""
+        sock.settimeout(self.heartbeat_timeout)
+        connection = Connection(sock)
+        worker = None
+        try:
+            hello = connection.receive()
+            if hello.get("type") != "hello" or int(hello.get("capacity", 0)) < 1:
+                return
+            worker = RemoteWorker(connection, hello.get("host", "?"), int(hello["capacity"]))
+            with self.changed:
+                if self.closed:
+                    connection.send(type="done")
+                    return
+                self.workers.append(worker)
+                self.workers_seen += 1
+            threading.Thread(target=self.dispatch, args=(worker,), daemon=True).start()
+
+            while True:
+                message = connection.receive()
+                if message.get("type") in ("result", "error"):
+                    self.finish_job(worker, message)
+        except (OSError, ValueError, KeyError, TypeError):
+            # Disconnected, silent for too long or speaking garbage
+            pass
+        finally:
+            if worker is not None:
+                self.drop_worker(worker)
+            connection.close()
+
+    def dispatch(self, worker):
+        """Keep a worker supplied with up to its capacity of games."""
+        while True:
+            with self.changed:
+                while worker.alive and not self.closed and not (
+                    self.pending and len(worker.assigned) < worker.capacity
+                ):
+                    self.changed.wait()
+                if not worker.alive or self.closed:
+                    return
+                batch = []
+                while self.pending and len(worker.assigned) < worker.capacity:
+                    job_id = self.pending.popleft()
+                    job = self.jobs[job_id]
+                    job.attempts += 1
+                    worker.assigned.add(job_id)
+                    batch.append({"id": job_id, "task": encode_task(job.task)})
+            try:
+                worker.connection.send(type="jobs", jobs=batch)
+            except OSError:
+                # The reader notices the broken connection and requeues the batch
+                return
+
+    def finish_job(self, worker, message):
+        """Record a result (first one only) or requeue a failed game."""
+        job_id = message["id"]
+        with self.changed:
+            job = self.jobs.get(job_id)
+            if job is None or job.result is not None or job_id not in worker.assigned:
+                self.duplicates += 1
+                return
+            worker.assigned.discard(job_id)
+            if message["type"] == "result":
+                job.result = (message["score"], message["moves"], message["times"], message.get("cache"))
+                self.completed += 1
+            else:
+                self.requeue(job_id, f"{worker.name}: {message.get('error')}")
+            self.changed.notify_all()
+
+    def drop_worker(self, worker):
+        """Forget a lost worker and hand its unfinished games to the others."""
+        with self.changed:
+            if worker not in self.workers:
+                return
+            self.workers.remove(worker)
+            worker.alive = False
+            if not self.closed:
+                self.workers_lost += 1
+            for job_id in sorted(worker.assigned):
+                self.requeue(job_id, f"worker {worker.name} was lost")
+            worker.assigned.clear()
+            self.changed.notify_all()
+
+    def requeue(self, job_id, reason):
+        """Put a game back at the front of the queue (lock held)."""
+        job = self.jobs.get(job_id)
+        if job is None or job.result is not None:
+            return
+        if job.attempts >= self.max_attempts:
+            self.error = RuntimeError(f"Game {job.task} failed {job.attempts} times ({reason})")
+            return
+        self.retried += 1
+        self.pending.appendleft(job_id)
+
+
+# =============================================================================
+# Worker
+# =============================================================================
+
+def connect(host, port, wait):
+    """Connect to the coordinator, retrying for up to wait seconds."""
+    deadline = time.time() + wait
+    while True:
+        try:
+            return socket.create_connection((host, port))
+        except OSError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.5)
+
+
+def run_worker(host, port, processes, wait=60.0, cache_size=None):
+    """
+    Play the games a coordinator hands out until it is done.
+
+    Args:
+        host, port: Address of the coordinator
+        processes: Games played at once (one process each)
+        wait: Seconds to keep trying to reach the coordinator
+        cache_size: Decision cache size of each process (None: no cache)
+
+    Returns:
+        Number of games played
+    """
+    connection = Connection(connect(host, port, wait))
+    connection.send(type="hello", capacity=processes, host=socket.gethostname())
+    stopped = threading.Event()
+    played = 0
+
+    def heartbeat():
+        while not stopped.wait(HEARTBEAT_INTERVAL):
+            try:
+                connection.send(type="heartbeat")
+            except OSError:
+                return
+
+    def send_result(job_id, result):
+        nonlocal played
+        score, moves, times, report = result
+        played += 1
+        try:
+            connection.send(type="result", id=job_id, score=score, moves=moves, times=times,
+                            cache=report)
+        except OSError:
+            pass
+
+    def send_error(job_id, error):
+        try:
+            connection.send(type="error", id=job_id, error=repr(error))
+        except OSError:
+            pass
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+    pool = Pool(processes, initializer=init_worker, initargs=(cache_size,))
+    try:
+        while True:
+            try:
+                message = connection.receive()
+            except (OSError, ValueError):
+                # Coordinator gone: the tournament ended or failed
+                break
+            if message.get("type") == "done":
+                break
+            if message.get("type") == "jobs":
+                for job in message["jobs"]:
+                    pool.apply_async(
+                        run_game, (decode_task(job["task"]),),
+                        callback=lambda result, job_id=job["id"]: send_result(job_id, result),
+                        error_callback=lambda error, job_id=job["id"]: send_error(job_id, error),
+                    )
+    finally:
+        stopped.set()
+        pool.terminate()
+        pool.join()
+        connection.close()
+    return played
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tournament worker for a coordinator")
+    parser.add_argument("--connect", required=True, metavar="HOST:PORT",
+                        help="Address of the coordinator (tournament.py --listen)")
+    parser.add_argument("--processes", type=int, default=cpu_count(), help="Games played at once")
+    parser.add_argument("--wait", type=float, default=60.0,
+                        help="Seconds to keep trying to reach the coordinator")
+    parser.add_argument("--decision-cache", type=int, default=0, metavar="SIZE",
+                        help="Decision cache size of each process (see tournament.py)")
+    args = parser.parse_args()
+
+    host, port = parse_address(args.connect)
+    start_time = time.time()
+    played = run_worker(host, port, args.processes, args.wait, args.decision_cache)
+    print(f"Played {played} games in {time.time() - start_time:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""
+Headless engine speaking a line-based text protocol on stdin/stdout.
+
+Lets external arenas and test harnesses run the Hard AI as a separate
+process. Commands (one per line):
+
+    position [board NAME] [moves MOVES]
+        Set up a position. MOVES is a move string of 1-indexed columns
+        (as in game records); no moves is the empty board.
+    go [depth N] [time SECONDS] [nodes N]
+        Search the position in the background. Without limits the search
+        runs until every square is searched or it is stopped.
+    stop
+        Stop the search; the best move of the deepest finished depth is
+        played.
+    isready
+        Reply readyok once every earlier command has been processed.
+    quit
+        Stop any search and exit.
+
+While searching, a line is printed after every finished depth, then the
+chosen move:
+
+    info depth 6 score 412 nodes 18432 nps 240112 time 77 pv 4 4 5 3 2 6
+    bestmove 4
+
+Scores are from the point of view of the player to move, and the
+principal variation (pv) is the expected line of play. Invalid commands
+are answered with an "info string error: ..." line.
+
+Usage:
+    python engine.py [--weights weights.json] [--mode pvs]
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+import numpy as np
+
+from src.functions import check_win, is_board_empty
+from src.geometry import STANDARD_GEOMETRY, parse_geometry
+from src.players.hard_ai import HardAI
+from src.records import parse_move_string
+from src.search import SEARCH_MODES, drop_row
+from src.weights import load_weights
+
+
+class Engine:
+    """Protocol state: the position, the AI and the running search."""
+
+    def __init__(self, output=sys.stdout, weights=None, mode="pvs"):
+        """
+        Args:
+            output: Stream the replies are written to
+            weights: EvaluationWeights of the Hard AI (default: built-in)
+            mode: Search mode of the Hard AI (default: pvs)
+        """
+        self.output = output
+        self.weights = weights
+        self.mode = mode
+        self.output_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.set_geometry(STANDARD_GEOMETRY)
+
+    def send(self, line):
+        """Write one reply line (safe from the search thread)."""
+        with self.output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def set_geometry(self, geometry):
+        self.ai = HardAI(depth=geometry.cells, geometry=geometry, weights=self.weights,
+                         mode=self.mode)
+        self.ai.stop_event = self.stop_event
+        self.geometry = geometry
+        self.board = geometry.empty_board()
+        self.player = 1
+        self.game_over = False
+
+    # -------------------------------------------------------------------------
+    # Commands
+    # -------------------------------------------------------------------------
+
+    def position(self, tokens):
+        """Handle 'position [board NAME] [moves MOVES]'."""
+        options = parse_options(tokens, {"board": str, "moves": str})
+        geometry = parse_geometry(options["board"]) if "board" in options else self.geometry
+        moves = parse_move_string(options.get("moves", ""), geometry)
+
+        board, player, game_over = geometry.empty_board(), 1, False
+        for column in moves:
+            if game_over:
+                raise ValueError("moves continue after the end of the game")
+            row = drop_row(board, column, geometry)
+            if row < 0:
+                raise ValueError(f"column {column + 1} is full")
+            board[row][column] = player
+            game_over = check_win(board, column, player, geometry)
+            player = 3 - player
+        game_over = game_over or len(moves) == geometry.cells
+
+        if geometry != self.geometry:
+            self.set_geometry(geometry)
+        self.board = board
+        self.player = player
+        self.game_over = game_over
+
+    def go(self, tokens):
+        """Handle 'go [depth N] [time SECONDS] [nodes N]'."""
+        options = parse_options(tokens, {"depth": int, "time": float, "nodes": int})
+        if self.game_over:
+            self.send("bestmove none")
+            return
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(
+            target=self.search,
+            args=(
+                [row[:] for row in self.board],
+                self.player,
+                options.get("depth", self.geometry.cells),
+                options.get("time"),
+                options.get("nodes"),
+            ),
+            daemon=True,
+        )
+        self.thread.start()
+
+    def stop(self):
+        """Stop the running search and wait for its bestmove line."""
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    def search(self, board, player, max_depth, seconds, max_nodes):
+        """Run an iterative deepening search, reporting every finished depth."""
+        start = time.time()
+        deadline = start + seconds if seconds is not None else None
+        board = np.array(board)
+        start_nodes = self.ai.search.nodes
+
+        best_column = None
+        if is_board_empty(board):
+            # Same opening book as the Hard AI: the centre column
+            best_column = self.geometry.columns // 2
+        else:
+            for depth, scored_moves in self.ai.iterative_deepening(
+                board, player, max_depth, deadline, max_nodes
+            ):
+                best_column = self.ai.find_best_move(scored_moves, player)
+                score = max(score for _, _, score in scored_moves)
+                nodes = self.ai.search.nodes - start_nodes
+                elapsed = time.time() - start
+                pv = self.ai.principal_variation(board, player, best_column, depth)
+                self.send(
+                    f"info depth {depth} score {score} nodes {nodes} "
+                    f"nps {int(nodes / max(elapsed, 1e-6))} time {int(1000 * elapsed)} "
+                    f"pv {' '.join(str(column + 1) for column in pv)}"
+                )
+        self.send(f"bestmove {best_column + 1}")
+
+    def handle(self, line):
+        """
+        Execute one command line.
+
+        Returns:
+            False when the engine should exit, True otherwise
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, arguments = tokens[0], tokens[1:]
+
+        if command == "quit":
+            self.stop()
+            return False
+        if command == "stop":
+            self.stop()
+        elif command == "isready":
+            self.send("readyok")
+        elif command in ("position", "go"):
+            # A new command replaces any search still running
+            self.stop()
+            try:
+                getattr(self, command)(arguments)
+            except ValueError as error:
+                self.send(f"info string error: {error}")
+        else:
+            self.send(f"info string error: unknown command '{command}'")
+        return True
+
+
+def parse_options(tokens, types):
+    """
+    Parse 'name value' pairs.
+
+    Args:
+        tokens: The words after the command
+        types: Dict of option name -> conversion function
+
+    Raises:
+        ValueError: If an option is unknown, repeated or has no valid value
+    """
+    options = {}
+    for i in range(0, len(tokens), 2):
+        name = tokens[i]
+        if name not in types or name in options:
+            raise ValueError(f"unexpected '{name}'")
+        if i + 1 >= len(tokens):
+            raise ValueError(f"missing value for '{name}'")
+        options[name] = types[name](tokens[i + 1])
+    return options
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Connect 4 engine (stdin/stdout protocol)")
+    parser.add_argument("--weights", metavar="PATH", help="Evaluation weights file (see tune.py)")
+    parser.add_argument("--mode", default="pvs", choices=SEARCH_MODES, help="Search mode")
+    args = parser.parse_args()
+
+    engine = Engine(weights=load_weights(args.weights) if args.weights else None, mode=args.mode)
+    for line in sys.stdin:
+        if not engine.handle(line):
+            break
+    else:
+        # End of input: let a running search finish and report its move
+        if engine.thread is not None:
+            engine.thread.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,17 @@
+import argparse
 from src.game import Game
+from src.geometry import parse_geometry
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Connect 4")
+    parser.add_argument("--board", default="7x6", help="Board geometry, e.g. 7x6, 8x7 or 9x7:5")
+    parser.add_argument("--hints", action="store_true",
+                        help="Show live scores of your moves (toggle with H during a game)")
+    args = parser.parse_args()
+
+    try:
+        geometry = parse_geometry(args.board)
+    except ValueError as error:
+        parser.error(str(error))
+    game = Game(geometry, hints=args.hints)
+    game.run()
@@ -3,108 +3,306 @@ Monte Carlo simulation to compare AI performance.
 
 Runs multiple tournaments between Easy AI and Hard AI
 to measure win rates and draw rates.
+
+Every finished game is appended to a results file, so an interrupted
+run resumes where it stopped. Plotting is a separate step that reads
+the same file:
+
+    python montecarlo.py                 # run (or resume) the simulation
+    python montecarlo.py --plot          # plot the results file
+
+With --adjudicate, games end as soon as they are decided: dead draws
+and, near the end, positions a bounded solver proves won (see
+src/adjudication.py). --verify-adjudication plays them out anyway and
+reports how often the verdict matched.
 """
 
-import numpy as np
-import matplotlib.pyplot as plt
+import argparse
+import csv
+import os
 import time
-from multiprocessing import Pool, cpu_count
+import numpy as np
 
-from src.functions import get_valid_moves, check_win, BOARD_ROWS, BOARD_COLS
+from src.adjudication import DEFAULT_SOLVE_EMPTY, DEFAULT_SOLVE_NODES, Adjudicator
+from src.functions import get_valid_moves, check_win
+from src.geometry import STANDARD_GEOMETRY
 from src.players.easy_ai import EasyAI
 from src.players.hard_ai import HardAI
 
 
-def simulate_game(args):
+def play_game(player1, player2, opening=(), moves=None, geometry=STANDARD_GEOMETRY, times=None,
+              adjudicator=None):
     """
-    Simulate a single game between two AIs.
+    Play a single game between two AIs.
+
+    Args:
+        player1: AI playing first
+        player2: AI playing second
+        opening: Columns played before the AIs take over (default: none)
+        moves: Optional list that receives every column played
+        geometry: Board geometry to play on (default: standard 7x6)
+        times: Optional list that receives the seconds each get_move call
+               took, one entry per move (None for opening moves)
+        adjudicator: Optional Adjudicator (see src/adjudication.py) that
+                     may end the game early once it is decided; the game
+                     is recorded in its statistics
 
     Returns:
         1 if player 1 wins, 2 if player 2 wins, 0 if draw
     """
-    player1, player2 = args
-    board = [[0] * BOARD_COLS for _ in range(BOARD_ROWS)]
+    board = geometry.empty_board()
     current_player = 1
     move_count = 0
+    verdict = None
+    verdict_move = None
+    result = 0
 
-    while move_count < 42:
-        # Get move from current player's AI
-        if current_player == 1:
-            column = player1.get_move(board, current_player)
+    while move_count < geometry.cells:
+        # Get move from the opening, then from current player's AI
+        if move_count < len(opening):
+            column = opening[move_count]
+            seconds = None
         else:
-            column = player2.get_move(board, current_player)
+            player = player1 if current_player == 1 else player2
+            start = time.perf_counter()
+            column = player.get_move(board, current_player)
+            seconds = time.perf_counter() - start
 
         # Find the row to place the token
-        valid_moves = get_valid_moves(board)
+        valid_moves = get_valid_moves(board, geometry)
         for move in valid_moves:
             if column == move[1]:
                 row = move[0]
                 board[row][column] = current_player
                 break
+        if moves is not None:
+            moves.append(column)
+        if times is not None:
+            times.append(seconds)
 
         # Check for win
-        if check_win(board, column, current_player):
-            return current_player
+        if check_win(board, column, current_player, geometry):
+            result = current_player
+            move_count += 1
+            break
 
         move_count += 1
         current_player = 3 - current_player
 
-    # Draw
-    return 0
+        if adjudicator is not None and verdict is None and move_count >= len(opening):
+            verdict = adjudicator.check(board, current_player)
+            if verdict is not None:
+                verdict_move = move_count
+                if not adjudicator.verify:
+                    result = verdict[0]
+                    break
 
+    if adjudicator is not None:
+        if verdict is None:
+            adjudicator.record(None, result, 0)
+        elif adjudicator.verify:
+            # Played out: count the real result and the moves it took
+            adjudicator.record(verdict, result, move_count - verdict_move)
+        else:
+            adjudicator.record(verdict, result, verdict[2])
+    return result
 
-if __name__ == '__main__':
-    start_time = time.time()
 
-    NUM_TRIALS = 10
-    GAME_COUNTS = [10, 100, 1000, 10000]
+def simulate_game(args):
+    """
+    Simulate a single game between two AIs.
+
+    Args:
+        args: Tuple of (player1, player2) or (player1, player2, adjudicator)
+
+    Returns:
+        1 if player 1 wins, 2 if player 2 wins, 0 if draw
+    """
+    player1, player2, *adjudicator = args
+    return play_game(player1, player2, adjudicator=adjudicator[0] if adjudicator else None)
+
+
+NUM_TRIALS = 10
+GAME_COUNTS = [10, 100, 1000, 10000]
+SEARCH_DEPTH = 4
+
+RESULTS_FILE = "ai_comparison_results.csv"
+RESULTS_FIELDS = ["num_games", "trial", "game", "result"]
+
+
+# =============================================================================
+# Results Stream
+# =============================================================================
 
-    player1_wins = np.zeros((NUM_TRIALS, len(GAME_COUNTS)))
-    draws = np.zeros((NUM_TRIALS, len(GAME_COUNTS)))
+def read_results(path):
+    """
+    Iterate over the game records of a results file.
+
+    Lines that cannot be parsed (such as a line cut short by a crash)
+    are skipped.
+
+    Yields:
+        Tuples of (num_games, trial, game, result)
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, newline="") as file:
+        for row in csv.DictReader(file):
+            try:
+                yield tuple(int(row[field]) for field in RESULTS_FIELDS)
+            except (TypeError, ValueError):
+                continue
 
-    search_depth = 4
+
+def tally_results(path):
+    """
+    Count wins and draws per (num_games, trial) in a single pass.
+
+    Returns:
+        Dict (num_games, trial) -> [games played, player 1 wins, draws]
+    """
+    counts = {}
+    for num_games, trial, _, result in read_results(path):
+        tally = counts.setdefault((num_games, trial), [0, 0, 0])
+        tally[0] += 1
+        if result == 1:
+            tally[1] += 1
+        elif result == 0:
+            tally[2] += 1
+    return counts
+
+
+def open_results(path):
+    """Open the results file for appending, writing the header if it is new."""
+    is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+    if not is_new:
+        # Finish a line cut short by a crash so the next record starts clean
+        with open(path, "rb") as file:
+            file.seek(-1, os.SEEK_END)
+            needs_newline = file.read(1) != b"\n"
+        if needs_newline:
+            with open(path, "a") as file:
+                file.write("\n")
+
+    file = open(path, "a", newline="")
+    writer = csv.writer(file)
+    if is_new:
+        writer.writerow(RESULTS_FIELDS)
+    return file, writer
+
+
+# =============================================================================
+# Simulation and Plotting
+# =============================================================================
+
+def report_adjudication(adjudicator):
+    """Print the adjudication rate, moves saved and verification results."""
+    stats = adjudicator.stats()
+    if not stats["games"]:
+        return
+    moves = "moves played out after the verdict" if adjudicator.verify else "moves saved"
+    print(f"  Adjudicated: {stats['adjudicated']}/{stats['games']} games ({100 * stats['rate']:.1f}%: "
+          f"{stats['dead_draws']} dead draws, {stats['forced_wins']} forced wins), "
+          f"{stats['moves_saved']} {moves}")
+    if adjudicator.verify and stats["verified"]:
+        print(f"  Verified: {stats['agreed']}/{stats['verified']} verdicts matched the played-out result "
+              f"({100 * stats['agreed'] / stats['verified']:.1f}%)")
+
+
+def run_simulation(path, adjudicator=None):
+    """
+    Play every trial, appending each game to the results file.
+
+    Trials already (partly) in the file are resumed after their last
+    recorded game. Only running counts are kept in memory.
+
+    Args:
+        path: Results file
+        adjudicator: Optional Adjudicator ending decided games early
+    """
+    counts = tally_results(path)
+    file, writer = open_results(path)
 
     print("Starting Monte Carlo simulation...")
-    print(f"Player 1: HardAI (depth={search_depth})")
+    print(f"Player 1: HardAI (depth={SEARCH_DEPTH})")
     print(f"Player 2: EasyAI")
+    print(f"Results: {path}")
     print()
 
-    for i, num_games in enumerate(GAME_COUNTS):
-        print(f"Running {num_games} games x {NUM_TRIALS} trials...")
+    try:
+        for num_games in GAME_COUNTS:
+            print(f"Running {num_games} games x {NUM_TRIALS} trials...")
+            win_rates, draw_rates = [], []
+            # Moves chosen and moves resolved without search, per AI
+            forced = {"HardAI": [0, 0], "EasyAI": [0, 0]}
 
-        for trial in range(NUM_TRIALS):
-            # Create fresh AI instances for each trial
-            hard_ai = HardAI(depth=search_depth)
-            easy_ai = EasyAI()
+            for trial in range(NUM_TRIALS):
+                tally = counts.setdefault((num_games, trial), [0, 0, 0])
 
-            # Run games sequentially (multiprocessing has issues with pygame)
-            trial_results = []
-            for _ in range(num_games):
-                result = simulate_game((hard_ai, easy_ai))
-                trial_results.append(result)
+                # Create fresh AI instances for each trial
+                hard_ai = HardAI(depth=SEARCH_DEPTH)
+                easy_ai = EasyAI()
 
-            player1_wins[trial][i] = 100 * (trial_results.count(1) / num_games)
-            draws[trial][i] = 100 * (trial_results.count(0) / num_games)
+                # Run games sequentially (multiprocessing has issues with pygame)
+                for game in range(tally[0], num_games):
+                    result = simulate_game((hard_ai, easy_ai, adjudicator))
+                    writer.writerow([num_games, trial, game, result])
+                    file.flush()
 
-        print(f"  Completed: P1 wins={np.mean(player1_wins[:, i]):.1f}%, Draws={np.mean(draws[:, i]):.1f}%")
+                    tally[0] += 1
+                    if result == 1:
+                        tally[1] += 1
+                    elif result == 0:
+                        tally[2] += 1
 
-    print()
-    print(f"Player 1 wins: {player1_wins}")
-    print(f"Draws: {draws}")
+                for name, ai in (("HardAI", hard_ai), ("EasyAI", easy_ai)):
+                    forced[name][0] += ai.moves_played
+                    forced[name][1] += ai.moves_forced
 
-    wins_mean = np.mean(player1_wins, axis=0)
-    draws_mean = np.mean(draws, axis=0)
+                win_rates.append(100 * tally[1] / num_games)
+                draw_rates.append(100 * tally[2] / num_games)
 
+            print(f"  Completed: P1 wins={np.mean(win_rates):.1f}%, Draws={np.mean(draw_rates):.1f}%")
+            rates = [
+                f"{name} {100 * resolved / played:.1f}% of {played}"
+                for name, (played, resolved) in forced.items() if played
+            ]
+            if rates:
+                print(f"  Forced moves (no search): {', '.join(rates)}")
+            if adjudicator is not None:
+                report_adjudication(adjudicator)
+    except KeyboardInterrupt:
+        print("\nInterrupted - run again to resume from the results file.")
+    finally:
+        file.close()
+
+
+def plot_results(path, output="ai_comparison_results.pdf"):
+    """Plot win and draw rates per trial from the results file."""
+    import matplotlib.pyplot as plt
+
+    counts = tally_results(path)
+    game_counts = sorted({num_games for num_games, _ in counts})
+
+    player1_wins = np.full((NUM_TRIALS, len(game_counts)), np.nan)
+    draws = np.full((NUM_TRIALS, len(game_counts)), np.nan)
+    for (num_games, trial), (played, wins, drawn) in counts.items():
+        if trial < NUM_TRIALS and played > 0:
+            i = game_counts.index(num_games)
+            player1_wins[trial][i] = 100 * wins / played
+            draws[trial][i] = 100 * drawn / played
+
+    wins_mean = np.nanmean(player1_wins, axis=0)
+    draws_mean = np.nanmean(draws, axis=0)
+
+    print(f"Player 1 wins: {player1_wins}")
+    print(f"Draws: {draws}")
     print()
     print(f"Mean win rate: {wins_mean}")
     print(f"Mean draw rate: {draws_mean}")
 
-    elapsed = time.time() - start_time
-    print(f"\nTotal time: {elapsed:.2f}s")
-
-    # Plot results
     plt.figure(figsize=(10, 6))
-    for i, num_games in enumerate(GAME_COUNTS):
+    for i, num_games in enumerate(game_counts):
         plt.scatter(np.full(NUM_TRIALS, num_games), player1_wins[:, i], c='blue', s=10, alpha=0.5)
         plt.scatter(np.full(NUM_TRIALS, num_games), draws[:, i], c='red', s=10, alpha=0.5)
         plt.scatter(num_games, wins_mean[i], c='blue', marker='x', s=100)
@@ -117,6 +315,34 @@ if __name__ == '__main__':
     plt.xscale('log')
     plt.ylim((-10, 110))
     plt.grid(True, alpha=0.3)
-    plt.savefig('ai_comparison_results.pdf')
-    print("Graph saved to ai_comparison_results.pdf")
+    plt.savefig(output)
+    print(f"Graph saved to {output}")
     plt.show()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="HardAI vs EasyAI Monte Carlo simulation")
+    parser.add_argument("--results", default=RESULTS_FILE, help="Append-only results file")
+    parser.add_argument("--plot", action="store_true", help="Plot the results file instead of running")
+    parser.add_argument("--adjudicate", action="store_true",
+                        help="End dead draws and solved wins early (see src/adjudication.py)")
+    parser.add_argument("--solve-empty", type=int, default=DEFAULT_SOLVE_EMPTY, metavar="CELLS",
+                        help="Empty cells at which the forced-win solver starts (0: dead draws only)")
+    parser.add_argument("--solve-nodes", type=int, default=DEFAULT_SOLVE_NODES, metavar="N",
+                        help="Solver nodes allowed per position")
+    parser.add_argument("--verify-adjudication", action="store_true",
+                        help="Play adjudicated games out and compare the verdicts to the real results")
+    args = parser.parse_args()
+
+    adjudicator = None
+    if args.adjudicate or args.verify_adjudication:
+        adjudicator = Adjudicator(solve_empty=args.solve_empty, solve_nodes=args.solve_nodes,
+                                  verify=args.verify_adjudication)
+
+    start_time = time.time()
+    if args.plot:
+        plot_results(args.results)
+    else:
+        run_simulation(args.results, adjudicator)
+        elapsed = time.time() - start_time
+        print(f"\nTotal time: {elapsed:.2f}s")
@@ -0,0 +1,421 @@
+"""
+Asyncio engine server for concurrent games.
+
+Serves AI moves to many clients at once (a web front end, bots) from a
+single Python process listening on localhost TCP or a Unix socket. Each
+connection can run several game sessions. Searches run in a bounded
+process pool: when every worker is busy, requests wait in a queue of
+limited size and further requests are rejected, and a connection stops
+being read while it has too many requests outstanding. Searches of a
+client that disconnects are stopped through a shared cancel flag.
+
+Protocol: one JSON object per line in each direction. A request may
+carry an "id", which is echoed in its reply. Columns are 0-indexed.
+
+    {"cmd": "new", "player": "hard:depth=42", "time": 0.5, "board": "7x6"}
+        -> {"ok": true, "session": 1}
+    {"cmd": "move", "session": 1, "column": 3}      (opponent's move)
+        -> {"ok": true, "result": null}
+    {"cmd": "go", "session": 1}                     (engine plays a move)
+        -> {"ok": true, "column": 3, "result": null, "latency": 0.41}
+    {"cmd": "close", "session": 1}
+        -> {"ok": true}
+    {"cmd": "metrics"}
+        -> {"ok": true, "in_flight": 2, "queued": 5, "latency_ms": {...}, ...}
+
+Results use the usual codes: 1 or 2 for the winner, 0 for a draw and
+null while the game goes on.
+
+Usage:
+    python server.py --port 7654 --workers 4
+    python server.py --unix /tmp/connect4.sock
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from src.functions import check_win, get_valid_moves
+from src.geometry import parse_geometry
+from src.levels import resolve_level
+from tournament import create_player, parse_player, percentile
+
+# Requests a single connection may have outstanding before it stops being read
+MAX_REQUESTS_PER_CONNECTION = 32
+
+# Move latencies kept for the percentile metrics
+LATENCY_WINDOW = 1000
+
+
+# =============================================================================
+# Worker Processes
+# =============================================================================
+
+# Shared cancel flags (one per worker slot) and AI instances of a worker
+_cancel_flags = None
+_players = {}
+
+
+class CancelFlag:
+    """Stop event backed by one slot of the shared cancel flag array."""
+
+    def __init__(self, flags, slot):
+        self.flags = flags
+        self.slot = slot
+
+    def is_set(self):
+        return self.flags[self.slot] != 0
+
+
+def init_worker(cancel_flags):
+    """Store the shared cancel flags in a new worker process."""
+    global _cancel_flags
+    _cancel_flags = cancel_flags
+
+
+def compute_move(args):
+    """
+    Compute an engine move (worker entry point).
+
+    Args:
+        args: Tuple of (player spec, geometry, board, player, slot)
+
+    Returns:
+        Column to play
+    """
+    spec, geometry, board, player, slot = args
+    key = (spec, geometry)
+    if key not in _players:
+        _players[key] = create_player(spec, geometry)
+    ai = _players[key]
+
+    # Only searching engines can be stopped; the others are instant anyway
+    if hasattr(ai, "stop_event"):
+        ai.stop_event = CancelFlag(_cancel_flags, slot)
+    try:
+        return ai.get_move(board, player)
+    finally:
+        if hasattr(ai, "stop_event"):
+            ai.stop_event = None
+
+
+# =============================================================================
+# Sessions
+# =============================================================================
+
+class ServerBusy(Exception):
+    """Raised when the search queue is full."""
+
+
+class Session:
+    """A game between a client and an engine."""
+
+    def __init__(self, session_id, spec, geometry):
+        self.id = session_id
+        self.spec = spec
+        self.geometry = geometry
+        self.board = geometry.empty_board()
+        self.player = 1
+        self.move_count = 0
+        self.result = None
+        self.lock = asyncio.Lock()
+
+    def play(self, column):
+        """
+        Play a column for the player to move.
+
+        Returns:
+            The result (1, 2, 0) if the game ended, otherwise None
+
+        Raises:
+            ValueError: If the game is over or the column is not playable
+        """
+        if self.result is not None:
+            raise ValueError("Game is over")
+        for row, col in get_valid_moves(self.board, self.geometry):
+            if col == column:
+                break
+        else:
+            raise ValueError(f"Column {column} is not playable")
+
+        self.board[row][column] = self.player
+        self.move_count += 1
+        if check_win(self.board, column, self.player, self.geometry):
+            self.result = self.player
+        elif self.move_count == self.geometry.cells:
+            self.result = 0
+        self.player = 3 - self.player
+        return self.result
+
+
+def with_time_limit(spec, seconds):
+    """Add (or replace) the per-move time budget of a searching engine spec."""
+    # A difficulty level name keeps its options (see src/levels.py)
+    spec = resolve_level(spec)
+    engine, kwargs = parse_player(spec)
+    if engine != "hard":
+        return spec
+    options = [option for option in spec.partition(":")[2].split(",")
+               if option and not option.startswith("time=")]
+    options.append(f"time={seconds:g}")
+    return f"{engine}:{','.join(options)}"
+
+
+# =============================================================================
+# Server
+# =============================================================================
+
+class EngineServer:
+    """Manages sessions and the bounded search pool."""
+
+    def __init__(self, workers=4, max_queue=64, default_time=1.0, max_time=10.0):
+        """
+        Args:
+            workers: Search processes (and concurrent searches)
+            max_queue: Searches allowed to wait for a free worker
+            default_time: Move time budget of sessions that set none
+            max_time: Largest move time budget a session may ask for
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self.default_time = default_time
+        self.max_time = max_time
+
+        self.cancel_flags = multiprocessing.Array("b", workers, lock=False)
+        self.executor = ProcessPoolExecutor(
+            workers, initializer=init_worker, initargs=(self.cancel_flags,)
+        )
+        self.free_slots = None
+        self.sessions = {}
+        self.next_session_id = 1
+
+        self.in_flight = 0
+        self.queued = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    # -------------------------------------------------------------------------
+    # Search pool
+    # -------------------------------------------------------------------------
+
+    async def search(self, session):
+        """
+        Run the engine of a session in the pool and return its column.
+
+        Raises:
+            ServerBusy: If the queue of waiting searches is full
+        """
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise ServerBusy()
+
+        self.queued += 1
+        try:
+            slot = await self.free_slots.get()
+        finally:
+            self.queued -= 1
+
+        self.cancel_flags[slot] = 0
+        self.in_flight += 1
+        board = [row[:] for row in session.board]
+        task = (session.spec, session.geometry, board, session.player, slot)
+        future = asyncio.get_running_loop().run_in_executor(self.executor, compute_move, task)
+
+        released = False
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Stop the worker; its slot is free again once it has returned
+            self.cancel_flags[slot] = 1
+            self.cancelled += 1
+            future.add_done_callback(lambda _: self.release_slot(slot))
+            released = True
+            raise
+        finally:
+            if not released:
+                self.release_slot(slot)
+
+    def release_slot(self, slot):
+        self.in_flight -= 1
+        self.free_slots.put_nowait(slot)
+
+    def metrics(self):
+        """Current load and move latency percentiles (milliseconds)."""
+        latencies = sorted(self.latencies)
+
+        def ms(value):
+            return None if value is None else round(1000 * value, 2)
+
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "workers": self.workers,
+            "sessions": len(self.sessions),
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+            "latency_ms": {
+                "p50": ms(percentile(latencies, 0.50)),
+                "p95": ms(percentile(latencies, 0.95)),
+                "p99": ms(percentile(latencies, 0.99)),
+                "max": ms(latencies[-1] if latencies else None),
+            },
+        }
+
+    # -------------------------------------------------------------------------
+    # Requests
+    # -------------------------------------------------------------------------
+
+    def get_session(self, request, owned):
+        session_id = request.get("session")
+        if session_id not in owned:
+            raise ValueError(f"Unknown session {session_id}")
+        return self.sessions[session_id]
+
+    async def execute(self, request, owned):
+        """Execute one request and return the reply fields."""
+        command = request.get("cmd")
+
+        if command == "new":
+            geometry = parse_geometry(request.get("board", "7x6"))
+            seconds = min(float(request.get("time", self.default_time)), self.max_time)
+            spec = with_time_limit(request.get("player", "hard:depth=42"), seconds)
+            session = Session(self.next_session_id, spec, geometry)
+            self.next_session_id += 1
+            self.sessions[session.id] = session
+            owned.add(session.id)
+            return {"session": session.id}
+
+        if command == "move":
+            session = self.get_session(request, owned)
+            async with session.lock:
+                return {"result": session.play(int(request["column"]))}
+
+        if command == "go":
+            session = self.get_session(request, owned)
+            async with session.lock:
+                if session.result is not None:
+                    raise ValueError("Game is over")
+                start = time.perf_counter()
+                column = await self.search(session)
+                result = session.play(column)
+                latency = time.perf_counter() - start
+                self.latencies.append(latency)
+                self.completed += 1
+                return {"column": column, "result": result, "latency": round(latency, 4)}
+
+        if command == "close":
+            session = self.get_session(request, owned)
+            owned.discard(session.id)
+            del self.sessions[session.id]
+            return {}
+
+        if command == "metrics":
+            return self.metrics()
+
+        raise ValueError(f"Unknown command '{command}'")
+
+    async def handle_request(self, line, writer, owned, limit):
+        """Answer one request line; the reply is written as soon as it is ready."""
+        request = None
+        try:
+            parsed = json.loads(line)
+            if not isinstance(parsed, dict):
+                raise ValueError("Request must be a JSON object")
+            request = parsed
+            reply = {"ok": True}
+            reply.update(await self.execute(request, owned))
+        except ServerBusy:
+            reply = {"ok": False, "error": "busy"}
+        except (ValueError, KeyError, TypeError) as error:
+            reply = {"ok": False, "error": str(error)}
+        except Exception as error:
+            # Anything else from the engine or the pool (a missing weights
+            # file, a broken pool): the client still gets an answer
+            reply = {"ok": False, "error": f"{type(error).__name__}: {error}"}
+        finally:
+            limit.release()
+
+        if request is not None and "id" in request:
+            reply["id"] = request["id"]
+        try:
+            writer.write((json.dumps(reply) + "\n").encode())
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def handle_client(self, reader, writer):
+        """Serve one connection until it closes, then cancel its searches."""
+        owned = set()
+        tasks = set()
+        limit = asyncio.Semaphore(MAX_REQUESTS_PER_CONNECTION)
+        try:
+            while True:
+                # Stop reading (backpressure) while too many requests are open
+                await limit.acquire()
+                line = await reader.readline()
+                if not line:
+                    limit.release()
+                    break
+                task = asyncio.create_task(self.handle_request(line, writer, owned, limit))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except ConnectionError:
+            pass
+        finally:
+            for task in list(tasks):
+                task.cancel()
+            for session_id in owned:
+                self.sessions.pop(session_id, None)
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=7654, unix_path=None):
+        """Accept connections until cancelled."""
+        self.free_slots = asyncio.Queue()
+        for slot in range(self.workers):
+            self.free_slots.put_nowait(slot)
+
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+            print(f"Listening on {unix_path}")
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+            print(f"Listening on {host}:{port}")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Connect 4 engine server")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host (default: localhost only)")
+    parser.add_argument("--port", type=int, default=7654, help="TCP port")
+    parser.add_argument("--unix", metavar="PATH", help="Listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(),
+                        help="Search processes")
+    parser.add_argument("--max-queue", type=int, default=64,
+                        help="Searches allowed to wait for a worker before rejecting")
+    parser.add_argument("--default-time", type=float, default=1.0,
+                        help="Move time budget of sessions that set none (seconds)")
+    parser.add_argument("--max-time", type=float, default=10.0,
+                        help="Largest move time budget a session may ask for (seconds)")
+    args = parser.parse_args()
+
+    server = EngineServer(args.workers, args.max_queue, args.default_time, args.max_time)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Early adjudication of decided games.
+
+Simulated games are normally played to four in a row or a full board.
+Two rules end them sooner:
+
+- Dead draw: every winning line of the geometry holds tokens of both
+  players, so nobody can win any more and the game can only fill up.
+- Forced win: once few empty cells remain, the solver of src/solver.py
+  searches the rest of the game exactly (within a node budget). If the player to move can
+  force a win, or cannot avoid a loss, the game goes to the winner.
+  Positions the solver cannot finish within the budget, and solved
+  draws, are played on.
+
+A forced win assumes the winner finds it. With verify on, adjudicated
+games are played out anyway and the verdict is compared to the real
+result, which measures how often the players actually convert them.
+"""
+
+from src.forced_moves import bitboards, mask_tables
+from src.geometry import STANDARD_GEOMETRY
+from src.solver import Solver, solver_tables
+
+DEAD_DRAW = "dead draw"
+FORCED_WIN = "forced win"
+
+# Solver defaults: empty cells at which it starts, and nodes per position
+DEFAULT_SOLVE_EMPTY = 12
+DEFAULT_SOLVE_NODES = 20_000
+
+
+def is_dead_draw(board, geometry=STANDARD_GEOMETRY):
+    """Check whether every winning line is blocked for both players."""
+    first, second, _ = bitboards(board, geometry)
+    return all_lines_blocked(first, second, geometry)
+
+
+def all_lines_blocked(first, second, geometry=STANDARD_GEOMETRY):
+    """Check whether every line mask holds bits of both bitboards."""
+    line_masks, _, _ = solver_tables(geometry)
+    return all(mask & first and mask & second for mask in line_masks)
+
+
+class Adjudicator:
+    """Adjudication rules and statistics for a series of games."""
+
+    def __init__(self, geometry=STANDARD_GEOMETRY, dead_draws=True, solve_empty=DEFAULT_SOLVE_EMPTY,
+                 solve_nodes=DEFAULT_SOLVE_NODES, verify=False):
+        """
+        Args:
+            geometry: Board geometry of the games
+            dead_draws: Adjudicate dead draws
+            solve_empty: Empty cells at or below which the solver runs
+                         (0 turns forced-win adjudication off)
+            solve_nodes: Solver nodes allowed per position
+            verify: Play adjudicated games out and compare the results
+        """
+        self.geometry = geometry
+        self.dead_draws = dead_draws
+        self.solve_empty = solve_empty
+        self.solve_nodes = solve_nodes
+        self.verify = verify
+        self.solver = Solver(geometry)
+
+        self.games = 0
+        self.adjudicated = {DEAD_DRAW: 0, FORCED_WIN: 0}
+        self.moves_saved = 0
+        self.verified = 0
+        self.agreed = 0
+        self.solver_nodes = 0
+        self.solver_calls = 0
+
+    def check(self, board, player):
+        """
+        Adjudicate a position, if it is decided.
+
+        Args:
+            board: Game board
+            player: Player to move
+
+        Returns:
+            None to play on, or a tuple of (result, rule, moves left):
+            result is 1 or 2 for a win and 0 for a draw, moves left the
+            moves a perfect game would still take
+        """
+        first, second, _ = bitboards(board, self.geometry)
+        _, board_mask = mask_tables(self.geometry)
+        empty = bin(board_mask & ~(first | second)).count("1")
+
+        if self.dead_draws and all_lines_blocked(first, second, self.geometry):
+            return 0, DEAD_DRAW, empty
+
+        if empty <= self.solve_empty:
+            mine, theirs = (first, second) if player == 1 else (second, first)
+            self.solver_calls += 1
+            start = self.solver.nodes
+            score = self.solver.solve(mine, theirs, empty, self.solve_nodes)
+            self.solver_nodes += self.solver.nodes - start
+            if score:
+                winner = player if score > 0 else 3 - player
+                # A win scores one more than the cells left empty by it
+                return winner, FORCED_WIN, empty - abs(score) + 1
+        return None
+
+    def record(self, verdict, result, moves_left):
+        """
+        Count a finished game.
+
+        Args:
+            verdict: What check() returned when the game was adjudicated
+                     (None if it never was)
+            result: Result the game was counted with
+            moves_left: Moves not played because of the verdict (or, when
+                        verifying, played after it)
+        """
+        self.games += 1
+        if verdict is None:
+            return
+        self.adjudicated[verdict[1]] += 1
+        self.moves_saved += moves_left
+        if self.verify:
+            self.verified += 1
+            self.agreed += verdict[0] == result
+
+    def stats(self):
+        adjudicated = sum(self.adjudicated.values())
+        stats = {
+            "games": self.games,
+            "adjudicated": adjudicated,
+            "rate": round(adjudicated / self.games, 4) if self.games else None,
+            "dead_draws": self.adjudicated[DEAD_DRAW],
+            "forced_wins": self.adjudicated[FORCED_WIN],
+            "moves_saved": self.moves_saved,
+            "solver_calls": self.solver_calls,
+            "solver_nodes": self.solver_nodes,
+        }
+        if self.verify:
+            stats["verified"] = self.verified
+            stats["agreed"] = self.agreed
+        return stats
@@ -0,0 +1,158 @@
+"""
+Background analysis of the position on screen.
+
+Scores every column for the player to move in a thread of its own, one
+depth deeper at a time, so the game can show the scores as they improve
+without waiting for them. Each column gets its exact value (alpha-beta
+modes prove most moves worse without one, which is enough to play but
+not to show). A column's score is replaced as soon as it is searched at
+the next depth, and the snapshot says which depth every column and the
+whole position have reached.
+
+The search and its transposition table live as long as the analysis:
+the positions searched for one move are hits when the next position is
+analyzed, and a new position only has to stop the thread, not restart
+it. The render loop never waits: analyze() and pause() just hand the
+thread a new position (or none), and snapshot() copies the latest scores.
+"""
+
+import threading
+
+import numpy as np
+
+from src.functions import get_valid_moves
+from src.geometry import STANDARD_GEOMETRY
+from src.search import SearchAborted, create_search
+
+
+class BackgroundAnalysis:
+    """Progressive per-column analysis running in a daemon thread."""
+
+    def __init__(self, geometry=STANDARD_GEOMETRY, mode="pvs", weights=None, max_depth=None):
+        """
+        Args:
+            geometry: Board geometry of the analyzed positions
+            mode: Search mode (see src/search.py)
+            weights: EvaluationWeights of the leaf evaluation
+            max_depth: Deepest search (default: until every square is searched)
+        """
+        self.geometry = geometry
+        self.max_depth = max_depth
+        self.search = create_search(mode, geometry, weights)
+
+        self.changed = threading.Condition()
+        self.stop_event = threading.Event()
+        self.position = None
+        self.position_key = None
+        self.generation = 0
+        self.result = None
+        self.version = 0
+        self.closed = False
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def analyze(self, board, player):
+        """
+        Analyze a position from now on (nothing happens if it already is).
+
+        Args:
+            board: Game board (copied)
+            player: Player to move
+        """
+        board = np.array(board)
+        key = (board.tobytes(), player)
+        with self.changed:
+            if key == self.position_key:
+                return
+            self.set_position((board, player), key)
+
+    def pause(self):
+        """Stop analyzing (until the next analyze)."""
+        with self.changed:
+            if self.position is not None:
+                self.set_position(None, None)
+
+    def set_position(self, position, key):
+        """Hand a new position to the thread and stop the current search (lock held)."""
+        self.position = position
+        self.position_key = key
+        self.generation += 1
+        self.result = None
+        self.version += 1
+        self.stop_event.set()
+        self.changed.notify_all()
+
+    def snapshot(self):
+        """
+        Latest scores of the analyzed position.
+
+        Returns:
+            None before the first column is scored or while paused,
+            otherwise a dict with "depth" (deepest depth every column
+            finished), "scores" (column -> (score, depth)), "best" (best
+            column at that depth) and "version" (changes whenever the
+            scores do)
+        """
+        with self.changed:
+            if self.result is None:
+                return None
+            depth, scores, best = self.result
+            return {"depth": depth, "scores": dict(scores), "best": best, "version": self.version}
+
+    def close(self):
+        """Stop the thread and wait for it to exit."""
+        with self.changed:
+            self.closed = True
+            self.stop_event.set()
+            self.changed.notify_all()
+        self.thread.join()
+
+    # -------------------------------------------------------------------------
+    # Analysis thread
+    # -------------------------------------------------------------------------
+
+    def run(self):
+        handled = 0
+        while True:
+            with self.changed:
+                while not self.closed and (self.position is None or self.generation == handled):
+                    self.changed.wait()
+                if self.closed:
+                    return
+                board, player = self.position
+                handled = self.generation
+                # A position set after this point sets the event again
+                self.stop_event.clear()
+            self.deepen(board, player, handled)
+
+    def deepen(self, board, player, generation):
+        """Score every column one depth deeper at a time."""
+        columns = [move[1] for move in get_valid_moves(board, self.geometry)]
+        if not columns:
+            return
+        empty = int(np.count_nonzero(board == 0))
+        max_depth = min(self.max_depth or empty, empty)
+
+        # Scores of the deepest depth every column finished: the values
+        # swing between odd and even depths, so the best column is only
+        # picked among scores of one depth
+        scores, finished = {}, {}
+        for depth in range(1, max_depth + 1):
+            for column in columns:
+                try:
+                    score = self.search.score_move(board, player, column, depth,
+                                                   stop_event=self.stop_event)
+                except SearchAborted:
+                    return
+                with self.changed:
+                    if generation != self.generation:
+                        return
+                    scores[column] = (score, depth)
+                    completed = depth if column == columns[-1] else depth - 1
+                    if completed == depth:
+                        finished = dict(scores)
+                    ranked = finished or scores
+                    best = max(ranked, key=lambda move: ranked[move][0])
+                    self.result = (completed, dict(scores), best)
+                    self.version += 1
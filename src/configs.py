@@ -1,15 +1,20 @@
 import pygame
 
+from src.levels import DIFFICULTY_LEVELS
+
 pygame.init()
 
 # =============================================================================
 # Board Configuration
 # =============================================================================
-ROWS = 6
-COLUMNS = 7
+# The board size comes from the game's geometry (see src/geometry.py);
+# the window is one cell per column wide and one row taller than the board.
 CELL_SIZE = 100
-WIDTH = COLUMNS * CELL_SIZE
-HEIGHT = (ROWS + 1) * CELL_SIZE
+
+
+def window_size(geometry):
+    """Return the (width, height) of the window for a board geometry."""
+    return (geometry.columns * CELL_SIZE, (geometry.rows + 1) * CELL_SIZE)
 
 # =============================================================================
 # Colors
@@ -53,6 +58,10 @@ MENU_SUBTITLE_COLOR = (140, 160, 200)
 MENU_ACCENT_COLOR = (80, 180, 255)
 MENU_BOX_BG = (20, 40, 70)
 
+# Analysis overlay colors (scores above the columns)
+HINT_COLOR = (200, 210, 235)
+HINT_BEST_COLOR = (100, 255, 100)
+
 # =============================================================================
 # Fonts
 # =============================================================================
@@ -67,9 +76,10 @@ FONT_TINY = pygame.font.Font(None, 26)
 # =============================================================================
 MENU_TITLE = "CONNECT 4"
 MENU_SUBTITLE = "Select Difficulty"
+# One option per difficulty level (see src/levels.py), selected by its number
 MENU_OPTIONS = [
-    ("1", "Easy AI", "Random + basic strategy"),
-    ("2", "Hard AI", "Minimax algorithm")
+    (str(key), label, description)
+    for key, (_, label, description, _) in enumerate(DIFFICULTY_LEVELS, 1)
 ]
 MENU_FOOTER = "Press ESC to quit"
 
@@ -80,6 +90,20 @@ END_GAME_MESSAGES = {
 }
 END_MENU_INSTRUCTIONS = ["Press 1 to play again", "Press ESC to quit"]
 
+# =============================================================================
+# Analysis Overlay
+# =============================================================================
+# Key toggling the live scores of the player's moves, and the search mode of
+# the background analysis (see src/analysis.py)
+HINT_KEY = pygame.K_h
+ANALYSIS_MODE = "pvs"
+
+# =============================================================================
+# Game Records
+# =============================================================================
+# Finished games are appended here (see src/records.py for the format)
+GAME_RECORD_FILE = "game_records.txt"
+
 # =============================================================================
 # Game Title (with glow effect)
 # =============================================================================
@@ -123,8 +147,6 @@ def create_title_surface():
     return surface
 
 TITLE_SURFACE = create_title_surface()
-TITLE_RECT = TITLE_SURFACE.get_rect()
-TITLE_RECT.center = (WIDTH // 2, CELL_SIZE // 2)
 
 
 def create_gradient_surface(width, height, top_color, bottom_color):
@@ -139,10 +161,6 @@ def create_gradient_surface(width, height, top_color, bottom_color):
     return surface
 
 
-# Pre-create background gradient
-BACKGROUND_SURFACE = create_gradient_surface(WIDTH, HEIGHT, BACKGROUND_TOP, BACKGROUND_BOTTOM)
-
-
 # =============================================================================
 # Sound System
 # =============================================================================
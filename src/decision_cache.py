@@ -0,0 +1,156 @@
+"""
+Cross-game cache of AI move decisions.
+
+A fixed-depth Hard AI always picks the same column in the same position,
+so a tournament against a weaker or random opponent keeps searching the
+same early and middle game positions. The decision cache remembers the
+column chosen for (player configuration, position) and answers repeated
+positions without searching. It holds at most max_size decisions,
+evicting the least recently used one, and can be saved to a JSON file
+and loaded in a later run.
+
+Positions are keyed exactly as they are, not shared with their mirror
+image: the Hard AI breaks ties between equal moves by column order, so
+its choice in a mirrored position is not always the mirrored column.
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 100_000
+
+
+def decision_key(config, board, player):
+    """Key of a decision: player configuration, player to move and every cell."""
+    return f"{config}|{player}|" + "".join(str(int(cell)) for row in board for cell in row)
+
+
+class DecisionCache:
+    """LRU map of decision key -> (column, seconds the search took)."""
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.new_entries = []
+        self.hits = 0
+        self.misses = 0
+        self.time_saved = 0.0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def items(self):
+        """Every decision as (key, column, seconds), least recently used first."""
+        return [(key, column, seconds) for key, (column, seconds) in self.entries.items()]
+
+    def get(self, key):
+        """Return the cached column for a key, or None."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        self.time_saved += entry[1]
+        return entry[0]
+
+    def put(self, key, column, seconds):
+        """Store a decision and the time it took, evicting the oldest if full."""
+        self.add(key, column, seconds)
+        self.new_entries.append((key, column, seconds))
+
+    def add(self, key, column, seconds):
+        self.entries[key] = (column, seconds)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    # -------------------------------------------------------------------------
+    # Worker reports
+    # -------------------------------------------------------------------------
+
+    def take_report(self):
+        """
+        Statistics and new decisions since the last report (then reset).
+
+        Tournament workers send one per game so the main process can
+        total the statistics and save every decision.
+        """
+        report = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "time_saved": self.time_saved,
+            "new": self.new_entries,
+        }
+        self.hits, self.misses, self.time_saved = 0, 0, 0.0
+        self.new_entries = []
+        return report
+
+    def add_report(self, report):
+        """Add the statistics and decisions of a worker report."""
+        self.hits += report["hits"]
+        self.misses += report["misses"]
+        self.time_saved += report["time_saved"]
+        for key, column, seconds in report["new"]:
+            self.add(key, column, seconds)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "lookups": lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "time_saved": round(self.time_saved, 3),
+        }
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def save(self, path):
+        """Write every decision to a JSON file, least recently used first."""
+        with open(path, "w") as file:
+            json.dump(self.items(), file)
+
+    def load(self, path):
+        """
+        Add the decisions of a file written by save(), if it exists.
+
+        Raises:
+            ValueError: If the file is not a decision cache
+        """
+        if not os.path.exists(path):
+            return
+        with open(path) as file:
+            try:
+                for key, column, seconds in json.load(file):
+                    self.add(key, column, seconds)
+            except (TypeError, ValueError) as error:
+                raise ValueError(f"Invalid decision cache file '{path}': {error}")
+
+
+class CachedPlayer:
+    """A deterministic AI whose decisions go through a DecisionCache."""
+
+    def __init__(self, ai, cache, config):
+        """
+        Args:
+            ai: AI whose get_move depends on nothing but the position
+            cache: DecisionCache shared with other games
+            config: String identifying the AI configuration (and board)
+        """
+        self.ai = ai
+        self.cache = cache
+        self.config = config
+
+    def get_move(self, board, player):
+        key = decision_key(self.config, board, player)
+        column = self.cache.get(key)
+        if column is None:
+            start = time.perf_counter()
+            column = self.ai.get_move(board, player)
+            self.cache.put(key, column, time.perf_counter() - start)
+        return column
@@ -0,0 +1,149 @@
+"""
+Forced-move detection with bit masks.
+
+Finds, for the player to move, the columns that win at once, the
+columns that must be played to stop the opponent winning at once, and
+the columns that would hand the opponent a win on top of the token just
+played. The board is read in one pass into two bitboards (one per
+player) and the rest is shifts and ANDs, with no board copies and no
+per-column win checks.
+
+Bitboard layout: column-major, each column holding rows + 1 bits from
+the bottom up. The spare bit on top of each column stays empty, so a
+line shifted past the top of one column never joins up with the next
+one.
+
+A threat cell of a player is an empty cell that would complete one of
+their lines. For every line direction and every position of the empty
+cell in a window of winning_length cells, the cell is a threat if the
+other cells of the window all hold the player's tokens, which is the
+AND of the player's bitboard shifted by each of their offsets.
+"""
+
+from functools import lru_cache
+
+from src.geometry import STANDARD_GEOMETRY
+
+
+@lru_cache(maxsize=None)
+def mask_tables(geometry):
+    """
+    Shift tables of a geometry.
+
+    Returns:
+        Tuple of (offset lists, board mask): one list of bit offsets per
+        (direction, empty cell position) window, each holding the offsets
+        of the other cells of the window
+    """
+    stride = geometry.rows + 1
+    length = geometry.winning_length
+    windows = []
+    # Vertical, horizontal and both diagonals
+    for step in (1, stride, stride - 1, stride + 1):
+        for empty in range(length):
+            windows.append(tuple((cell - empty) * step for cell in range(length) if cell != empty))
+    board_mask = 0
+    for column in range(geometry.columns):
+        board_mask |= ((1 << geometry.rows) - 1) << (column * stride)
+    return windows, board_mask
+
+
+def bitboards(board, geometry=STANDARD_GEOMETRY):
+    """
+    Read a board into bitboards.
+
+    Returns:
+        Tuple of (player 1 mask, player 2 mask, column heights)
+    """
+    masks = [0, 0, 0]
+    heights = []
+    stride = geometry.rows + 1
+    for column in range(geometry.columns):
+        bit = column * stride
+        height = 0
+        for row in range(geometry.rows - 1, -1, -1):
+            cell = board[row][column]
+            if cell == 0:
+                break
+            masks[cell] |= 1 << (bit + height)
+            height += 1
+        heights.append(height)
+    return masks[1], masks[2], heights
+
+
+def threat_cells(mask, empty, geometry=STANDARD_GEOMETRY):
+    """Empty cells that would complete a line of the player owning mask."""
+    windows, _ = mask_tables(geometry)
+    threats = 0
+    for offsets in windows:
+        window = -1
+        for offset in offsets:
+            window &= mask >> offset if offset > 0 else mask << -offset
+        threats |= window
+    return threats & empty
+
+
+def find_forced_moves(board, player, geometry=STANDARD_GEOMETRY):
+    """
+    Classify the moves of the player to move.
+
+    Returns:
+        Tuple of column lists (wins, blocks, unsafe):
+        - wins: Columns that win at once
+        - blocks: Columns where the opponent would win at once
+        - unsafe: Columns whose token lets the opponent win on top of it
+    """
+    first, second, heights = bitboards(board, geometry)
+    _, board_mask = mask_tables(geometry)
+    empty = board_mask & ~(first | second)
+    mine, theirs = (first, second) if player == 1 else (second, first)
+    my_threats = threat_cells(mine, empty, geometry)
+    their_threats = threat_cells(theirs, empty, geometry)
+
+    wins, blocks, unsafe = [], [], []
+    stride = geometry.rows + 1
+    for column, height in enumerate(heights):
+        if height == geometry.rows:
+            continue
+        bit = 1 << (column * stride + height)
+        if my_threats & bit:
+            wins.append(column)
+        if their_threats & bit:
+            blocks.append(column)
+        if their_threats & (bit << 1):
+            unsafe.append(column)
+    return wins, blocks, unsafe
+
+
+def forced_move(board, player, geometry=STANDARD_GEOMETRY, lookahead=True):
+    """
+    The only move a searching player can choose, if there is one.
+
+    - A single winning move is played.
+    - Otherwise a single opponent win must be blocked, unless the block
+      hands the opponent another win (then every move loses and the
+      search picks among them).
+    - Otherwise, when every move but one hands the opponent a win, that
+      one is played.
+
+    A search at least two plies deep always picks these moves, since
+    every other move loses sooner. Shallower searches do not see the
+    opponent's reply, so with lookahead=False only wins are forced.
+
+    Returns:
+        The forced column, or None if the position needs a search
+    """
+    wins, blocks, unsafe = find_forced_moves(board, player, geometry)
+    if wins:
+        return wins[0] if len(wins) == 1 else None
+    if not lookahead:
+        return None
+    if blocks:
+        if len(blocks) == 1 and blocks[0] not in unsafe:
+            return blocks[0]
+        return None
+    safe = [
+        column for column in range(geometry.columns)
+        if board[0][column] == 0 and column not in unsafe
+    ]
+    return safe[0] if len(safe) == 1 else None
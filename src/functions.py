@@ -1,47 +1,50 @@
 import numpy as np
+from src.geometry import STANDARD_GEOMETRY
 
 # =============================================================================
 # Board Constants
 # =============================================================================
-BOARD_ROWS = 6
-BOARD_COLS = 7
-WINNING_LENGTH = 4
+# Dimensions of the standard board. Every function below also accepts a
+# geometry argument (see src/geometry.py) to play on other board sizes.
+BOARD_ROWS = STANDARD_GEOMETRY.rows
+BOARD_COLS = STANDARD_GEOMETRY.columns
+WINNING_LENGTH = STANDARD_GEOMETRY.winning_length
 
 # =============================================================================
 # Board Operations
 # =============================================================================
 
-def drop_token(board, column, player):
+def drop_token(board, column, player, geometry=STANDARD_GEOMETRY):
     """
     Drop a token in the specified column for the given player.
     Returns a new board with the token placed at the lowest available row.
     """
     new_board = np.copy(board)
-    for row in range(BOARD_ROWS - 1, -1, -1):
+    for row in range(geometry.rows - 1, -1, -1):
         if new_board[row][column] == 0:
             new_board[row][column] = player
             return new_board
     return new_board
 
 
-def get_valid_moves(board):
+def get_valid_moves(board, geometry=STANDARD_GEOMETRY):
     """
     Get all valid moves as a list of [row, column] pairs.
     A move is valid if the column is not full.
     """
     valid_moves = []
-    for col in range(BOARD_COLS):
+    for col in range(geometry.columns):
         if board[0][col] == 0:
-            for row in range(BOARD_ROWS - 1, -1, -1):
+            for row in range(geometry.rows - 1, -1, -1):
                 if board[row][col] == 0:
                     valid_moves.append([row, col])
                     break
     return valid_moves
 
 
-def get_available_columns(board):
+def get_available_columns(board, geometry=STANDARD_GEOMETRY):
     """Get list of columns that are not full."""
-    return [col for col in range(BOARD_COLS) if board[0][col] == 0]
+    return [col for col in range(geometry.columns) if board[0][col] == 0]
 
 
 def is_board_empty(board):
@@ -54,18 +57,58 @@ def get_opponent(player):
     return 3 - player
 
 
+# =============================================================================
+# Board Symmetry
+# =============================================================================
+# The board is left-right symmetric: a position and its mirror image have
+# the same value, with every column reflected. Caches key positions on the
+# canonical orientation so both share one entry.
+
+def mirror_column(column, geometry=STANDARD_GEOMETRY):
+    """Return the column matching the given one in the mirrored board."""
+    return geometry.columns - 1 - column
+
+
+def mirror_board(board):
+    """Return the left-right mirror image of the board."""
+    return [list(reversed(row)) for row in board]
+
+
+def board_key(board):
+    """Return a compact hashable key for the board (one byte per cell)."""
+    return bytes(cell for row in board for cell in row)
+
+
+def canonical_key(board):
+    """
+    Return the key shared by a position and its mirror image.
+
+    Returns:
+        Tuple of (key, mirrored)
+        - key: Key of whichever orientation sorts first
+        - mirrored: True if the key describes the mirror image, in which case
+          columns read back from a cache must go through mirror_column
+    """
+    key = board_key(board)
+    mirrored_key = bytes(cell for row in board for cell in reversed(row))
+    if mirrored_key < key:
+        return (mirrored_key, True)
+    return (key, False)
+
+
 # =============================================================================
 # Win Detection
 # =============================================================================
 
-def check_win(board, column, player):
+def check_win(board, column, player, geometry=STANDARD_GEOMETRY):
     """
     Check if the last move in the given column results in a win.
-    Checks horizontal, vertical, and both diagonal directions.
+    Checks horizontal, vertical, and both diagonal directions, walking
+    the precomputed rays of the geometry (no bounds checks needed).
     """
     # Find the row where the token was placed
     row = -1
-    for r in range(BOARD_ROWS):
+    for r in range(geometry.rows):
         if board[r][column] == player:
             row = r
             break
@@ -73,89 +116,28 @@ def check_win(board, column, player):
     if row == -1:
         return False
 
-    # Direction vectors: (row_delta, col_delta)
-    directions = [
-        (0, 1),   # Horizontal
-        (1, 0),   # Vertical
-        (1, 1),   # Diagonal (down-right)
-        (1, -1)   # Diagonal (down-left)
-    ]
-
-    for row_delta, col_delta in directions:
-        count = 1
+    needed = geometry.winning_length - 1
+    for forward, backward in geometry.win_rays[row][column]:
+        count = 0
 
         # Count in positive direction
-        r, c = row + row_delta, column + col_delta
-        while 0 <= r < BOARD_ROWS and 0 <= c < BOARD_COLS and board[r][c] == player:
+        for r, c in forward:
+            if board[r][c] != player:
+                break
             count += 1
-            r += row_delta
-            c += col_delta
 
         # Count in negative direction
-        r, c = row - row_delta, column - col_delta
-        while 0 <= r < BOARD_ROWS and 0 <= c < BOARD_COLS and board[r][c] == player:
+        for r, c in backward:
+            if board[r][c] != player:
+                break
             count += 1
-            r -= row_delta
-            c -= col_delta
 
-        if count >= WINNING_LENGTH:
+        if count >= needed:
             return True
 
     return False
 
 
-# =============================================================================
-# Minimax Algorithm
-# =============================================================================
-
-def minimax(node, depth, maximizing_player):
-    """
-    Minimax algorithm to find the best move.
-
-    Args:
-        node: Current game tree node
-        depth: Remaining search depth
-        maximizing_player: The player trying to maximize the score
-
-    Returns:
-        The best score achievable from this position
-    """
-    # Base case: reached maximum depth
-    if depth == 0:
-        if node.value == 0:
-            node.value += evaluate_position(
-                node.player,
-                get_opponent(node.player),
-                node.board,
-                node.move,
-                maximizing_player,
-                opponent_weight=5,
-                player_weight=10
-            )
-        return node.value
-
-    # No children means terminal node (win/loss/draw)
-    if not node.children:
-        return node.value
-
-    if node.player != maximizing_player:
-        # Maximizing player's turn
-        max_score = -np.inf
-        for child in node.children:
-            score = minimax(child, depth - 1, maximizing_player)
-            max_score = max(max_score, score)
-        node.value = max_score
-        return max_score
-    else:
-        # Minimizing player's turn
-        min_score = np.inf
-        for child in node.children:
-            score = minimax(child, depth - 1, maximizing_player)
-            min_score = min(min_score, score)
-        node.value = min_score
-        return min_score
-
-
 # =============================================================================
 # Position Evaluation
 # =============================================================================
@@ -163,7 +145,7 @@ def minimax(node, depth, maximizing_player):
 WIN_SCORE = 1_000_000
 
 
-def evaluate_terminal_state(board, player, maximizing_player, column):
+def evaluate_terminal_state(board, player, maximizing_player, column, geometry=STANDARD_GEOMETRY):
     """
     Check if the position is a winning state.
 
@@ -172,7 +154,7 @@ def evaluate_terminal_state(board, player, maximizing_player, column):
         - is_terminal: True if someone has won
         - score: Positive for maximizing player win, negative for opponent win
     """
-    if check_win(board, column, player):
+    if check_win(board, column, player, geometry):
         if player == maximizing_player:
             return (True, WIN_SCORE)
         else:
@@ -180,75 +162,57 @@ def evaluate_terminal_state(board, player, maximizing_player, column):
     return (False, 0)
 
 
-def count_consecutive_tokens(board, row, col, row_delta, col_delta, target_player):
-    """Count consecutive tokens in a direction for threat evaluation."""
-    count = 0
-    for i in range(3):
-        r, c = row + row_delta * i, col + col_delta * i
-        if 0 <= r < BOARD_ROWS and 0 <= c < BOARD_COLS:
-            if board[r][c] == target_player:
-                count += 1
-            else:
-                break
-        else:
-            break
-    return count
-
-
-def evaluate_threats(board, move, target_player, weight):
+def evaluate_threats(board, move, target_player, weight, geometry=STANDARD_GEOMETRY):
     """
     Evaluate threats around a move position.
     Higher scores for positions that create or block threats.
+
+    Counts consecutive tokens along the 8 rays starting at the move
+    (both ways in all 4 directions).
     """
     row, col = move[0], move[1]
     total_score = 0
 
-    # Check all 4 directions (both ways)
-    directions = [
-        (0, 1), (0, -1),   # Horizontal
-        (1, 0), (-1, 0),   # Vertical
-        (1, 1), (-1, -1),  # Diagonal \
-        (1, -1), (-1, 1)   # Diagonal /
-    ]
-
-    for row_delta, col_delta in directions:
-        count = count_consecutive_tokens(board, row, col, row_delta, col_delta, target_player)
+    for ray in geometry.threat_rays[row][col]:
+        count = 0
+        for r, c in ray:
+            if board[r][c] != target_player:
+                break
+            count += 1
         total_score += count * weight
 
     return total_score
 
 
-# Position value table - center positions are more valuable
-POSITION_VALUES = [
-    [3,  4,  5,  7,  5,  4,  3],
-    [4,  6,  8,  10, 8,  6,  4],
-    [5,  8,  11, 13, 11, 8,  5],
-    [5,  8,  11, 13, 11, 8,  5],
-    [4,  6,  8,  10, 8,  6,  4],
-    [3,  4,  5,  7,  5,  4,  3]
-]
+# Position values come from the geometry: the number of winning lines
+# through each cell, so center positions are more valuable
 POSITION_WEIGHT = 80
 
 
-def evaluate_board_position(move):
+def evaluate_board_position(move, geometry=STANDARD_GEOMETRY, cell_values=None):
     """
     Evaluate the strategic value of a board position.
     Center positions are worth more.
+
+    cell_values replaces the default table of values (see src/weights.py).
     """
     row, col = move[0], move[1]
-    return POSITION_VALUES[row][col] * POSITION_WEIGHT
+    if cell_values is not None:
+        return cell_values[row][col]
+    return geometry.position_values[row][col] * POSITION_WEIGHT
 
 
-def evaluate_position(player, opponent, board, move, maximizing_player, opponent_weight, player_weight):
+def evaluate_position(player, opponent, board, move, maximizing_player, opponent_weight, player_weight,
+                      geometry=STANDARD_GEOMETRY, cell_values=None):
     """
     Comprehensive position evaluation combining:
     - Threat evaluation for both players
     - Positional value of the move
     """
     score = (
-        evaluate_threats(board, move, opponent, opponent_weight) +
-        evaluate_threats(board, move, player, player_weight) +
-        evaluate_board_position(move)
+        evaluate_threats(board, move, opponent, opponent_weight, geometry) +
+        evaluate_threats(board, move, player, player_weight, geometry) +
+        evaluate_board_position(move, geometry, cell_values)
     )
 
     if player != maximizing_player:
@@ -1,23 +1,25 @@
 import pygame
 import os
-from src.functions import get_valid_moves, check_win
-from src.players.hard_ai import HardAI
-from src.players.easy_ai import EasyAI
+import time
+from src.analysis import BackgroundAnalysis
+from src.functions import get_valid_moves, check_win, WIN_SCORE
+from src.geometry import STANDARD_GEOMETRY
+from src.records import GameRecord, append_record
+from src.levels import DIFFICULTY_LEVELS, create_level_player
 from src.configs import (
-    ROWS, COLUMNS, CELL_SIZE, WIDTH, HEIGHT,
-    BACKGROUND_SURFACE, HEADER_COLOR,
+    CELL_SIZE, window_size, create_gradient_surface,
+    BACKGROUND_TOP, BACKGROUND_BOTTOM, HEADER_COLOR,
     BOARD_PRIMARY, BOARD_HIGHLIGHT, BOARD_SHADOW,
     TOKEN_COLORS, TOKEN_SHADOW, TOKEN_HIGHLIGHT,
     MENU_TITLE_COLOR, MENU_TEXT_COLOR, MENU_SUBTITLE_COLOR,
-    MENU_ACCENT_COLOR, MENU_BOX_BG,
+    MENU_ACCENT_COLOR, MENU_BOX_BG, HINT_COLOR, HINT_BEST_COLOR,
     FONT_TITLE, FONT_LARGE, FONT_MEDIUM, FONT_SMALL, FONT_TINY,
     MENU_TITLE, MENU_SUBTITLE, MENU_OPTIONS, MENU_FOOTER,
     END_GAME_MESSAGES, END_MENU_INSTRUCTIONS,
-    TITLE_SURFACE, TITLE_RECT,
-    SOUND_MANAGER
+    TITLE_SURFACE, HINT_KEY, ANALYSIS_MODE,
+    SOUND_MANAGER, GAME_RECORD_FILE
 )
 
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Connect 4")
 
 # Set window icon
@@ -32,104 +34,181 @@ if os.path.exists(ICON_PATH):
 class Game:
     """Main game class handling game loop, rendering, and state management."""
 
-    def __init__(self):
+    def __init__(self, geometry=STANDARD_GEOMETRY, hints=False):
+        """
+        Args:
+            geometry: Board geometry to play on (default: standard 7x6)
+            hints: Show the live scores of the player's moves from the
+                   start (toggled with HINT_KEY during a game)
+        """
+        self.geometry = geometry
+        self.width, self.height = window_size(geometry)
+        self.screen = pygame.display.set_mode((self.width, self.height))
+        self.background = create_gradient_surface(
+            self.width, self.height, BACKGROUND_TOP, BACKGROUND_BOTTOM
+        )
+        self.title_rect = TITLE_SURFACE.get_rect(center=(self.width // 2, CELL_SIZE // 2))
+        self.hints = hints
+        # Started the first time hints are shown, then kept with its table
+        self.analysis = None
+        self.hint_surfaces = (None, [])
         self.reset_game()
 
     def reset_game(self):
         """Reset the game to initial state."""
-        self.board = [[0] * COLUMNS for _ in range(ROWS)]
+        self.board = self.geometry.empty_board()
         self.current_player = 1
         self.ai_opponent = None
+        self.ai_name = None
         self.is_game_over = False
         self.show_menu = True
         self.show_end_screen = False
         self.game_result = None  # True=win, False=lose, None=draw
         self.move_count = 0
+        self.moves = []
+        self.sync_analysis()
+
+    def sync_analysis(self):
+        """Analyze the position while the player is to move with hints on, else pause."""
+        playing = not self.show_menu and not self.show_end_screen and self.current_player == 1
+        if self.hints and playing:
+            if self.analysis is None:
+                self.analysis = BackgroundAnalysis(self.geometry, mode=ANALYSIS_MODE)
+            self.analysis.analyze(self.board, self.current_player)
+        elif self.analysis is not None:
+            self.analysis.pause()
+
+    def close_analysis(self):
+        """Stop the analysis thread, if it was started."""
+        if self.analysis is not None:
+            self.analysis.close()
+            self.analysis = None
+
+    def save_record(self, result):
+        """Append the finished game to the game record file."""
+        metadata = {
+            "player1": "human",
+            "player2": self.ai_name,
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        if self.geometry != STANDARD_GEOMETRY:
+            metadata["board"] = self.geometry.name
+        record = GameRecord(self.moves, result, metadata)
+        try:
+            append_record(GAME_RECORD_FILE, record)
+        except OSError:
+            pass
 
     def draw_background(self):
         """Draw the gradient background."""
-        screen.blit(BACKGROUND_SURFACE, (0, 0))
+        self.screen.blit(self.background, (0, 0))
 
     def draw_header(self):
         """Draw the header area with title."""
-        pygame.draw.rect(screen, HEADER_COLOR, (0, 0, WIDTH, CELL_SIZE))
-        screen.blit(TITLE_SURFACE, TITLE_RECT)
+        pygame.draw.rect(self.screen, HEADER_COLOR, (0, 0, self.width, CELL_SIZE))
+        self.screen.blit(TITLE_SURFACE, self.title_rect)
+        if self.hints and self.analysis is not None:
+            self.draw_hints()
+
+    def draw_hints(self):
+        """Draw the latest analysis scores above the columns."""
+        snapshot = self.analysis.snapshot()
+        if snapshot is None:
+            return
+        # Text is only rendered again when the scores changed
+        version, surfaces = self.hint_surfaces
+        if version != snapshot["version"]:
+            surfaces = []
+            for column, (score, _) in snapshot["scores"].items():
+                color = HINT_BEST_COLOR if column == snapshot["best"] else HINT_COLOR
+                surface = FONT_TINY.render(format_hint(score), True, color)
+                center = (column * CELL_SIZE + CELL_SIZE // 2, CELL_SIZE - 12)
+                surfaces.append((surface, surface.get_rect(center=center)))
+            surface = FONT_TINY.render(f"depth {snapshot['depth']}", True, HINT_COLOR)
+            surfaces.append((surface, surface.get_rect(topleft=(8, 6))))
+            self.hint_surfaces = (snapshot["version"], surfaces)
+        for surface, rect in surfaces:
+            self.screen.blit(surface, rect)
 
     def draw_menu_box(self, x, y, width, height, alpha=230):
         """Draw a semi-transparent box for menu elements."""
         box_surface = pygame.Surface((width, height), pygame.SRCALPHA)
         pygame.draw.rect(box_surface, (*MENU_BOX_BG, alpha), (0, 0, width, height), border_radius=12)
         pygame.draw.rect(box_surface, MENU_ACCENT_COLOR, (0, 0, width, height), 2, border_radius=12)
-        screen.blit(box_surface, (x, y))
+        self.screen.blit(box_surface, (x, y))
 
     def draw_board(self):
         """Render the game board with tokens."""
-        for row in range(ROWS):
-            for col in range(COLUMNS):
+        for row in range(self.geometry.rows):
+            for col in range(self.geometry.columns):
                 x = col * CELL_SIZE + CELL_SIZE // 2
                 y = (row + 1) * CELL_SIZE + CELL_SIZE // 2
 
                 # Draw board cell
                 pygame.draw.rect(
-                    screen, BOARD_PRIMARY,
+                    self.screen, BOARD_PRIMARY,
                     (col * CELL_SIZE, (row + 1) * CELL_SIZE, CELL_SIZE, CELL_SIZE)
                 )
 
                 # Draw cell hole with 3D effect
-                pygame.draw.circle(screen, BOARD_HIGHLIGHT, (x - 1.2, y - 1.2), CELL_SIZE // 2 - 2)
-                pygame.draw.circle(screen, BOARD_SHADOW, (x + 1.2, y + 1.2), CELL_SIZE // 2 - 2)
-                pygame.draw.circle(screen, BOARD_PRIMARY, (x, y), CELL_SIZE // 2 - 2.5)
+                pygame.draw.circle(self.screen, BOARD_HIGHLIGHT, (x - 1.2, y - 1.2), CELL_SIZE // 2 - 2)
+                pygame.draw.circle(self.screen, BOARD_SHADOW, (x + 1.2, y + 1.2), CELL_SIZE // 2 - 2)
+                pygame.draw.circle(self.screen, BOARD_PRIMARY, (x, y), CELL_SIZE // 2 - 2.5)
 
                 # Draw token
                 token_value = self.board[row][col]
-                pygame.draw.circle(screen, TOKEN_COLORS[token_value], (x, y), CELL_SIZE // 2 - 5)
+                pygame.draw.circle(self.screen, TOKEN_COLORS[token_value], (x, y), CELL_SIZE // 2 - 5)
 
                 # Add 3D shading to tokens (only for player tokens, not empty)
                 if token_value in TOKEN_SHADOW:
-                    pygame.draw.circle(screen, TOKEN_SHADOW[token_value], (x - 2, y - 2), CELL_SIZE // 2 - 10)
-                    pygame.draw.circle(screen, TOKEN_HIGHLIGHT[token_value], (x + 2, y + 2), CELL_SIZE // 2 - 10)
-                    pygame.draw.circle(screen, TOKEN_COLORS[token_value], (x, y), CELL_SIZE // 2 - 10.5)
+                    pygame.draw.circle(self.screen, TOKEN_SHADOW[token_value], (x - 2, y - 2), CELL_SIZE // 2 - 10)
+                    pygame.draw.circle(self.screen, TOKEN_HIGHLIGHT[token_value], (x + 2, y + 2), CELL_SIZE // 2 - 10)
+                    pygame.draw.circle(self.screen, TOKEN_COLORS[token_value], (x, y), CELL_SIZE // 2 - 10.5)
 
     def draw_main_menu(self):
         """Render the main menu screen."""
         self.draw_background()
 
-        # Draw menu container box
-        box_width, box_height = 420, 380
-        box_x = (WIDTH - box_width) // 2
-        box_y = (HEIGHT - box_height) // 2 - 10
+        # Draw menu container box, sized for the options but kept inside
+        # the window; the options share the space below the subtitle
+        box_width = min(420, self.width - 20)
+        box_height = min(200 + 70 * len(MENU_OPTIONS), self.height - 20)
+        option_step = min(70, (box_height - 200) / len(MENU_OPTIONS))
+        box_x = (self.width - box_width) // 2
+        box_y = max((self.height - box_height) // 2 - 10, 10)
         self.draw_menu_box(box_x, box_y, box_width, box_height)
 
         # Draw title
         title_surface = FONT_TITLE.render(MENU_TITLE, True, MENU_TITLE_COLOR)
-        title_rect = title_surface.get_rect(center=(WIDTH // 2, box_y + 55))
-        screen.blit(title_surface, title_rect)
+        title_rect = title_surface.get_rect(center=(self.width // 2, box_y + 55))
+        self.screen.blit(title_surface, title_rect)
 
         # Draw subtitle
         subtitle_surface = FONT_SMALL.render(MENU_SUBTITLE, True, MENU_SUBTITLE_COLOR)
-        subtitle_rect = subtitle_surface.get_rect(center=(WIDTH // 2, box_y + 105))
-        screen.blit(subtitle_surface, subtitle_rect)
+        subtitle_rect = subtitle_surface.get_rect(center=(self.width // 2, box_y + 105))
+        self.screen.blit(subtitle_surface, subtitle_rect)
 
-        # Draw options
+        # Draw options (without descriptions when there is no room for them)
         option_y = box_y + 155
         for key, name, description in MENU_OPTIONS:
             # Option header
             option_text = f"[{key}]  {name}"
             option_surface = FONT_MEDIUM.render(option_text, True, MENU_TEXT_COLOR)
-            option_rect = option_surface.get_rect(center=(WIDTH // 2, option_y))
-            screen.blit(option_surface, option_rect)
+            option_rect = option_surface.get_rect(center=(self.width // 2, option_y))
+            self.screen.blit(option_surface, option_rect)
 
             # Option description (smaller font)
-            desc_surface = FONT_TINY.render(description, True, MENU_SUBTITLE_COLOR)
-            desc_rect = desc_surface.get_rect(center=(WIDTH // 2, option_y + 28))
-            screen.blit(desc_surface, desc_rect)
+            if option_step >= 50:
+                desc_surface = FONT_TINY.render(description, True, MENU_SUBTITLE_COLOR)
+                desc_rect = desc_surface.get_rect(center=(self.width // 2, option_y + 0.4 * option_step))
+                self.screen.blit(desc_surface, desc_rect)
 
-            option_y += 70
+            option_y += option_step
 
         # Draw footer
         footer_surface = FONT_TINY.render(MENU_FOOTER, True, MENU_SUBTITLE_COLOR)
-        footer_rect = footer_surface.get_rect(center=(WIDTH // 2, box_y + box_height - 30))
-        screen.blit(footer_surface, footer_rect)
+        footer_rect = footer_surface.get_rect(center=(self.width // 2, box_y + box_height - 30))
+        self.screen.blit(footer_surface, footer_rect)
 
     def draw_end_screen(self):
         """Render the end game screen with board visible behind."""
@@ -139,14 +218,14 @@ class Game:
         self.draw_header()
 
         # Draw semi-transparent overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 160))
-        screen.blit(overlay, (0, 0))
+        self.screen.blit(overlay, (0, 0))
 
         # Draw result box
         box_width, box_height = 380, 250
-        box_x = (WIDTH - box_width) // 2
-        box_y = (HEIGHT - box_height) // 2
+        box_x = (self.width - box_width) // 2
+        box_y = (self.height - box_height) // 2
         self.draw_menu_box(box_x, box_y, box_width, box_height)
 
         # Draw result message
@@ -159,20 +238,20 @@ class Game:
             result_color = MENU_TEXT_COLOR  # White for draw
 
         result_surface = FONT_LARGE.render(result_text, True, result_color)
-        result_rect = result_surface.get_rect(center=(WIDTH // 2, box_y + 70))
-        screen.blit(result_surface, result_rect)
+        result_rect = result_surface.get_rect(center=(self.width // 2, box_y + 70))
+        self.screen.blit(result_surface, result_rect)
 
         # Draw instructions
         instruction_y = box_y + 140
         for instruction in END_MENU_INSTRUCTIONS:
             inst_surface = FONT_SMALL.render(instruction, True, MENU_TEXT_COLOR)
-            inst_rect = inst_surface.get_rect(center=(WIDTH // 2, instruction_y))
-            screen.blit(inst_surface, inst_rect)
+            inst_rect = inst_surface.get_rect(center=(self.width // 2, instruction_y))
+            self.screen.blit(inst_surface, inst_rect)
             instruction_y += 40
 
     def handle_player_move(self, column):
         """Process a player's move."""
-        valid_moves = get_valid_moves(self.board)
+        valid_moves = get_valid_moves(self.board, self.geometry)
         for move in valid_moves:
             if column == move[1]:
                 row = move[0]
@@ -180,9 +259,14 @@ class Game:
                 SOUND_MANAGER.play("drop")
 
                 self.move_count += 1
+                self.moves.append(column)
+                # The analyzed position is gone and the AI needs the CPU
+                if self.analysis is not None:
+                    self.analysis.pause()
 
-                if check_win(self.board, column, self.current_player):
+                if check_win(self.board, column, self.current_player, self.geometry):
                     self.game_result = True
+                    self.save_record(self.current_player)
                     # Show the winning move first
                     self.draw_background()
                     self.draw_board()
@@ -201,7 +285,7 @@ class Game:
     def handle_ai_move(self):
         """Process the AI's move."""
         column = self.ai_opponent.get_move(self.board, self.current_player)
-        valid_moves = get_valid_moves(self.board)
+        valid_moves = get_valid_moves(self.board, self.geometry)
 
         for move in valid_moves:
             if column == move[1]:
@@ -210,9 +294,11 @@ class Game:
                 SOUND_MANAGER.play("drop")
 
                 self.move_count += 1
+                self.moves.append(column)
 
-                if check_win(self.board, column, self.current_player):
+                if check_win(self.board, column, self.current_player, self.geometry):
                     self.game_result = False
+                    self.save_record(self.current_player)
                     # Show the losing move first
                     self.draw_background()
                     self.draw_board()
@@ -234,28 +320,28 @@ class Game:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     self.is_game_over = True
+                    self.close_analysis()
                     pygame.quit()
                     return
 
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         self.is_game_over = True
+                        self.close_analysis()
                         pygame.quit()
                         return
 
+                    if event.key == HINT_KEY and not self.show_menu and not self.show_end_screen:
+                        self.hints = not self.hints
+
                     if self.show_menu or self.show_end_screen:
-                        if event.key == pygame.K_1:
+                        # Number keys pick a difficulty level (any of them restarts)
+                        level = event.key - pygame.K_1
+                        if 0 <= level < len(DIFFICULTY_LEVELS):
                             SOUND_MANAGER.play("select")
                             if self.show_menu:
                                 self.show_menu = False
-                                self.ai_opponent = EasyAI()
-                            elif self.show_end_screen:
-                                self.reset_game()
-                        elif event.key == pygame.K_2:
-                            SOUND_MANAGER.play("select")
-                            if self.show_menu:
-                                self.show_menu = False
-                                self.ai_opponent = HardAI(depth=4)
+                                self.ai_opponent, self.ai_name = create_level_player(level, self.geometry)
                             elif self.show_end_screen:
                                 self.reset_game()
 
@@ -270,25 +356,42 @@ class Game:
                             pygame.display.update()
                             pygame.time.delay(400)
 
-            # Render based on game state
-            if self.show_menu:
-                self.draw_main_menu()
-            elif self.show_end_screen:
-                self.draw_end_screen()
-            else:
-                # AI's turn
-                if self.current_player == 2:
-                    self.handle_ai_move()
-
-                self.draw_background()
-                self.draw_board()
-                self.draw_header()
-
-                # Check for draw
-                if self.move_count == 42:
-                    self.game_result = None
-                    SOUND_MANAGER.play("draw")
-                    pygame.time.delay(1200)
-                    self.show_end_screen = True
+            # Analysis follows the state (it pauses while the AI thinks)
+            self.sync_analysis()
+
+            # AI's turn
+            if not self.show_menu and not self.show_end_screen and self.current_player == 2:
+                self.handle_ai_move()
+
+            self.render_frame()
+
+            # Check for draw (a win on the last cell has already ended the game)
+            playing = not self.show_menu and not self.show_end_screen
+            if playing and self.move_count == self.geometry.cells:
+                self.game_result = None
+                self.save_record(0)
+                SOUND_MANAGER.play("draw")
+                pygame.time.delay(1200)
+                self.show_end_screen = True
 
             pygame.display.update()
+
+    def render_frame(self):
+        """Draw the current state (menu, end screen or game) without updating the display."""
+        if self.show_menu:
+            self.draw_main_menu()
+        elif self.show_end_screen:
+            self.draw_end_screen()
+        else:
+            self.draw_background()
+            self.draw_board()
+            self.draw_header()
+
+
+def format_hint(score):
+    """Short text of an analysis score for the player to move."""
+    if score >= WIN_SCORE:
+        return "win"
+    if score <= -WIN_SCORE:
+        return "loss"
+    return f"{round(score):+d}"
@@ -0,0 +1,171 @@
+"""
+Board geometry.
+
+Describes the size of the board and the number of tokens needed to win,
+and precomputes the tables the engines use to detect wins and evaluate
+positions. Tables are built once per geometry and shared by every board
+of that size.
+"""
+
+from functools import lru_cache
+
+# Direction vectors (row_delta, col_delta) of the four kinds of line
+LINE_DIRECTIONS = [
+    (0, 1),   # Horizontal
+    (1, 0),   # Vertical
+    (1, 1),   # Diagonal (down-right)
+    (1, -1)   # Diagonal (down-left)
+]
+
+
+class BoardGeometry:
+    """
+    Size of a board and its precomputed line tables.
+
+    Tables:
+    - lines: Every winning line as a tuple of (row, col) cells
+    - cell_lines: For each cell, the indices of the lines through it
+    - position_values: For each cell, the number of lines through it
+      (the classic centre-weighted table on the standard board)
+    - win_rays: For each cell and direction, the cells on each side of it,
+      up to winning_length - 1 away, used to detect wins
+    - threat_rays: For each cell, the 8 rays starting at the cell itself,
+      winning_length - 1 cells long, used for threat evaluation
+    """
+
+    def __init__(self, rows=6, columns=7, winning_length=4):
+        """
+        Args:
+            rows: Number of rows (default: 6)
+            columns: Number of columns (default: 7)
+            winning_length: Tokens in a row needed to win (default: 4)
+        """
+        if winning_length > max(rows, columns):
+            raise ValueError("Winning length does not fit on the board")
+
+        self.rows = rows
+        self.columns = columns
+        self.winning_length = winning_length
+        self.cells = rows * columns
+
+        self.lines = self._build_lines()
+        self.cell_lines = [[[] for _ in range(columns)] for _ in range(rows)]
+        for index, line in enumerate(self.lines):
+            for row, col in line:
+                self.cell_lines[row][col].append(index)
+        self.position_values = [
+            [len(self.cell_lines[row][col]) for col in range(columns)]
+            for row in range(rows)
+        ]
+
+        self.win_rays = [
+            [self._build_win_rays(row, col) for col in range(columns)]
+            for row in range(rows)
+        ]
+        self.threat_rays = [
+            [self._build_threat_rays(row, col) for col in range(columns)]
+            for row in range(rows)
+        ]
+
+    def __repr__(self):
+        return f"BoardGeometry({self.rows}, {self.columns}, {self.winning_length})"
+
+    def __eq__(self, other):
+        return isinstance(other, BoardGeometry) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __reduce__(self):
+        # Pickle as the dimensions only; tables are rebuilt (and cached)
+        return (get_geometry, self.key())
+
+    def key(self):
+        """Return the (rows, columns, winning_length) tuple."""
+        return (self.rows, self.columns, self.winning_length)
+
+    @property
+    def name(self):
+        """Short name such as "7x6" or "9x7:5" (columns x rows)."""
+        name = f"{self.columns}x{self.rows}"
+        if self.winning_length != 4:
+            name += f":{self.winning_length}"
+        return name
+
+    def empty_board(self):
+        """Return a new empty board as a list of rows."""
+        return [[0] * self.columns for _ in range(self.rows)]
+
+    def in_bounds(self, row, col):
+        """Check whether a cell is on the board."""
+        return 0 <= row < self.rows and 0 <= col < self.columns
+
+    def _ray(self, row, col, row_delta, col_delta, length):
+        """Cells from (row, col) in a direction, stopping at the edge."""
+        cells = []
+        for i in range(length):
+            r, c = row + row_delta * i, col + col_delta * i
+            if not self.in_bounds(r, c):
+                break
+            cells.append((r, c))
+        return tuple(cells)
+
+    def _build_lines(self):
+        lines = []
+        for row in range(self.rows):
+            for col in range(self.columns):
+                for row_delta, col_delta in LINE_DIRECTIONS:
+                    line = self._ray(row, col, row_delta, col_delta, self.winning_length)
+                    if len(line) == self.winning_length:
+                        lines.append(line)
+        return lines
+
+    def _build_win_rays(self, row, col):
+        length = self.winning_length
+        rays = []
+        for row_delta, col_delta in LINE_DIRECTIONS:
+            forward = self._ray(row, col, row_delta, col_delta, length)[1:]
+            backward = self._ray(row, col, -row_delta, -col_delta, length)[1:]
+            rays.append((forward, backward))
+        return rays
+
+    def _build_threat_rays(self, row, col):
+        rays = []
+        for row_delta, col_delta in LINE_DIRECTIONS:
+            for sign in (1, -1):
+                rays.append(self._ray(row, col, sign * row_delta, sign * col_delta,
+                                      self.winning_length - 1))
+        return rays
+
+
+@lru_cache(maxsize=None)
+def get_geometry(rows=6, columns=7, winning_length=4):
+    """Return the shared geometry for these dimensions (tables built once)."""
+    return BoardGeometry(rows, columns, winning_length)
+
+
+def parse_geometry(spec):
+    """
+    Parse a geometry name such as "7x6", "8x7" or "9x7:5".
+
+    The name is columns x rows, optionally followed by the winning length.
+    """
+    size, _, length = spec.partition(":")
+    columns, _, rows = size.lower().partition("x")
+    try:
+        rows, columns, length = int(rows), int(columns), int(length) if length else 4
+    except ValueError:
+        raise ValueError(f"Invalid board geometry '{spec}' (expected e.g. 7x6 or 9x7:5)")
+    return get_geometry(rows, columns, length)
+
+
+# Standard Connect 4 board: 7 columns, 6 rows, 4 in a row
+STANDARD_GEOMETRY = get_geometry(6, 7, 4)
+
+# Variants used by the benchmarks and available to every runner
+GEOMETRIES = {
+    "7x6": STANDARD_GEOMETRY,
+    "8x7": get_geometry(7, 8, 4),
+    "9x7": get_geometry(7, 9, 4),
+    "9x8:5": get_geometry(8, 9, 5),
+}
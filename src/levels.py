@@ -0,0 +1,67 @@
+"""
+Difficulty levels of the game and the tournament runner.
+
+Above Easy, every level is the same PVS search with a node budget per
+move instead of a depth: it deepens one move at a time and plays the
+result of the deepest search that finished within its nodes (see
+HardAI). A budget gives the same move on every machine, and the time a
+move takes is roughly proportional to it, so each level thinks for a
+steady, predictable time whatever the position.
+
+Latency and strength were measured with:
+
+    python tournament.py --levels --stats levels.json
+"""
+
+from src.geometry import STANDARD_GEOMETRY
+from src.players.easy_ai import EasyAI
+from src.players.hard_ai import HardAI
+
+# Search depth of the budgeted levels: deeper than any budget reaches, so
+# only the nodes stop the search
+LEVEL_DEPTH = 42
+LEVEL_MODE = "pvs"
+
+# (name, menu label, menu description, nodes per move or None for the
+# Easy AI); the menu key of a level is its position in the list. Names
+# must not clash with engine names ("hard" alone is the depth-4 Hard AI)
+DIFFICULTY_LEVELS = [
+    ("easy", "Easy", "Random + basic strategy", None),
+    ("casual", "Casual", "Search, 250 nodes per move", 250),
+    ("medium", "Medium", "Search, 2,000 nodes per move", 2_000),
+    ("advanced", "Advanced", "Search, 15,000 nodes per move", 15_000),
+    ("expert", "Expert", "Search, 60,000 nodes per move", 60_000),
+]
+
+
+def level_spec(nodes):
+    """Tournament player spec of a level's node budget."""
+    if nodes is None:
+        return "easy"
+    return f"hard:depth={LEVEL_DEPTH},mode={LEVEL_MODE},nodes={nodes}"
+
+
+LEVEL_SPECS = {name: level_spec(nodes) for name, _, _, nodes in DIFFICULTY_LEVELS}
+
+
+def resolve_level(spec):
+    """Player spec of a level name; any other spec is returned unchanged."""
+    return LEVEL_SPECS.get(spec, spec)
+
+
+def create_level_player(index, geometry=STANDARD_GEOMETRY):
+    """
+    Create the AI of a difficulty level.
+
+    Args:
+        index: Position of the level in DIFFICULTY_LEVELS
+        geometry: Board geometry to play on
+
+    Returns:
+        Tuple of (AI instance, player spec)
+    """
+    nodes = DIFFICULTY_LEVELS[index][3]
+    if nodes is None:
+        return EasyAI(geometry=geometry), level_spec(nodes)
+    ai = HardAI(depth=LEVEL_DEPTH, mode=LEVEL_MODE, max_nodes=nodes, geometry=geometry)
+    return ai, level_spec(nodes)
@@ -1,6 +1,7 @@
 import random
-import numpy as np
-from src.functions import drop_token, check_win, get_opponent, get_available_columns
+from src.forced_moves import find_forced_moves
+from src.functions import get_available_columns
+from src.geometry import STANDARD_GEOMETRY
 
 
 class EasyAI:
@@ -13,6 +14,16 @@ class EasyAI:
     - Otherwise plays randomly
     """
 
+    def __init__(self, geometry=STANDARD_GEOMETRY):
+        """
+        Args:
+            geometry: Board geometry to play on (default: standard 7x6)
+        """
+        self.geometry = geometry
+        # Moves chosen, and how many of them were a win or a block
+        self.moves_played = 0
+        self.moves_forced = 0
+
     def get_move(self, board, player):
         """
         Determine the best column to play.
@@ -24,20 +35,14 @@ class EasyAI:
         Returns:
             Column number to play
         """
-        board_copy = np.copy(board)
-        available_columns = get_available_columns(board_copy)
-        opponent = get_opponent(player)
-
-        for col in available_columns:
-            # Check if this move wins the game
-            attack_board = drop_token(board_copy, col, player)
-            if check_win(attack_board, col, player):
-                return col
+        self.moves_played += 1
+        wins, blocks, _ = find_forced_moves(board, player, self.geometry)
 
-            # Check if opponent would win here (must block)
-            defense_board = drop_token(board_copy, col, opponent)
-            if check_win(defense_board, col, opponent):
-                return col
+        # First column (in column order) that wins the game or blocks the opponent
+        forced = sorted(set(wins) | set(blocks))
+        if forced:
+            self.moves_forced += 1
+            return forced[0]
 
         # No immediate win or block needed - play randomly
-        return random.choice(available_columns)
+        return random.choice(get_available_columns(board, self.geometry))
@@ -1,136 +1,226 @@
+import time
 import numpy as np
+from multiprocessing import Pool, cpu_count
 from src.functions import (
-    get_valid_moves, get_opponent, is_board_empty,
-    minimax, evaluate_terminal_state, evaluate_position
+    get_valid_moves, get_opponent, is_board_empty, evaluate_position
 )
+from src.forced_moves import forced_move
+from src.geometry import STANDARD_GEOMETRY
+from src.search import SEARCH_MODES, SearchAborted, create_search
+from src.shared_table import SharedTranspositionTable, namespace_for
+from src.weights import EvaluationWeights, load_weights
 
+# Search state of a worker process per (weights, mode, shared table),
+# kept between root moves and calls
+_worker_searches = {}
 
-class GameTreeNode:
-    """
-    Represents a node in the minimax game tree.
-
-    Each node contains:
-    - The board state after a move
-    - The player who made the move
-    - The move coordinates [row, col]
-    - The evaluation value
-    - Child nodes representing possible future moves
-    """
-
-    def __init__(self, value, board, player, move, depth):
-        self.value = value
-        self.board = board
-        self.player = player
-        self.move = move
-        self.depth = depth
-        self.children = []
-
-    def build_tree(self, player, parent_nodes, boards, maximizing_player):
-        """
-        Recursively build the game tree from this node.
-
-        Args:
-            player: Current player to move
-            parent_nodes: List of parent nodes at current level
-            boards: List of board states corresponding to parent nodes
-            maximizing_player: The player we're optimizing for
-        """
-        if self.depth == 0:
-            return
-
-        child_nodes = []
-        child_boards = []
-        terminal_nodes = []
-
-        for i, (parent, board) in enumerate(zip(parent_nodes, boards)):
-            valid_moves = get_valid_moves(board)
 
-            for move in valid_moves:
-                row, col = move[0], move[1]
-                new_board = np.copy(board)
-                new_board[row][col] = player
+def create_table(shared_table, weights, mode):
+    """Attach to a shared transposition table block, or None for a private table."""
+    if shared_table is None:
+        return None
+    return SharedTranspositionTable(shared_table, geometry=weights.geometry,
+                                    namespace=namespace_for(weights, mode))
 
-                child = GameTreeNode(0, new_board, player, move, self.depth)
 
-                # Check for terminal state (win)
-                is_terminal, score = evaluate_terminal_state(
-                    child.board, child.player, maximizing_player, col
-                )
+def score_root_move(args):
+    """
+    Score a single root move in a worker process.
 
-                if is_terminal:
-                    # Multiply by depth to prefer faster wins
-                    child.value = score * (self.depth + 1)
-                    child.children = []
-                    terminal_nodes.append(child)
-                else:
-                    child_nodes.append(child)
-                    child_boards.append(new_board)
+    Each root move is independent of its siblings, so the search can be
+    split across worker processes and still produce the same values as
+    searching the whole tree at once.
 
-                parent.children.append(child)
+    Args:
+        args: Tuple of (board, player, column, depth, deadline, weights,
+              mode, shared table name or None)
 
-        self.depth -= 1
-        self.build_tree(
-            get_opponent(player),
-            child_nodes,
-            child_boards,
-            maximizing_player
-        )
+    Returns:
+        Minimax value of the move for the player, or None if the
+        deadline passed first
+    """
+    board, player, column, depth, deadline, weights, mode, shared_table = args
+    key = (weights, mode, shared_table)
+    if key not in _worker_searches:
+        table = create_table(shared_table, weights, mode)
+        _worker_searches[key] = create_search(mode, weights.geometry, weights, table)
+    try:
+        return _worker_searches[key].score_move(board, player, column, depth, deadline)
+    except SearchAborted:
+        return None
 
 
 class HardAI:
     """
     Hard difficulty AI using the Minimax algorithm.
 
-    Uses a game tree with configurable search depth to find
-    the optimal move. Includes position evaluation heuristics
-    for non-terminal states.
+    Searches the game tree depth-first to a configurable depth,
+    caching positions (and their mirror images) in a transposition
+    table. Includes position evaluation heuristics for non-terminal
+    states. Root moves can be searched in parallel across several
+    worker processes.
     """
 
-    def __init__(self, depth=4):
+    def __init__(self, depth=4, workers=1, time_limit=None, geometry=STANDARD_GEOMETRY,
+                 max_nodes=None, weights=None, mode="minimax", shared_table=None, forced=True):
         """
         Initialize the AI with a search depth.
 
         Args:
             depth: How many moves ahead to search (default: 4)
+            workers: Number of processes used to split the root moves
+                     (default: 1, None uses every available core)
+            time_limit: Seconds allowed per move (default: None, no limit).
+                        When set, the search deepens one move at a time up
+                        to depth and plays the result of the deepest search
+                        that finished in time.
+            geometry: Board geometry to play on (default: standard 7x6)
+            max_nodes: Nodes searched per move (default: None, no limit).
+                       Deepens like time_limit, but plays the same move on
+                       every machine. Only counted in serial searches.
+            weights: EvaluationWeights or path of a weights file written by
+                     tune.py (default: the hand-picked weights)
+            mode: Search mode, one of "minimax" (default), "alphabeta",
+                  "pvs" or "mtdf" (see src/search.py). Every mode plays
+                  the same moves; the alpha-beta modes visit fewer nodes.
+            shared_table: Name of a SharedTranspositionTable block (see
+                          src/shared_table.py) to search with instead of a
+                          private table; other processes attached to it,
+                          including the root-splitting workers, share
+                          every searched position
+            forced: Play forced moves (a single win, a single block or
+                    the only move that does not hand the opponent a win,
+                    see src/forced_moves.py) without searching. The
+                    search would pick the same moves (default: True)
+
+        Raises:
+            ValueError: If the weights are for another board geometry or
+                        the mode is unknown
         """
         self.search_depth = depth
-
-    def find_best_move(self, root_node, depth, maximizing_player):
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+        self.geometry = geometry
+        self.workers = workers if workers is not None else cpu_count()
+        if isinstance(weights, str):
+            weights = load_weights(weights)
+        self.weights = weights if weights is not None else EvaluationWeights(geometry=geometry)
+        if self.weights.geometry != geometry:
+            raise ValueError(f"Weights are for the {self.weights.geometry.name} board")
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{mode}'")
+        self.mode = mode
+        self.shared_table = shared_table
+        self.search = create_search(mode, geometry, self.weights,
+                                    create_table(shared_table, self.weights, mode))
+        # Event (or any object with is_set) that stops the current search
+        # early; the move from the deepest finished iteration is played
+        self.stop_event = None
+        self._pool = None
+        self.forced = forced
+        # Searched or forced moves chosen, and how many were forced
+        self.moves_played = 0
+        self.moves_forced = 0
+
+    def __getstate__(self):
+        # Worker pools and events cannot be pickled; a copy starts without them
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        state["stop_event"] = None
+        return state
+
+    def close(self):
+        """Shut down the worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def score_moves(self, board, player, depth, deadline=None, node_limit=None):
         """
-        Find the best move using the minimax algorithm.
+        Score every valid move for the player.
 
         Args:
-            root_node: Root of the game tree
+            board: Current game board state (NumPy array)
+            player: Current player number
             depth: Search depth
+            deadline: time.time() value after which the search gives up
+            node_limit: Value of self.search.nodes at which a serial search
+                        gives up
+
+        Returns:
+            List of (move, board_after_move, score) tuples in column order.
+            In the alpha-beta modes, moves worse than the best may only
+            get an upper bound on their score.
+
+        Raises:
+            SearchAborted: If the deadline passes, the node limit is reached
+                           or stop_event is set before every move is scored
+        """
+        valid_moves = get_valid_moves(board, self.geometry)
+
+        if self.workers > 1 and len(valid_moves) > 1:
+            if self._pool is None:
+                self._pool = Pool(self.workers)
+            board_list = board.tolist()
+            tasks = [
+                (board_list, player, move[1], depth, deadline, self.weights, self.mode,
+                 self.shared_table)
+                for move in valid_moves
+            ]
+            scores = self._pool.map(score_root_move, tasks)
+            if None in scores:
+                raise SearchAborted()
+        else:
+            scores = self.search.score_root_moves(
+                board, player, [move[1] for move in valid_moves], depth,
+                deadline, self.stop_event, node_limit
+            )
+
+        results = []
+        for move, score in zip(valid_moves, scores):
+            new_board = np.copy(board)
+            new_board[move[0]][move[1]] = player
+            results.append((move, new_board, score))
+        return results
+
+    def find_best_move(self, scored_moves, maximizing_player):
+        """
+        Pick the best move from the scored root moves.
+
+        Args:
+            scored_moves: List of (move, board_after_move, score) tuples
             maximizing_player: Player to optimize for
 
         Returns:
             Best column to play
         """
-        best_score = minimax(root_node, depth, maximizing_player)
-        best_children = []
+        best_score = max(score for _, _, score in scored_moves)
 
         # Find all moves with the best score
-        for child in root_node.children:
-            if child.value == best_score:
-                best_children.append(child)
+        best_children = [
+            (move, child_board) for move, child_board, score in scored_moves
+            if score == best_score
+        ]
 
         if len(best_children) == 1:
-            return best_children[0].move[1]
+            return best_children[0][0][1]
 
         # Multiple moves with same score - use position evaluation as tiebreaker
         move_scores = {}
-        for child in best_children:
+        for move, child_board in best_children:
             score = evaluate_position(
-                child.player,
-                get_opponent(child.player),
-                child.board,
-                child.move,
                 maximizing_player,
-                opponent_weight=5,
-                player_weight=10
+                get_opponent(maximizing_player),
+                child_board,
+                move,
+                maximizing_player,
+                opponent_weight=self.weights.opponent_weight,
+                player_weight=self.weights.player_weight,
+                geometry=self.geometry,
+                cell_values=self.weights.cell_values
             )
-            move_scores[score] = child.move[1]
+            move_scores[score] = move[1]
 
         best_score = max(move_scores.keys())
         return move_scores[best_score]
@@ -152,20 +242,64 @@ class HardAI:
         if is_board_empty(board_copy):
             return len(board[0]) // 2
 
-        # Build game tree and find best move
-        root_node = GameTreeNode(
-            value=0,
-            board=board_copy,
-            player=get_opponent(player),
-            move=None,
-            depth=self.search_depth
-        )
-
-        root_node.build_tree(
-            player=player,
-            parent_nodes=[root_node],
-            boards=[board_copy],
-            maximizing_player=player
-        )
-
-        return self.find_best_move(root_node, self.search_depth, player)
+        self.moves_played += 1
+        if self.forced:
+            # Only a search of two plies or more sees the opponent's reply
+            column = forced_move(board_copy, player, self.geometry, lookahead=self.search_depth >= 2)
+            if column is not None:
+                self.moves_forced += 1
+                return column
+
+        limited = self.time_limit is not None or self.max_nodes is not None
+        if not limited and self.stop_event is None:
+            scored_moves = self.score_moves(board_copy, player, self.search_depth)
+            return self.find_best_move(scored_moves, player)
+
+        deadline = time.time() + self.time_limit if self.time_limit is not None else None
+        for _, scored_moves in self.iterative_deepening(
+            board_copy, player, self.search_depth, deadline, self.max_nodes
+        ):
+            pass
+        return self.find_best_move(scored_moves, player)
+
+    def principal_variation(self, board, player, column, depth):
+        """
+        Expected line of play after a searched root move (1-ply with
+        parallel workers, whose tables live in other processes, unless
+        they share a table).
+
+        Returns:
+            List of columns, starting with the root move
+        """
+        if self.workers > 1 and self.shared_table is None:
+            return [column]
+        return self.search.principal_variation(board, player, column, depth)
+
+    def iterative_deepening(self, board, player, max_depth, deadline=None, max_nodes=None):
+        """
+        Search one move deeper at a time.
+
+        The first ply always completes. Later depths stop at the deadline,
+        after max_nodes nodes or when stop_event is set, and the depth
+        that was cut short is not yielded. Deepening ends once a search
+        reaches the end of the game, since a deeper one sees nothing more.
+
+        Args:
+            board: Current game board state (NumPy array)
+            player: Current player number
+            max_depth: Deepest search to run
+            deadline: time.time() value after which the search gives up
+            max_nodes: Nodes allowed over all depths
+
+        Yields:
+            Tuples of (depth, scored_moves) for every finished depth
+        """
+        node_limit = self.search.nodes + max_nodes if max_nodes is not None else None
+        max_depth = min(max_depth, int(np.count_nonzero(np.asarray(board) == 0)))
+        yield 1, self.score_moves(board, player, 1)
+        for depth in range(2, max_depth + 1):
+            try:
+                scored_moves = self.score_moves(board, player, depth, deadline, node_limit)
+            except SearchAborted:
+                return
+            yield depth, scored_moves
@@ -1,20 +1,28 @@
 from src.functions import get_valid_moves
+from src.geometry import STANDARD_GEOMETRY
 
 
 class HumanPlayer:
     """Human player that gets moves via console input."""
 
+    def __init__(self, geometry=STANDARD_GEOMETRY):
+        """
+        Args:
+            geometry: Board geometry to play on (default: standard 7x6)
+        """
+        self.geometry = geometry
+
     def get_move(self, board, player):
         """
         Prompt the user to enter a column number.
         Validates that the column is not full.
         """
-        valid_moves = get_valid_moves(board)
+        valid_moves = get_valid_moves(board, self.geometry)
         valid_columns = [move[1] for move in valid_moves]
 
         while True:
             try:
-                column = int(input("Enter column number (0-6): "))
+                column = int(input(f"Enter column number (0-{self.geometry.columns - 1}): "))
                 if column in valid_columns:
                     return column
                 print("This column is full! Choose another.")
@@ -0,0 +1,141 @@
+"""
+Game records.
+
+A game is stored as one line of text: the moves as a string of
+1-indexed column digits (so "4453" is centre, centre, then the columns
+either side), the result, and optional key=value metadata, separated by
+tabs:
+
+    4453326...    1    player1=hard:depth=4    player2=easy
+
+The result uses the same codes as the rest of the game: 1 or 2 for the
+winning player, 0 for a draw and * for an unfinished game. Games played
+on another board size carry it in a board=... field (e.g. board=9x7).
+Lines starting with # are comments.
+"""
+
+from src.geometry import STANDARD_GEOMETRY, parse_geometry
+
+UNFINISHED = "*"
+
+
+class GameRecord:
+    """A played game: its moves, result and metadata."""
+
+    def __init__(self, moves, result=UNFINISHED, metadata=None):
+        """
+        Args:
+            moves: List of 0-indexed columns in the order they were played
+            result: Winning player (1 or 2), 0 for a draw or "*" if unfinished
+            metadata: Dict of extra string fields (players, date, seed, ...)
+        """
+        self.moves = list(moves)
+        self.result = result
+        self.metadata = dict(metadata or {})
+
+    @property
+    def geometry(self):
+        """Board geometry the game was played on (standard if not recorded)."""
+        if "board" in self.metadata:
+            return parse_geometry(self.metadata["board"])
+        return STANDARD_GEOMETRY
+
+    @property
+    def move_string(self):
+        """The moves as 1-indexed column digits."""
+        return "".join(str(column + 1) for column in self.moves)
+
+    def to_line(self):
+        """Serialize the record to one line of text (without newline)."""
+        fields = [self.move_string, str(self.result)]
+        fields += [f"{key}={value}" for key, value in self.metadata.items()]
+        return "\t".join(fields)
+
+    @classmethod
+    def from_line(cls, line):
+        """
+        Parse a record from one line of text.
+
+        Raises:
+            ValueError: If the line is not a valid record
+        """
+        fields = line.rstrip("\n").split("\t")
+        result = fields[1] if len(fields) > 1 else UNFINISHED
+        result = int(result) if result != UNFINISHED else UNFINISHED
+
+        metadata = {}
+        for field in fields[2:]:
+            key, separator, value = field.partition("=")
+            if not separator:
+                raise ValueError(f"Invalid metadata field '{field}'")
+            metadata[key] = value
+
+        record = cls([], result, metadata)
+        record.moves = parse_move_string(fields[0], record.geometry)
+        return record
+
+
+def parse_move_string(move_string, geometry=STANDARD_GEOMETRY):
+    """
+    Convert a move string such as "4453" to 0-indexed columns.
+
+    Boards of up to 9 columns can be written with one digit per move.
+
+    Raises:
+        ValueError: If a character is not a column digit of the board
+    """
+    moves = []
+    for char in move_string.strip():
+        if not char.isdigit() or not 1 <= int(char) <= geometry.columns:
+            raise ValueError(f"Invalid column '{char}' in move string '{move_string}'")
+        moves.append(int(char) - 1)
+    return moves
+
+
+def append_record(path, record):
+    """Append a single record to a record file."""
+    with open(path, "a") as file:
+        file.write(record.to_line() + "\n")
+
+
+def write_records(path, records):
+    """Append several records to a record file."""
+    with open(path, "a") as file:
+        for record in records:
+            file.write(record.to_line() + "\n")
+
+
+def read_records(path):
+    """
+    Iterate over the records of a record file.
+
+    Blank lines and # comments are skipped.
+    """
+    with open(path) as file:
+        for line in file:
+            if line.strip() and not line.startswith("#"):
+                yield GameRecord.from_line(line)
+
+
+def replay(moves, geometry=STANDARD_GEOMETRY):
+    """
+    Replay a game, keeping one board and the column heights.
+
+    The same board is updated in place; copy it to keep a position.
+
+    Yields:
+        Tuples of (board before the move, player to move, column played)
+
+    Raises:
+        ValueError: If a move is played in a full column
+    """
+    board = geometry.empty_board()
+    heights = [0] * geometry.columns
+    player = 1
+    for column in moves:
+        if heights[column] >= geometry.rows:
+            raise ValueError(f"Column {column + 1} is full")
+        yield board, player, column
+        board[geometry.rows - 1 - heights[column]][column] = player
+        heights[column] += 1
+        player = 3 - player
@@ -0,0 +1,551 @@
+"""
+Depth-first minimax search used by the Hard AI.
+
+Scores positions with the same rules as the original game tree
+(threat and position evaluation at the leaves, a depth bonus for faster
+wins) but walks the tree depth-first on a single board instead of
+building it in memory. Positions reached through different move orders,
+or as each other's mirror image, are searched once and shared through
+a transposition table.
+
+AlphaBetaSearch prunes the same tree with alpha-beta bounds, as plain
+alpha-beta, principal variation search (PVS) or MTD(f). Values inside
+the search window are the same as the full minimax values, and the Hard
+AI picks the same moves in every mode.
+"""
+
+import time
+import numpy as np
+from src.functions import (
+    check_win, get_opponent, evaluate_position, board_key, canonical_key, mirror_column, WIN_SCORE
+)
+from src.geometry import STANDARD_GEOMETRY
+from src.weights import EvaluationWeights
+
+
+# =============================================================================
+# Transposition Table
+# =============================================================================
+
+# How a stored value relates to the true value of the position
+EXACT, LOWER, UPPER = 0, 1, 2
+
+class TranspositionTable:
+    """
+    Cache of searched positions keyed on the mirror-canonical board.
+
+    A position and its mirror image share one entry. The best column is
+    stored in the canonical orientation and mirrored back on lookup.
+    """
+
+    def __init__(self, max_entries=500_000, geometry=STANDARD_GEOMETRY):
+        """
+        Args:
+            max_entries: Entry count at which the table is cleared
+            geometry: Board geometry of the stored positions
+        """
+        self.max_entries = max_entries
+        self.geometry = geometry
+        self.entries = {}
+        self.probes = 0
+        self.hits = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def probe(self, key, mirrored):
+        """
+        Look up a position.
+
+        Args:
+            key: Table key built from the canonical board key
+            mirrored: Whether the searched board is the mirror of the key
+
+        Returns:
+            Tuple of (value, best_column, bound) or None if the position
+            is unknown, bound being EXACT, LOWER or UPPER
+        """
+        self.probes += 1
+        entry = self.peek(key, mirrored)
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def peek(self, key, mirrored):
+        """Look up a position without counting it in the hit rate."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        value, column, bound = entry
+        if mirrored and column is not None:
+            column = mirror_column(column, self.geometry)
+        return (value, column, bound)
+
+    def store(self, key, mirrored, value, column, bound=EXACT):
+        """Store a searched position, converting the column to the canonical side."""
+        if len(self.entries) >= self.max_entries:
+            self.entries.clear()
+        if mirrored and column is not None:
+            column = mirror_column(column, self.geometry)
+        self.entries[key] = (value, column, bound)
+
+    def hit_rate(self):
+        """Fraction of probes answered from the table."""
+        return self.hits / self.probes if self.probes else 0.0
+
+
+# =============================================================================
+# Minimax Search
+# =============================================================================
+
+class SearchAborted(Exception):
+    """Raised when a search runs past its deadline or node limit, or is asked to stop."""
+
+
+# The deadline and stop event are only checked every this many nodes (must
+# be a power of two); a node limit is checked at the exact node
+LIMIT_CHECK_INTERVAL = 1024
+
+# Search modes: full minimax and the alpha-beta variants
+SEARCH_MODES = ("minimax", "alphabeta", "pvs", "mtdf")
+
+INFINITY = float("inf")
+
+# Width of null-window searches. Values are integers with the default
+# weights; any positive width gives the same values, only the number of
+# re-searches changes
+NULL_WINDOW = 1
+
+# Root moves scoring within this of the best move are ties
+TIE_MARGIN = 1e-6
+
+# Root move values kept for move ordering and MTD(f) before they are
+# cleared, like the entries of a full transposition table
+MAX_GUESSES = 100_000
+
+
+def to_list_board(board):
+    """Return a mutable list-of-lists copy of the board with plain ints."""
+    return np.asarray(board).tolist()
+
+
+class MinimaxSearch:
+    """
+    Minimax search in negamax form.
+
+    Each value is given from the point of view of the player who just
+    moved, which is the original minimax value with the sign flipped on
+    the opponent's turns. Values do not depend on which player the search
+    is run for, so the table can be kept across moves and games.
+    """
+
+    def __init__(self, table=None, geometry=STANDARD_GEOMETRY, weights=None):
+        """
+        Args:
+            table: Transposition table to share (default: a new one)
+            geometry: Board geometry to search on
+            weights: EvaluationWeights of the leaf evaluation
+                     (default: the hand-picked weights)
+        """
+        self.geometry = geometry
+        self.weights = weights if weights is not None else EvaluationWeights(geometry=geometry)
+        self.table = table if table is not None else TranspositionTable(geometry=geometry)
+        # Children are generated in column order; the value of a position
+        # does not depend on it, only the number of nodes visited would
+        self.column_order = list(range(geometry.columns))
+        self.nodes = 0
+        self.deadline = None
+        self.stop_event = None
+        self.node_limit = None
+        # Nodes counter value at which the limits are next checked
+        self.next_check = LIMIT_CHECK_INTERVAL
+
+    def score_move(self, board, player, column, depth, deadline=None, stop_event=None,
+                   node_limit=None, threshold=None):
+        """
+        Score dropping a token in a column.
+
+        Args:
+            board: Current game board state
+            player: Player making the move
+            column: Column to play
+            depth: Search depth, counting this move
+            deadline: time.time() value after which the search gives up
+            stop_event: Event (threading or multiprocessing) that stops
+                        the search when set
+            node_limit: Value of the nodes counter at which the search
+                        gives up
+            threshold: If given, the exact value is only needed when it is
+                       above the threshold; otherwise any value at or below
+                       it may be returned
+
+        Returns:
+            Minimax value of the move for the player
+
+        Raises:
+            SearchAborted: If the deadline passes, the node limit is reached
+                           or the stop event is set before the search ends
+        """
+        self.deadline = deadline
+        self.stop_event = stop_event
+        self.node_limit = node_limit
+        self.next_check = self.check_point()
+        board = to_list_board(board)
+        row = drop_row(board, column, self.geometry)
+        board[row][column] = player
+        self.nodes += 1
+
+        # Winning root move gets the same depth bonus as in the full tree
+        if check_win(board, column, player, self.geometry):
+            return WIN_SCORE * (depth + 1)
+        return self.value(board, player, (row, column), depth - 1, threshold)
+
+    def score_root_moves(self, board, player, columns, depth, deadline=None, stop_event=None,
+                         node_limit=None):
+        """
+        Score every root move well enough to pick the best.
+
+        The best moves, and every move tied with them, get their exact
+        value. Other moves may only be shown to be worse.
+
+        Returns:
+            List of scores in the order of columns
+        """
+        scores = {}
+        best = None
+        for column in self.root_order(board, player, columns):
+            threshold = None if best is None else best - TIE_MARGIN
+            score = self.score_move(board, player, column, depth, deadline, stop_event,
+                                    node_limit, threshold)
+            scores[column] = score
+            if best is None or score > best:
+                best = score
+        return [scores[column] for column in columns]
+
+    def root_order(self, board, player, columns):
+        """Order in which root moves are searched."""
+        return columns
+
+    def value(self, board, player, move, depth, threshold=None):
+        """Value of the position after a root move (always exact here)."""
+        return self.negamax(board, player, move, depth)
+
+    def evaluate_leaf(self, board, player, move):
+        """Evaluate the last move of a line, for the player who made it."""
+        weights = self.weights
+        return evaluate_position(
+            player, get_opponent(player), board, move, player,
+            opponent_weight=weights.opponent_weight, player_weight=weights.player_weight,
+            geometry=self.geometry, cell_values=weights.cell_values
+        )
+
+    def principal_variation(self, board, player, column, depth):
+        """
+        Expected line of play after a root move, read from the table.
+
+        Follows the best reply stored for each position of the line, so
+        it is only complete right after that move has been searched.
+
+        Returns:
+            List of columns, starting with the root move
+        """
+        geometry = self.geometry
+        board = to_list_board(board)
+        row = drop_row(board, column, geometry)
+        board[row][column] = player
+        line = [column]
+
+        while depth > 1 and not check_win(board, column, player, geometry):
+            depth -= 1
+            key, mirrored = canonical_key(board)
+            entry = self.table.peek((key, player, depth), mirrored)
+            if entry is None or entry[1] is None:
+                break
+            player, column = get_opponent(player), entry[1]
+            row = drop_row(board, column, geometry)
+            board[row][column] = player
+            line.append(column)
+        return line
+
+    def check_limits(self):
+        """
+        Abort the search if its deadline passed, it used up its nodes or
+        it was asked to stop.
+
+        The board being searched is a private copy, so it is simply
+        abandoned.
+        """
+        if self.deadline is not None and time.time() > self.deadline:
+            raise SearchAborted()
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchAborted()
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchAborted()
+        self.next_check = self.check_point()
+
+    def check_point(self):
+        """Nodes counter value of the next limit check."""
+        point = (self.nodes | (LIMIT_CHECK_INTERVAL - 1)) + 1
+        if self.node_limit is not None and self.node_limit < point:
+            return self.node_limit
+        return point
+
+    def negamax(self, board, player, move, depth):
+        """
+        Value of a position for the player who just moved.
+
+        Args:
+            board: Board after the move (modified in place, then restored)
+            player: Player who made the last move
+            move: The last move as (row, column)
+            depth: Remaining search depth
+
+        Returns:
+            Value of the position for the player
+        """
+        # Leaf: evaluate the last move
+        if depth == 0:
+            return self.evaluate_leaf(board, player, move)
+
+        geometry = self.geometry
+        key, mirrored = canonical_key(board)
+        key = (key, player, depth)
+        entry = self.table.probe(key, mirrored)
+        if entry is not None:
+            return entry[0]
+
+        opponent = get_opponent(player)
+        best_score = None
+        best_column = None
+
+        for column in self.column_order:
+            if board[0][column] != 0:
+                continue
+            row = drop_row(board, column, geometry)
+            board[row][column] = opponent
+            self.nodes += 1
+            if self.nodes >= self.next_check:
+                self.check_limits()
+
+            if check_win(board, column, opponent, geometry):
+                # Multiply by depth to prefer faster wins
+                score = WIN_SCORE * (depth + 1)
+            else:
+                score = self.negamax(board, opponent, (row, column), depth - 1)
+
+            board[row][column] = 0
+
+            if best_score is None or score > best_score:
+                best_score = score
+                best_column = column
+
+        # Full board without a winner is a draw
+        value = 0 if best_score is None else -best_score
+        self.table.store(key, mirrored, value, best_column)
+        return value
+
+
+# =============================================================================
+# Alpha-Beta Search
+# =============================================================================
+
+class AlphaBetaSearch(MinimaxSearch):
+    """
+    Negamax with alpha-beta pruning, in three modes.
+
+    - alphabeta: every child is searched with the full window
+    - pvs: principal variation search; the first child gets the full
+      window, the others a null window proving they are no better, and
+      are searched again only if that fails
+    - mtdf: MTD(f); the value of a root move is found by a series of
+      null-window searches converging on it from a first guess (the
+      value found by the previous, shallower search)
+
+    Values inside the search window are exact; outside it only a bound
+    is known, and the table records which kind each entry holds.
+    Children are tried from the centre out, after the best column found
+    by an earlier search of the position.
+    """
+
+    def __init__(self, mode="alphabeta", table=None, geometry=STANDARD_GEOMETRY, weights=None):
+        """
+        Args:
+            mode: "alphabeta", "pvs" or "mtdf"
+            table: Transposition table to share (default: a new one)
+            geometry: Board geometry to search on
+            weights: EvaluationWeights of the leaf evaluation
+
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        if mode not in SEARCH_MODES or mode == "minimax":
+            raise ValueError(f"Unknown alpha-beta search mode '{mode}'")
+        super().__init__(table, geometry, weights)
+        self.mode = mode
+        center = (geometry.columns - 1) / 2
+        self.column_order = sorted(range(geometry.columns), key=lambda column: abs(column - center))
+        # Last exact value of each searched root move, keyed on the board after
+        # it (cleared at MAX_GUESSES entries)
+        self.guesses = {}
+
+    def root_order(self, board, player, columns):
+        """Search the root moves that scored best last time first."""
+        def guess(column):
+            after = to_list_board(board)
+            after[drop_row(after, column, self.geometry)][column] = player
+            return self.guesses.get((board_key(after), player), -INFINITY)
+        return sorted(columns, key=guess, reverse=True)
+
+    def value(self, board, player, move, depth, threshold=None):
+        """
+        Value of the position after a root move.
+
+        Exact, or when a threshold is given, possibly just a bound at or
+        below it.
+        """
+        if threshold is None:
+            guess_key = (board_key(board), player)
+            if self.mode == "mtdf":
+                value = self.mtdf(board, player, move, depth, self.guesses.get(guess_key, 0))
+            else:
+                value = self.alphabeta(board, player, move, depth, -INFINITY, INFINITY)
+            if len(self.guesses) >= MAX_GUESSES:
+                self.guesses.clear()
+            self.guesses[guess_key] = value
+            return value
+
+        if self.mode == "alphabeta":
+            return self.alphabeta(board, player, move, depth, threshold, INFINITY)
+
+        # Null-window test: is the move any better than the threshold?
+        bound = self.alphabeta(board, player, move, depth, threshold, threshold + NULL_WINDOW)
+        if bound < threshold + NULL_WINDOW:
+            # Failed low, or landed inside the window and is exact
+            return bound
+        return self.value(board, player, move, depth)
+
+    def mtdf(self, board, player, move, depth, guess):
+        """Exact value by null-window searches converging from a guess."""
+        lower, upper = -INFINITY, INFINITY
+        value = guess
+        while lower < upper:
+            beta = max(value, lower + NULL_WINDOW)
+            value = self.alphabeta(board, player, move, depth, beta - NULL_WINDOW, beta)
+            if beta - NULL_WINDOW < value < beta:
+                return value
+            if value < beta:
+                upper = value
+            else:
+                lower = value
+        return value
+
+    def alphabeta(self, board, player, move, depth, alpha, beta):
+        """
+        Value of a position for the player who just moved, within a window.
+
+        Fail-soft: a value inside (alpha, beta) is exact, a value at or
+        below alpha is an upper bound and one at or above beta a lower
+        bound.
+
+        Args:
+            board: Board after the move (modified in place, then restored)
+            player: Player who made the last move
+            move: The last move as (row, column)
+            depth: Remaining search depth
+            alpha, beta: Search window
+
+        Returns:
+            Value (or bound) of the position for the player
+        """
+        if depth == 0:
+            return self.evaluate_leaf(board, player, move)
+
+        geometry = self.geometry
+        key, mirrored = canonical_key(board)
+        key = (key, player, depth)
+        entry = self.table.probe(key, mirrored)
+        first_column = None
+        if entry is not None:
+            value, first_column, bound = entry
+            if (bound == EXACT or (bound == LOWER and value >= beta)
+                    or (bound == UPPER and value <= alpha)):
+                return value
+
+        order = self.column_order
+        if first_column is not None:
+            order = [first_column] + [column for column in order if column != first_column]
+
+        # Children are scored from the opponent's side, so the window flips
+        opponent = get_opponent(player)
+        low, high = -beta, -alpha
+        best_score = None
+        best_column = None
+
+        for column in order:
+            if board[0][column] != 0:
+                continue
+            row = drop_row(board, column, geometry)
+            board[row][column] = opponent
+            self.nodes += 1
+            if self.nodes >= self.next_check:
+                self.check_limits()
+
+            child = (row, column)
+            if check_win(board, column, opponent, geometry):
+                score = WIN_SCORE * (depth + 1)
+            elif self.mode == "pvs" and best_score is not None:
+                score = self.alphabeta(board, opponent, child, depth - 1, low, low + NULL_WINDOW)
+                if low + NULL_WINDOW <= score < high:
+                    score = self.alphabeta(board, opponent, child, depth - 1, low, high)
+            else:
+                score = self.alphabeta(board, opponent, child, depth - 1, low, high)
+
+            board[row][column] = 0
+
+            if best_score is None or score > best_score:
+                best_score = score
+                best_column = column
+                if score > low:
+                    low = score
+                    if low >= high:
+                        break
+
+        # Full board without a winner is a draw
+        if best_score is None:
+            value, bound = 0, EXACT
+        else:
+            value = -best_score
+            if best_score >= -alpha:
+                bound = UPPER
+            elif best_score <= -beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+        self.table.store(key, mirrored, value, best_column, bound)
+        return value
+
+
+def create_search(mode="minimax", geometry=STANDARD_GEOMETRY, weights=None, table=None):
+    """
+    Create a search of the given mode.
+
+    Args:
+        mode: One of SEARCH_MODES
+        geometry: Board geometry to search on
+        weights: EvaluationWeights of the leaf evaluation
+        table: Transposition table to use (default: a new private one)
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    if mode == "minimax":
+        return MinimaxSearch(table, geometry, weights)
+    return AlphaBetaSearch(mode, table, geometry, weights)
+
+
+def drop_row(board, column, geometry=STANDARD_GEOMETRY):
+    """Return the row where a token dropped in the column lands."""
+    for row in range(geometry.rows - 1, -1, -1):
+        if board[row][column] == 0:
+            return row
+    return -1
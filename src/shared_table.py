@@ -0,0 +1,246 @@
+"""
+Transposition table in shared memory.
+
+Every process that searches with a TranspositionTable builds its own
+from nothing: tournament workers and the root-splitting workers of a
+parallel search never see each other's positions. This table lives in a
+multiprocessing.shared_memory block that any number of processes attach
+to by name, so a position searched by one is a hit for all the others.
+
+The block is a fixed-size array of packed 24-byte entries. A position
+goes to one slot picked by a hash of its key and simply replaces what
+was there. The hash must be the same in every process, so it is
+computed from the key bytes (Python's own hash of bytes is seeded per
+process). There are no locks: an entry is written as three words
+(check, value, info) with check = hash ^ value ^ info, and a reader
+only accepts an entry whose words agree with the hash it is looking
+for. An entry torn by two processes writing at once, or belonging to
+another position, fails the check and reads as a miss.
+
+Searches with different weights, or a minimax search (which takes every
+entry as exact) and an alpha-beta one (which stores bounds), can share a
+block: each table attaches with a namespace that is mixed into the hash,
+so they never read each other's entries.
+
+Each process counts its probes, hits and hits on entries written by
+another process, and adds them to counters in the block from time to
+time, so stats() reports the hit rates of all processes together.
+
+The block is removed when the table that created it is closed (or by
+the resource tracker if its process dies), so the other processes
+should be started through multiprocessing, which shares the tracker.
+"""
+
+import hashlib
+import os
+import struct
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.functions import mirror_column
+from src.geometry import STANDARD_GEOMETRY
+from src.search import EXACT
+
+DEFAULT_SHARED_ENTRIES = 1 << 20
+
+# Block layout: header (entry count, then counter stripes), then entries
+HEADER = struct.Struct("<Q")
+STRIPES = 64
+COUNTERS = struct.Struct("<QQQ")  # probes, hits, hits on other processes' entries
+ENTRIES_OFFSET = HEADER.size + STRIPES * COUNTERS.size
+
+ENTRY = struct.Struct("<QQQ")  # check, value bits, info
+DOUBLE = struct.Struct("<d")
+WORD = struct.Struct("<Q")
+
+# Info word: column (NO_COLUMN for none), bound, integer value flag,
+# writer and a marker bit so that an empty slot never passes the check
+NO_COLUMN = 0xFF
+INTEGER_FLAG = 1 << 10
+WRITER_SHIFT = 16
+WRITER_MASK = 0xFFFF
+OCCUPIED = 1 << 40
+
+# Probes between two updates of the shared counters
+FLUSH_INTERVAL = 4096
+
+MASK_64 = (1 << 64) - 1
+
+
+def namespace_for(weights, mode):
+    """
+    Namespace of a search: its weights, and whether it stores bounds.
+
+    Minimax takes every entry as an exact value, so it must not read
+    the bounds stored by the alpha-beta modes.
+    """
+    kind = "exact" if mode == "minimax" else "bounds"
+    return repr((weights.key(), kind)).encode()
+
+
+class SharedTranspositionTable:
+    """
+    Transposition table in a shared memory block.
+
+    Drop-in replacement for TranspositionTable: positions are keyed the
+    same way, and a position and its mirror image share one entry.
+    """
+
+    def __init__(self, name=None, entries=DEFAULT_SHARED_ENTRIES, geometry=STANDARD_GEOMETRY,
+                 namespace=b""):
+        """
+        Args:
+            name: Shared memory block to attach to (default: create a new
+                  one, owned by this table)
+            entries: Entry count of a new block (rounded up to a power of two)
+            geometry: Board geometry of the stored positions
+            namespace: Bytes separating searches whose entries must not mix
+                       (see namespace_for)
+        """
+        self.geometry = geometry
+        self.namespace = namespace
+        # Multiply-shift hashing of the key read as one integer: the top 64
+        # bits of key * multiplier, with an odd multiplier drawn from the
+        # namespace
+        self.key_bits = 8 * (geometry.cells + 2)
+        self.multiplier = int.from_bytes(
+            hashlib.shake_128(namespace).digest(self.key_bits // 8 + 8), "little"
+        ) | 1
+        self.owner = name is None
+
+        if self.owner:
+            size = 1 << max(int(entries) - 1, 1).bit_length()
+            self.memory = shared_memory.SharedMemory(create=True, size=ENTRIES_OFFSET + size * ENTRY.size)
+            HEADER.pack_into(self.memory.buf, 0, size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.name = self.memory.name
+        self.buf = self.memory.buf
+        self.size = HEADER.unpack_from(self.buf, 0)[0]
+        self.mask = self.size - 1
+
+        self.writer = os.getpid() & WRITER_MASK
+        self.stripe = HEADER.size + (os.getpid() % STRIPES) * COUNTERS.size
+        self.probes = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.unflushed = [0, 0, 0]
+
+    def __reduce__(self):
+        # A pickled table (sent to a worker process) attaches to the same block
+        return (SharedTranspositionTable, (self.name, self.size, self.geometry, self.namespace))
+
+    def __len__(self):
+        """Occupied slots (written by any process)."""
+        entries = np.frombuffer(self.buf, dtype=np.uint64, offset=ENTRIES_OFFSET, count=3 * self.size)
+        return int(np.count_nonzero(entries[2::3]))
+
+    def slot_hash(self, key):
+        """64-bit hash of a key; its low bits pick the slot."""
+        board, player, depth = key
+        number = int.from_bytes(board, "little") << 16 | player << 8 | depth
+        return (number * self.multiplier >> self.key_bits) & MASK_64
+
+    def probe(self, key, mirrored):
+        """
+        Look up a position.
+
+        Returns:
+            Tuple of (value, best_column, bound) or None if the position
+            is unknown
+        """
+        entry, writer = self.read(key, mirrored)
+        self.probes += 1
+        self.unflushed[0] += 1
+        if entry is not None:
+            self.hits += 1
+            self.unflushed[1] += 1
+            if writer != self.writer:
+                self.shared_hits += 1
+                self.unflushed[2] += 1
+        if self.unflushed[0] >= FLUSH_INTERVAL:
+            self.flush()
+        return entry
+
+    def peek(self, key, mirrored):
+        """Look up a position without counting it in the hit rate."""
+        return self.read(key, mirrored)[0]
+
+    def read(self, key, mirrored):
+        """Return the entry of a position (or None) and the process that wrote it."""
+        code = self.slot_hash(key)
+        offset = ENTRIES_OFFSET + (code & self.mask) * ENTRY.size
+        check, value_bits, info = ENTRY.unpack_from(self.buf, offset)
+        if check ^ value_bits ^ info != code or not info & OCCUPIED:
+            return None, None
+
+        value = DOUBLE.unpack(WORD.pack(value_bits))[0]
+        if info & INTEGER_FLAG:
+            value = int(value)
+        column = info & 0xFF
+        column = None if column == NO_COLUMN else column
+        if mirrored and column is not None:
+            column = mirror_column(column, self.geometry)
+        return (value, column, (info >> 8) & 0x3), (info >> WRITER_SHIFT) & WRITER_MASK
+
+    def store(self, key, mirrored, value, column, bound=EXACT):
+        """Store a searched position, replacing whatever held its slot."""
+        if column is None:
+            column = NO_COLUMN
+        elif mirrored:
+            column = mirror_column(column, self.geometry)
+        info = OCCUPIED | (self.writer << WRITER_SHIFT) | (bound << 8) | column
+        if not isinstance(value, float):
+            info |= INTEGER_FLAG
+        value_bits = WORD.unpack(DOUBLE.pack(value))[0]
+
+        code = self.slot_hash(key)
+        ENTRY.pack_into(self.buf, ENTRIES_OFFSET + (code & self.mask) * ENTRY.size,
+                        code ^ value_bits ^ info, value_bits, info)
+
+    def hit_rate(self):
+        """Fraction of this process's probes answered from the table."""
+        return self.hits / self.probes if self.probes else 0.0
+
+    # -------------------------------------------------------------------------
+    # Statistics of all processes
+    # -------------------------------------------------------------------------
+
+    def flush(self):
+        """
+        Add this process's recent counts to the shared counters.
+
+        Processes share a stripe only when their ids collide, so an
+        update is rarely lost, and then only from the statistics.
+        """
+        counts = COUNTERS.unpack_from(self.buf, self.stripe)
+        COUNTERS.pack_into(self.buf, self.stripe, *(a + b for a, b in zip(counts, self.unflushed)))
+        self.unflushed = [0, 0, 0]
+
+    def stats(self):
+        """Probes, hits and hits on another process's entries over all processes."""
+        self.flush()
+        probes = hits = shared_hits = 0
+        for stripe in range(STRIPES):
+            counts = COUNTERS.unpack_from(self.buf, HEADER.size + stripe * COUNTERS.size)
+            probes += counts[0]
+            hits += counts[1]
+            shared_hits += counts[2]
+        return {
+            "entries": self.size,
+            "occupied": len(self),
+            "probes": probes,
+            "hits": hits,
+            "shared_hits": shared_hits,
+            "hit_rate": round(hits / probes, 4) if probes else None,
+            "shared_hit_rate": round(shared_hits / probes, 4) if probes else None,
+        }
+
+    def close(self):
+        """Detach from the block, and remove it if this table created it."""
+        self.flush()
+        self.buf = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
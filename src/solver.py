@@ -0,0 +1,210 @@
+"""
+Exact endgame solver on bitboards.
+
+Searches a position to the end of the game with alpha-beta negamax on
+the bitboards of src/forced_moves.py and a transposition table, and
+gives up after a node budget. Immediate wins end a line at once, a
+single opponent threat must be blocked (two lose), and a move under an
+opponent threat cell is never tried, since the opponent would win on
+top of it. The other moves are tried in order of the threats they
+create, then from the centre out.
+
+Scores follow the usual convention: 0 for a draw, otherwise one more
+than the number of cells left empty by the winning move, positive when
+the player to move wins (faster wins score higher). Searching with the
+window (-1, 1) only settles win, draw or loss, which is much cheaper.
+"""
+
+from functools import lru_cache
+
+from src.forced_moves import bitboards, mask_tables, threat_cells
+from src.geometry import STANDARD_GEOMETRY
+from src.search import SearchAborted
+
+# Table entries kept before the table is cleared
+SOLVER_TABLE_SIZE = 1_000_000
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+@lru_cache(maxsize=None)
+def solver_tables(geometry):
+    """
+    Bitboard tables of a geometry (layout of src/forced_moves.py).
+
+    Returns:
+        Tuple of (line masks, bottom cell of each column, column bits
+        from the centre out)
+    """
+    stride = geometry.rows + 1
+    line_masks = []
+    for line in geometry.lines:
+        mask = 0
+        for row, column in line:
+            mask |= 1 << (column * stride + geometry.rows - 1 - row)
+        line_masks.append(mask)
+    bottom = 0
+    for column in range(geometry.columns):
+        bottom |= 1 << (column * stride)
+    center = (geometry.columns - 1) / 2
+    order = sorted(range(geometry.columns), key=lambda column: abs(column - center))
+    columns = tuple(((1 << geometry.rows) - 1) << (column * stride) for column in order)
+    return tuple(line_masks), bottom, columns
+
+
+def outcome(score):
+    """"W", "D" or "L" for the player to move."""
+    return "W" if score > 0 else "L" if score < 0 else "D"
+
+
+class Solver:
+    """Alpha-beta solver keeping its table across positions."""
+
+    def __init__(self, geometry=STANDARD_GEOMETRY):
+        self.geometry = geometry
+        self.table = {}
+        self.nodes = 0
+        self.node_limit = None
+
+    def solve(self, mine, theirs, empty, max_nodes=None, outcome_only=False):
+        """
+        Solve a position given as bitboards.
+
+        Args:
+            mine, theirs: Bitboards of the player to move and the opponent
+            empty: Empty cells on the board
+            max_nodes: Nodes allowed (default: no limit)
+            outcome_only: Only tell win, draw and loss apart; the sign of
+                          the score is exact, its size is not
+
+        Returns:
+            The score, or None if the search needed more than max_nodes
+        """
+        if len(self.table) > SOLVER_TABLE_SIZE:
+            self.table.clear()
+        self.node_limit = self.nodes + max_nodes if max_nodes is not None else None
+        window = 1 if outcome_only else empty
+        try:
+            return self.negamax(mine, theirs, empty, -window, window)
+        except SearchAborted:
+            return None
+
+    def solve_board(self, board, player, max_nodes=None, outcome_only=False):
+        """Solve a board for the player to move (see solve)."""
+        mine, theirs, empty = self.read_board(board, player)
+        return self.solve(mine, theirs, empty, max_nodes, outcome_only)
+
+    def move_scores(self, board, player, max_nodes=None, outcome_only=False):
+        """
+        Solve every move of the player to move.
+
+        Returns:
+            Dict column -> score of the move for the player, or None if
+            any move needed more than max_nodes (counted over all moves)
+        """
+        mine, theirs, empty = self.read_board(board, player)
+        _, board_mask = mask_tables(self.geometry)
+        _, bottom, columns = solver_tables(self.geometry)
+        playable = ((mine | theirs) + bottom) & board_mask
+        limit = self.nodes + max_nodes if max_nodes is not None else None
+
+        scores = {}
+        stride = self.geometry.rows + 1
+        for column_bits in columns:
+            move = playable & column_bits
+            if not move:
+                continue
+            column = (move.bit_length() - 1) // stride
+            if threat_cells(mine, move, self.geometry):
+                scores[column] = empty
+                continue
+            budget = limit - self.nodes if limit is not None else None
+            if budget is not None and budget <= 0:
+                return None
+            score = self.solve(theirs, mine | move, empty - 1, budget, outcome_only)
+            if score is None:
+                return None
+            scores[column] = -score
+        return scores
+
+    def read_board(self, board, player):
+        """Bitboards of the player to move and the opponent, and the empty cell count."""
+        first, second, _ = bitboards(board, self.geometry)
+        _, board_mask = mask_tables(self.geometry)
+        empty = bin(board_mask & ~(first | second)).count("1")
+        return (first, second, empty) if player == 1 else (second, first, empty)
+
+    def negamax(self, mine, theirs, empty, alpha, beta):
+        """Negamax with alpha-beta on bitboards (mine: player to move)."""
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchAborted()
+
+        geometry = self.geometry
+        _, board_mask = mask_tables(geometry)
+        _, bottom, columns = solver_tables(geometry)
+        occupied = mine | theirs
+        playable = (occupied + bottom) & board_mask
+        if not playable:
+            return 0
+        if threat_cells(mine, playable, geometry):
+            return empty
+
+        # The opponent's immediate wins must be blocked; two cannot be
+        their_threats = threat_cells(theirs, board_mask & ~occupied, geometry)
+        forced = their_threats & playable
+        if forced:
+            if forced & (forced - 1):
+                return -(empty - 1)
+            playable = forced
+        # A token under an opponent threat lets them win on top of it
+        playable &= ~(their_threats >> 1)
+        if not playable:
+            return -(empty - 1)
+
+        # No win before the move after next, so at best that win or a draw
+        best_possible = max(empty - 2, 0)
+        if beta > best_possible:
+            beta = best_possible
+            if alpha >= beta:
+                return beta
+
+        key = (mine, occupied)
+        entry = self.table.get(key)
+        if entry is not None:
+            value, bound = entry
+            if bound == EXACT:
+                return value
+            if bound == LOWER and value >= beta:
+                return value
+            if bound == UPPER and value <= alpha:
+                return value
+
+        # Moves creating the most threats first, then from the centre out
+        free = board_mask & ~occupied
+        moves = []
+        for order, column_bits in enumerate(columns):
+            move = playable & column_bits
+            if move:
+                threats = bin(threat_cells(mine | move, free & ~move, geometry)).count("1")
+                moves.append((-threats, order, move))
+        moves.sort()
+
+        original_alpha = alpha
+        best = -empty
+        for _, _, move in moves:
+            value = -self.negamax(theirs, mine | move, empty - 1, -beta, -alpha)
+            if value > best:
+                best = value
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                break
+
+        if best >= beta:
+            self.table[key] = (best, LOWER)
+        elif best <= original_alpha:
+            self.table[key] = (best, UPPER)
+        else:
+            self.table[key] = (best, EXACT)
+        return best
@@ -0,0 +1,103 @@
+"""
+Evaluation weights.
+
+The Hard AI scores the last move of a searched line with three terms:
+the tokens in a row it makes for its player (player_weight each), the
+opponent's tokens in a row through it (opponent_weight each) and the
+value of the cell it was played in. The defaults are the original
+hand-picked constants; tune.py fits them to game results and saves them
+in a JSON weights file that load_weights reads back.
+"""
+
+import json
+
+from src.functions import POSITION_WEIGHT
+from src.geometry import STANDARD_GEOMETRY, parse_geometry
+
+DEFAULT_PLAYER_WEIGHT = 10
+DEFAULT_OPPONENT_WEIGHT = 5
+
+
+class EvaluationWeights:
+    """Weights of the leaf evaluation for one board geometry."""
+
+    def __init__(self, player_weight=DEFAULT_PLAYER_WEIGHT, opponent_weight=DEFAULT_OPPONENT_WEIGHT,
+                 cell_values=None, geometry=STANDARD_GEOMETRY):
+        """
+        Args:
+            player_weight: Score per token in a row made by the move
+            opponent_weight: Score per opponent token in a row through the move
+            cell_values: Score of a move in each cell, as a list of rows
+                         (default: lines through the cell * POSITION_WEIGHT)
+            geometry: Board geometry the cell values are for
+
+        Raises:
+            ValueError: If cell_values does not match the board size or is
+                        not left-right symmetric (the search shares every
+                        position with its mirror image)
+        """
+        if cell_values is None:
+            cell_values = [
+                [value * POSITION_WEIGHT for value in row] for row in geometry.position_values
+            ]
+        if len(cell_values) != geometry.rows or any(len(row) != geometry.columns for row in cell_values):
+            raise ValueError(f"Cell values do not match the {geometry.name} board")
+        if any(list(row) != list(row)[::-1] for row in cell_values):
+            raise ValueError("Cell values must be the same in mirrored cells")
+
+        self.player_weight = player_weight
+        self.opponent_weight = opponent_weight
+        self.cell_values = [list(row) for row in cell_values]
+        self.geometry = geometry
+
+    def __repr__(self):
+        return (f"EvaluationWeights(player_weight={self.player_weight}, "
+                f"opponent_weight={self.opponent_weight}, board={self.geometry.name})")
+
+    def __eq__(self, other):
+        return isinstance(other, EvaluationWeights) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def key(self):
+        return (self.player_weight, self.opponent_weight,
+                tuple(map(tuple, self.cell_values)), self.geometry)
+
+    def to_dict(self):
+        return {
+            "board": self.geometry.name,
+            "player_weight": self.player_weight,
+            "opponent_weight": self.opponent_weight,
+            "cell_values": self.cell_values,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["player_weight"],
+            data["opponent_weight"],
+            data["cell_values"],
+            parse_geometry(data.get("board", "7x6")),
+        )
+
+
+def save_weights(path, weights):
+    """Write evaluation weights to a JSON file."""
+    with open(path, "w") as file:
+        json.dump(weights.to_dict(), file, indent=2)
+        file.write("\n")
+
+
+def load_weights(path):
+    """
+    Read evaluation weights from a JSON file.
+
+    Raises:
+        ValueError: If the file does not describe valid weights
+    """
+    with open(path) as file:
+        try:
+            return EvaluationWeights.from_dict(json.load(file))
+        except (KeyError, TypeError) as error:
+            raise ValueError(f"Invalid weights file '{path}': {error}")
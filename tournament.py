@@ -0,0 +1,731 @@
+"""
+Round-robin tournament between AI configurations.
+
+Every pair of players meets in a match of game pairs: both games of a
+pair start from the same random opening with colours swapped. After
+each batch of games a sequential probability ratio test (SPRT) checks
+whether the match is decided, so clear results stop after a handful of
+games instead of a fixed count. Ratings are reported as Elo with 95%
+confidence intervals. Every get_move call is timed, and latency
+percentiles per player and move number can be exported with --stats.
+
+Usage:
+    python tournament.py easy hard:depth=2 hard:depth=4 hard:depth=42,time=0.1
+    python tournament.py easy hard:depth=4 --board 9x7
+    python tournament.py hard:depth=4 hard:depth=5 --stats timings.json
+    python tournament.py easy hard:depth=6 --decision-cache 100000 --decision-cache-file decisions.json
+    python tournament.py hard:depth=6 hard:depth=7 --shared-table 4000000
+    python tournament.py hard:depth=4 hard:depth=5 --listen 0.0.0.0:7655 --batch-size 64
+    python tournament.py --levels --stats levels.json
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from multiprocessing import Pool, cpu_count
+
+from montecarlo import play_game
+from src.decision_cache import CachedPlayer, DecisionCache
+from src.geometry import STANDARD_GEOMETRY, parse_geometry
+from src.levels import DIFFICULTY_LEVELS, resolve_level
+from src.records import GameRecord, write_records
+from src.shared_table import SharedTranspositionTable
+from src.players.easy_ai import EasyAI
+from src.players.hard_ai import HardAI
+
+
+# =============================================================================
+# Player Configurations
+# =============================================================================
+# A player is written as "engine" or "engine:option=value,option=value",
+# for example "hard:depth=6", "hard:depth=42,time=0.5" or "hard:depth=42,nodes=50000".
+# The name of a difficulty level (see src/levels.py) stands for its spec.
+
+PLAYER_ENGINES = {
+    "easy": EasyAI,
+    "hard": HardAI,
+}
+
+# Option name -> (constructor argument, type)
+PLAYER_OPTIONS = {
+    "depth": ("depth", int),
+    "time": ("time_limit", float),
+    "workers": ("workers", int),
+    "nodes": ("max_nodes", int),
+    "weights": ("weights", str),
+    "mode": ("mode", str),
+    "forced": ("forced", int),
+}
+
+
+def parse_player(spec):
+    """
+    Parse a player specification (or difficulty level name).
+
+    Returns:
+        Tuple of (engine name, constructor keyword arguments)
+    """
+    spec = resolve_level(spec)
+    engine, _, options = spec.partition(":")
+    if engine not in PLAYER_ENGINES:
+        raise ValueError(f"Unknown engine '{engine}' in '{spec}'")
+
+    kwargs = {}
+    for option in filter(None, options.split(",")):
+        name, _, value = option.partition("=")
+        if name not in PLAYER_OPTIONS:
+            raise ValueError(f"Unknown option '{name}' in '{spec}'")
+        argument, convert = PLAYER_OPTIONS[name]
+        kwargs[argument] = convert(value)
+    return engine, kwargs
+
+
+def create_player(spec, geometry=STANDARD_GEOMETRY, shared_table=None):
+    """
+    Create an AI instance from a player specification.
+
+    Args:
+        spec: Player specification
+        geometry: Board geometry to play on
+        shared_table: Name of a SharedTranspositionTable block for Hard
+                      AIs to search with (default: a private table each)
+    """
+    engine, kwargs = parse_player(spec)
+    if engine == "hard" and shared_table is not None:
+        kwargs["shared_table"] = shared_table
+    return PLAYER_ENGINES[engine](geometry=geometry, **kwargs)
+
+
+def is_deterministic(spec):
+    """
+    True if the player always picks the same move in the same position.
+
+    Only fixed-depth Hard AIs qualify: time and node limits make the
+    move depend on the machine and on what earlier searches left in the
+    transposition table, and the Easy AI plays randomly.
+    """
+    engine, kwargs = parse_player(spec)
+    return engine == "hard" and "time_limit" not in kwargs and "max_nodes" not in kwargs
+
+
+# =============================================================================
+# Game Execution
+# =============================================================================
+
+# Move numbers grouped per row of the printed latency table
+MOVE_BUCKET = 6
+
+# AI instances of a worker process, kept so caches survive between games
+_players = {}
+
+# Decision cache of a worker process (None when disabled) and the shared
+# transposition table its Hard AIs search with (None for private tables)
+_decision_cache = None
+_shared_table = None
+
+
+def init_worker(cache_size=None, cache_entries=(), shared_table=None):
+    """
+    Set up the decision cache and shared table of a worker process.
+
+    Args:
+        cache_size: Largest number of decisions kept (None disables the cache)
+        cache_entries: (key, column, seconds) decisions to start from
+        shared_table: Name of a SharedTranspositionTable block
+    """
+    global _decision_cache, _shared_table
+    _shared_table = shared_table
+    _decision_cache = None
+    if cache_size:
+        _decision_cache = DecisionCache(cache_size)
+        for entry in cache_entries:
+            _decision_cache.add(*entry)
+
+
+def max_opening_plies(geometry):
+    """Longest random opening after which no line can be complete yet."""
+    return 2 * (geometry.winning_length - 1)
+
+
+def random_opening(seed, plies, geometry=STANDARD_GEOMETRY):
+    """Return a reproducible list of random opening columns."""
+    rng = random.Random(seed)
+    plies = min(plies, max_opening_plies(geometry))
+    return [rng.randrange(geometry.columns) for _ in range(plies)]
+
+
+def run_game(args):
+    """
+    Play one game of a match (worker entry point).
+
+    Args:
+        args: Tuple of (spec_a, spec_b, a_first, seed, opening_plies, geometry)
+
+    Returns:
+        Tuple of (score of player A, columns played, seconds per move,
+        decision cache report), the score being 1 for a win, 0.5 for a
+        draw and 0 for a loss, the times None for opening moves and the
+        report None unless the worker has a decision cache
+    """
+    spec_a, spec_b, a_first, seed, opening_plies, geometry = args
+    players = {}
+    for spec in (spec_a, spec_b):
+        key = (spec, geometry)
+        if key not in _players:
+            _players[key] = create_player(spec, geometry, _shared_table)
+        players[spec] = _players[key]
+        if _decision_cache is not None and is_deterministic(spec):
+            players[spec] = CachedPlayer(_players[key], _decision_cache, f"{spec}@{geometry.name}")
+
+    # Both games of a pair share the opening and the random choices
+    opening = random_opening(seed, opening_plies, geometry)
+    random.seed(seed)
+
+    moves, times = [], []
+    if a_first:
+        result = play_game(players[spec_a], players[spec_b], opening, moves, geometry, times)
+        winner_a = 1
+    else:
+        result = play_game(players[spec_b], players[spec_a], opening, moves, geometry, times)
+        winner_a = 2
+
+    if _shared_table is not None:
+        # Probe counts are only flushed every few thousand probes; publish
+        # the rest so the table statistics cover every game
+        for spec in (spec_a, spec_b):
+            search = getattr(_players[(spec, geometry)], "search", None)
+            if search is not None:
+                search.table.flush()
+
+    report = _decision_cache.take_report() if _decision_cache is not None else None
+    if result == 0:
+        return 0.5, moves, times, report
+    return (1.0 if result == winner_a else 0.0), moves, times, report
+
+
+# =============================================================================
+# Statistics
+# =============================================================================
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def latency_summary(seconds):
+    """Count, mean, p50/p95/p99 and max of move times, in milliseconds."""
+    values = sorted(seconds)
+    if not values:
+        return {"moves": 0}
+    return {
+        "moves": len(values),
+        "mean": round(1000 * sum(values) / len(values), 3),
+        "p50": round(1000 * percentile(values, 0.50), 3),
+        "p95": round(1000 * percentile(values, 0.95), 3),
+        "p99": round(1000 * percentile(values, 0.99), 3),
+        "max": round(1000 * values[-1], 3),
+    }
+
+
+def expected_score(elo):
+    """Expected score for an Elo difference."""
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def elo_from_score(score):
+    """Elo difference for an expected score (infinite at 0 and 1)."""
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return -400 * math.log10(1 / score - 1)
+
+
+def score_statistics(wins, draws, losses):
+    """
+    Mean score and per-game score variance of a match.
+
+    Half a win and half a loss are added so that one-sided matches
+    (all wins or all losses) still have a usable variance.
+
+    Returns:
+        Tuple of (mean score, variance of a single game)
+    """
+    wins, losses = wins + 0.5, losses + 0.5
+    games = wins + draws + losses
+    score = (wins + 0.5 * draws) / games
+    variance = (
+        wins * (1 - score) ** 2 +
+        draws * (0.5 - score) ** 2 +
+        losses * score ** 2
+    ) / games
+    return score, variance
+
+
+def elo_interval(wins, draws, losses, z=1.96):
+    """
+    Elo difference of a match with its confidence interval.
+
+    Returns:
+        Tuple of (elo, lower bound, upper bound)
+    """
+    games = wins + draws + losses
+    score, variance = score_statistics(wins, draws, losses)
+    margin = z * math.sqrt(variance / max(games, 1))
+    return (
+        elo_from_score(score),
+        elo_from_score(score - margin),
+        elo_from_score(score + margin)
+    )
+
+
+def sprt_llr(wins, draws, losses, elo0, elo1):
+    """
+    Log-likelihood ratio of H1 (difference elo1) against H0 (elo0).
+
+    Uses the normal approximation of the game score, which is accurate
+    enough for the bounds used here and works for draws as well.
+    """
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0
+    score, variance = score_statistics(wins, draws, losses)
+    score0, score1 = expected_score(elo0), expected_score(elo1)
+    return games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+
+
+def sprt_bounds(alpha, beta):
+    """Return the (lower, upper) LLR bounds for the given error rates."""
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+def compute_ratings(players, matches, iterations=200):
+    """
+    Fit Elo ratings to all match results (Bradley-Terry model).
+
+    Args:
+        players: List of player specifications
+        matches: Dict (spec_a, spec_b) -> Match
+
+    Returns:
+        Dict spec -> (elo, 95% confidence margin), centred on a mean of 0
+    """
+    scale = math.log(10) / 400
+    ratings = {spec: 0.0 for spec in players}
+
+    # Minorization-maximization on strengths 10^(elo/400)
+    for _ in range(iterations):
+        for spec in players:
+            score, weight = 0.0, 0.0
+            for (a, b), match in matches.items():
+                if spec not in (a, b) or match.games == 0:
+                    continue
+                other = b if spec == a else a
+                own = match.score_a if spec == a else match.games - match.score_a
+                # Half a point each way keeps perfect scores finite
+                score += own + 0.5
+                strength = 10 ** (ratings[spec] / 400)
+                other_strength = 10 ** (ratings[other] / 400)
+                weight += (match.games + 1) / (strength + other_strength)
+            if weight > 0:
+                ratings[spec] = 400 * math.log10(score / weight)
+
+        mean = sum(ratings.values()) / len(ratings)
+        ratings = {spec: elo - mean for spec, elo in ratings.items()}
+
+    # Confidence margin from the Fisher information of each rating
+    results = {}
+    for spec in players:
+        information = 0.0
+        for (a, b), match in matches.items():
+            if spec not in (a, b):
+                continue
+            other = b if spec == a else a
+            p = expected_score(ratings[spec] - ratings[other])
+            information += (match.games + 1) * p * (1 - p) * scale ** 2
+        margin = 1.96 / math.sqrt(information) if information > 0 else math.inf
+        results[spec] = (ratings[spec], margin)
+    return results
+
+
+# =============================================================================
+# Matches
+# =============================================================================
+
+class Match:
+    """Running result of a match between player A and player B."""
+
+    def __init__(self, spec_a, spec_b):
+        self.spec_a = spec_a
+        self.spec_b = spec_b
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+        self.decision = None
+
+    @property
+    def games(self):
+        return self.wins + self.draws + self.losses
+
+    @property
+    def score_a(self):
+        return self.wins + 0.5 * self.draws
+
+    def add(self, score):
+        """Record one game from player A's point of view."""
+        if score == 1:
+            self.wins += 1
+        elif score == 0:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+
+class MoveTimings:
+    """Time of every get_move call, per player and move number."""
+
+    def __init__(self):
+        # spec -> move number (1 = first move of the game) -> seconds
+        self.times = {}
+        self.games = 0
+        self.moves = 0
+
+    def add_game(self, player1, player2, times):
+        """Record the move times of a game (None entries are opening moves)."""
+        self.games += 1
+        for ply, seconds in enumerate(times):
+            if seconds is None:
+                continue
+            spec = player1 if ply % 2 == 0 else player2
+            self.times.setdefault(spec, {}).setdefault(ply + 1, []).append(seconds)
+            self.moves += 1
+
+    def summary(self, spec, first=1, last=None):
+        """Latency summary of a player over a range of move numbers."""
+        by_move = self.times.get(spec, {})
+        return latency_summary([
+            seconds for number, values in by_move.items()
+            if number >= first and (last is None or number <= last)
+            for seconds in values
+        ])
+
+    def to_dict(self, elapsed):
+        """Machine-readable summary for comparing engine versions."""
+        return {
+            "games": self.games,
+            "moves": self.moves,
+            "elapsed": round(elapsed, 3),
+            "games_per_second": round(self.games / elapsed, 3) if elapsed else None,
+            "moves_per_second": round(self.moves / elapsed, 3) if elapsed else None,
+            "players": {
+                spec: {
+                    "latency_ms": self.summary(spec),
+                    "by_move": {
+                        str(number): latency_summary(values)
+                        for number, values in sorted(by_move.items())
+                    },
+                }
+                for spec, by_move in self.times.items()
+            },
+        }
+
+
+def game_record(task, score, moves):
+    """Build the game record of a finished tournament game."""
+    spec_a, spec_b, a_first, seed, _, geometry = task
+    player1, player2 = (spec_a, spec_b) if a_first else (spec_b, spec_a)
+    if score == 0.5:
+        result = 0
+    else:
+        result = 1 if (score == 1) == a_first else 2
+    metadata = {"player1": player1, "player2": player2, "seed": seed}
+    if geometry != STANDARD_GEOMETRY:
+        metadata["board"] = geometry.name
+    return GameRecord(moves, result, metadata)
+
+
+def play_match(match, pool, max_games, batch_size, elo0, elo1, alpha, beta,
+               seed, opening_plies, record_path=None, geometry=STANDARD_GEOMETRY,
+               timings=None, decision_cache=None):
+    """
+    Play a match in batches until the SPRT decides it or max_games is reached.
+
+    The decision is stored in match.decision as "A stronger",
+    "B stronger" or "undecided". Games are appended to record_path
+    as they finish, if given, their move times added to timings and the
+    workers' decision cache reports to decision_cache.
+    """
+    lower, upper = sprt_bounds(alpha, beta)
+    # Whole game pairs only, so each opening is played with both colours
+    batch_size += batch_size % 2
+
+    while match.games < max_games:
+        start = match.games
+        count = min(batch_size, max_games - start)
+        tasks = [
+            (match.spec_a, match.spec_b, game % 2 == 0, seed + game // 2, opening_plies, geometry)
+            for game in range(start, start + count)
+        ]
+        finished = pool.map(run_game, tasks) if pool else [run_game(t) for t in tasks]
+        for task, (score, _, times, report) in zip(tasks, finished):
+            match.add(score)
+            if decision_cache is not None and report is not None:
+                decision_cache.add_report(report)
+            if timings is not None:
+                a_first = task[2]
+                players = (match.spec_a, match.spec_b) if a_first else (match.spec_b, match.spec_a)
+                timings.add_game(*players, times)
+        if record_path:
+            write_records(record_path, (
+                game_record(task, score, moves) for task, (score, moves, *_) in zip(tasks, finished)
+            ))
+
+        llr = sprt_llr(match.wins, match.draws, match.losses, elo0, elo1)
+        if llr >= upper:
+            match.decision = "A stronger"
+            return
+        if llr <= lower:
+            match.decision = "B stronger"
+            return
+
+    match.decision = "undecided"
+
+
+def run_tournament(players, max_games=1000, batch_size=10, elo0=-20, elo1=20,
+                   alpha=0.05, beta=0.05, seed=0, opening_plies=2, workers=1,
+                   record_path=None, geometry=STANDARD_GEOMETRY, timings=None, pool=None,
+                   decision_cache=None, shared_table=None):
+    """
+    Play a round-robin between all players.
+
+    Args:
+        players: List of player specifications
+        max_games: Game cap per pairing if the SPRT does not stop earlier
+        batch_size: Games played between two SPRT checks
+        elo0, elo1: SPRT hypotheses for the Elo difference of A over B
+        alpha, beta: SPRT error rates
+        seed: Base seed for openings and random players
+        opening_plies: Random plies played before the AIs take over
+        workers: Worker processes playing games in parallel
+        record_path: Game record file every game is appended to (optional)
+        geometry: Board geometry to play on (default: standard 7x6)
+        timings: MoveTimings that every game's move times are added to (optional)
+        pool: Object whose map(run_game, tasks) plays the games, such as a
+              distributed.Coordinator (default: a Pool of workers processes)
+        decision_cache: DecisionCache to share the decisions of deterministic
+                        players between the games of each worker; it starts
+                        every worker and collects their statistics and
+                        new decisions (optional)
+        shared_table: Name of a SharedTranspositionTable block that the
+                      Hard AIs of every local worker search with (optional)
+
+    Returns:
+        Dict (spec_a, spec_b) -> Match
+    """
+    cache_setup = (None, (), shared_table)
+    if decision_cache is not None:
+        cache_setup = (decision_cache.max_size, decision_cache.items(), shared_table)
+    own_pool = pool is None and workers > 1
+    if own_pool:
+        pool = Pool(workers, initializer=init_worker, initargs=cache_setup)
+    elif pool is None:
+        init_worker(*cache_setup)
+    matches = {}
+    try:
+        for i, spec_a in enumerate(players):
+            for spec_b in players[i + 1:]:
+                match = Match(spec_a, spec_b)
+                play_match(match, pool, max_games, batch_size, elo0, elo1, alpha, beta,
+                           seed, opening_plies, record_path, geometry, timings, decision_cache)
+                matches[(spec_a, spec_b)] = match
+                elo, low, high = elo_interval(match.wins, match.draws, match.losses)
+                print(f"  {spec_a} vs {spec_b}: +{match.wins} ={match.draws} -{match.losses} "
+                      f"({match.games} games) Elo {elo:+.0f} [{low:+.0f}, {high:+.0f}] "
+                      f"-> {match.decision}")
+    finally:
+        if own_pool:
+            pool.close()
+            pool.join()
+    return matches
+
+
+def print_timings(timings, players, geometry, bucket=MOVE_BUCKET):
+    """Print move latency percentiles per player, overall and by move number."""
+    print(f"{'Move latency (ms)':<30} {'moves':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+
+    def row(label, summary):
+        if summary["moves"]:
+            print(f"{label:<30} {summary['moves']:>7} {summary['p50']:>8.2f} {summary['p95']:>8.2f} "
+                  f"{summary['p99']:>8.2f} {summary['max']:>8.2f}")
+
+    for spec in players:
+        row(spec, timings.summary(spec))
+        for first in range(1, geometry.cells + 1, bucket):
+            last = min(first + bucket - 1, geometry.cells)
+            row(f"  moves {first}-{last}", timings.summary(spec, first, last))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round-robin AI tournament with Elo and SPRT")
+    parser.add_argument("players", nargs="*",
+                        help="Player specifications, e.g. easy hard:depth=4 hard:depth=42,time=0.2")
+    parser.add_argument("--levels", action="store_true",
+                        help="Add every difficulty level of the game (see src/levels.py)")
+    parser.add_argument("--max-games", type=int, default=1000, help="Game cap per pairing")
+    parser.add_argument("--batch-size", type=int, default=10, help="Games between SPRT checks")
+    parser.add_argument("--elo0", type=float, default=-20, help="SPRT H0 Elo difference")
+    parser.add_argument("--elo1", type=float, default=20, help="SPRT H1 Elo difference")
+    parser.add_argument("--alpha", type=float, default=0.05, help="SPRT false positive rate")
+    parser.add_argument("--beta", type=float, default=0.05, help="SPRT false negative rate")
+    parser.add_argument("--seed", type=int, default=0, help="Base random seed")
+    parser.add_argument("--opening-plies", type=int, default=2,
+                        help="Random opening plies (at most 6 on a Connect 4 board)")
+    parser.add_argument("--workers", type=int, default=cpu_count(), help="Worker processes")
+    parser.add_argument("--record", metavar="PATH", help="Append every game to this record file")
+    parser.add_argument("--board", default="7x6", help="Board geometry, e.g. 7x6, 9x7 or 9x8:5")
+    parser.add_argument("--stats", metavar="PATH", help="Write move latency and throughput as JSON")
+    parser.add_argument("--listen", metavar="HOST:PORT",
+                        help="Play the games on workers connecting here (see distributed.py)")
+    parser.add_argument("--local-workers", type=int, default=0,
+                        help="With --listen, also start this many workers on this machine")
+    parser.add_argument("--decision-cache", type=int, default=0, metavar="SIZE",
+                        help="Reuse the moves of fixed-depth players in repeated positions, "
+                             "keeping up to SIZE decisions per worker (default: off)")
+    parser.add_argument("--decision-cache-file", metavar="PATH",
+                        help="Load the decision cache from and save it to this file")
+    parser.add_argument("--shared-table", type=int, default=0, metavar="ENTRIES",
+                        help="Let the Hard AIs of all workers share one transposition table "
+                             "of this many entries in shared memory (default: off)")
+    args = parser.parse_args()
+    try:
+        geometry = parse_geometry(args.board)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.shared_table and args.listen:
+        parser.error("--shared-table needs local workers; it cannot be used with --listen")
+
+    if args.levels:
+        args.players = [name for name, _, _, _ in DIFFICULTY_LEVELS] + args.players
+    if not args.players:
+        parser.error("give the players (or --levels)")
+    for spec in args.players:
+        try:
+            _, kwargs = parse_player(spec)
+        except ValueError as error:
+            parser.error(str(error))
+        # Worker processes are daemonic and cannot start a root-splitting pool
+        if kwargs.get("workers", 1) != 1 and (args.workers > 1 or args.listen):
+            parser.error(f"'{spec}' splits its search over worker processes, which cannot run "
+                         f"inside the tournament's own workers; use --workers 1 without --listen")
+
+    decision_cache = None
+    if args.decision_cache > 0:
+        decision_cache = DecisionCache(args.decision_cache)
+        if args.decision_cache_file:
+            try:
+                decision_cache.load(args.decision_cache_file)
+            except ValueError as error:
+                parser.error(str(error))
+
+    coordinator, local_workers = None, []
+    if args.listen:
+        from distributed import Coordinator, parse_address
+
+        host, port = parse_address(args.listen)
+        coordinator = Coordinator(host, port)
+        address = f"{coordinator.address[0]}:{coordinator.address[1]}"
+        print(f"Waiting for workers on {address} (python distributed.py --connect {address})")
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "distributed.py")
+        local_workers = [
+            subprocess.Popen([sys.executable, script, "--connect", address, "--processes", "1",
+                              "--decision-cache", str(args.decision_cache)],
+                             stdout=subprocess.DEVNULL)
+            for _ in range(args.local_workers)
+        ]
+        coordinator.watch(local_workers)
+
+    start_time = time.time()
+    print(f"Round-robin between {len(args.players)} players on a {geometry.name} board")
+    print(f"SPRT: H0 Elo={args.elo0:+g}, H1 Elo={args.elo1:+g}, "
+          f"alpha={args.alpha}, beta={args.beta}, cap={args.max_games} games")
+    print()
+
+    table = None
+    if args.shared_table:
+        table = SharedTranspositionTable(entries=args.shared_table, geometry=geometry)
+    timings = MoveTimings()
+    try:
+        matches = run_tournament(
+            args.players, args.max_games, args.batch_size, args.elo0, args.elo1,
+            args.alpha, args.beta, args.seed, args.opening_plies, args.workers,
+            args.record, geometry, timings, coordinator, decision_cache,
+            table.name if table is not None else None
+        )
+        table_stats = table.stats() if table is not None else None
+    except RuntimeError as error:
+        if coordinator is None:
+            raise
+        # Games failed on every attempt, or no worker is left to play them
+        sys.exit(f"Tournament failed: {error}")
+    finally:
+        if table is not None:
+            table.close()
+        if coordinator:
+            coordinator.close()
+        for worker in local_workers:
+            worker.wait()
+    elapsed = time.time() - start_time
+
+    ratings = compute_ratings(args.players, matches)
+    print()
+    print(f"{'Player':<30} {'Elo':>7}  95% CI")
+    for spec, (elo, margin) in sorted(ratings.items(), key=lambda item: -item[1][0]):
+        print(f"{spec:<30} {elo:>+7.0f}  ±{margin:.0f}")
+
+    print()
+    print_timings(timings, args.players, geometry)
+
+    played = sum(match.games for match in matches.values())
+    cap = args.max_games * len(matches)
+    print()
+    print(f"Games played: {played} of {cap} allowed ({100 * played / max(cap, 1):.1f}%)")
+    print(f"Throughput: {timings.games / elapsed:.2f} games/s, {timings.moves / elapsed:.1f} moves/s")
+    print(f"Total time: {elapsed:.2f}s")
+    if table_stats:
+        print(f"Shared table: {table_stats['hits']} hits in {table_stats['probes']} probes "
+              f"({100 * (table_stats['hit_rate'] or 0):.1f}%), "
+              f"{100 * (table_stats['shared_hit_rate'] or 0):.1f}% answered by another process; "
+              f"{table_stats['occupied']} of {table_stats['entries']} slots used")
+    if decision_cache is not None:
+        stats = decision_cache.stats()
+        hit_rate = 100 * (stats["hit_rate"] or 0)
+        print(f"Decision cache: {stats['hits']} hits in {stats['lookups']} lookups ({hit_rate:.1f}%), "
+              f"about {stats['time_saved']:.1f}s of search saved, {stats['entries']} decisions kept")
+        if args.decision_cache_file:
+            decision_cache.save(args.decision_cache_file)
+            print(f"Decision cache written to {args.decision_cache_file}")
+    if coordinator:
+        stats = coordinator.stats()
+        print(f"Workers: {stats['workers_seen']} connected, {stats['workers_lost']} lost; "
+              f"{stats['games_retried']} games retried, "
+              f"{stats['duplicate_results']} duplicate results ignored")
+
+    if args.stats:
+        data = timings.to_dict(elapsed)
+        if decision_cache is not None:
+            data["decision_cache"] = decision_cache.stats()
+        with open(args.stats, "w") as file:
+            json.dump(data, file, indent=2)
+        print(f"Move statistics written to {args.stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+"""
+Tune the evaluation weights on game results (Texel method).
+
+Every move of every finished game in the record files becomes a
+labelled position: the features the leaf evaluation scores for that
+move (tokens in a row it makes for its player and for the opponent, and
+the cell it was played in) and the final result for the player who made
+it (1 for a win, 0.5 for a draw, 0 for a loss). Winning moves are left
+out, since the search scores them as wins, not with the evaluation.
+
+The evaluation is linear in its weights, so once the features of all
+positions are in NumPy arrays, scoring the whole data set or taking a
+gradient step is a handful of vectorized operations. The fit minimizes
+the mean squared error between sigmoid(K * (evaluation - B)) and the
+result. Moves are scored from the mover's side and never negatively, so
+the offset B is needed to predict anything but wins; it is not saved,
+since adding a constant to every leaf does not change the move the
+search picks. K and B are fitted to the starting weights first and then
+kept fixed, so the tuned weights stay on the same scale as the win
+scores.
+
+Usage:
+    python tournament.py easy hard:depth=2 hard:depth=4 --max-games 5000 --record games.txt
+    python tune.py games.txt --workers 8 --output weights.json
+    python tournament.py hard:depth=4 hard:depth=4,weights=weights.json
+"""
+
+import argparse
+import time
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+from src.functions import check_win, evaluate_threats
+from src.geometry import parse_geometry
+from src.records import UNFINISHED, read_records, replay
+from src.search import drop_row
+from src.weights import EvaluationWeights, load_weights, save_weights
+
+
+# =============================================================================
+# Features
+# =============================================================================
+
+def extract_features(record):
+    """
+    Features and labels of every non-winning move of a game (worker entry point).
+
+    Returns:
+        Tuple of (threats, cells, labels) arrays: threats holds the
+        player's and the opponent's tokens in a row for each move, cells
+        the flat index of the cell played
+    """
+    geometry = record.geometry
+    threats, cells, labels = [], [], []
+
+    for board, player, column in replay(record.moves, geometry):
+        row = drop_row(board, column, geometry)
+        board[row][column] = player
+        if not check_win(board, column, player, geometry):
+            move = (row, column)
+            threats.append((
+                evaluate_threats(board, move, player, 1, geometry),
+                evaluate_threats(board, move, 3 - player, 1, geometry),
+            ))
+            cells.append(row * geometry.columns + column)
+            labels.append(1.0 if record.result == player else 0.5 if record.result == 0 else 0.0)
+        board[row][column] = 0
+
+    return (
+        np.array(threats, dtype=np.float64).reshape(-1, 2),
+        np.array(cells, dtype=np.intp),
+        np.array(labels, dtype=np.float64),
+    )
+
+
+def load_dataset(paths, geometry, workers):
+    """
+    Extract the features of every finished game on the board.
+
+    Returns:
+        Tuple of (threats, cells, labels) arrays and the number of games used
+    """
+    records = [
+        record for path in paths for record in read_records(path)
+        if record.result != UNFINISHED and record.geometry == geometry
+    ]
+    if workers > 1:
+        with Pool(workers) as pool:
+            parts = pool.map(extract_features, records, chunksize=64)
+    else:
+        parts = [extract_features(record) for record in records]
+    if not parts:
+        return np.empty((0, 2)), np.empty(0, dtype=np.intp), np.empty(0), 0
+
+    threats, cells, labels = (np.concatenate(arrays) for arrays in zip(*parts))
+    return threats, cells, labels, len(records)
+
+
+# =============================================================================
+# Fitting
+# =============================================================================
+
+def cell_classes(geometry):
+    """
+    Map each flat cell index to the weight shared with its mirror cell.
+
+    The transposition table treats a position and its mirror image as
+    the same, so the cell values must stay symmetric.
+    """
+    columns = geometry.columns
+    half = (columns + 1) // 2
+    return np.array([
+        row * half + min(col, columns - 1 - col)
+        for row in range(geometry.rows) for col in range(columns)
+    ], dtype=np.intp)
+
+
+def weights_to_vector(weights):
+    """Flatten weights to [player_weight, opponent_weight, cell class values...]."""
+    classes = cell_classes(weights.geometry)
+    cell_values = np.array(weights.cell_values, dtype=np.float64).ravel()
+    class_values = np.bincount(classes, weights=cell_values) / np.bincount(classes)
+    return np.concatenate(([weights.player_weight, weights.opponent_weight], class_values))
+
+
+def vector_to_weights(theta, geometry):
+    cell_values = np.round(theta[2:][cell_classes(geometry)], 2)
+    cell_values = cell_values.reshape(geometry.rows, geometry.columns).tolist()
+    return EvaluationWeights(round(theta[0], 3), round(theta[1], 3), cell_values, geometry)
+
+
+def evaluate(theta, threats, cells):
+    """Leaf evaluation of every position (cells given as cell classes)."""
+    return threats @ theta[:2] + theta[2:][cells]
+
+
+def sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -500, 500)))
+
+
+def loss(theta, scale, offset, data):
+    """Mean squared error between the predicted and actual results."""
+    threats, cells, labels = data
+    predicted = sigmoid(scale * (evaluate(theta, threats, cells) - offset))
+    return float(np.mean((predicted - labels) ** 2))
+
+
+def gradient(theta, scale, offset, data):
+    """Gradient of the loss with respect to every weight."""
+    threats, cells, labels = data
+    predicted = sigmoid(scale * (evaluate(theta, threats, cells) - offset))
+    error = 2 * (predicted - labels) * predicted * (1 - predicted) * scale / len(labels)
+    return np.concatenate((
+        threats.T @ error,
+        np.bincount(cells, weights=error, minlength=len(theta) - 2),
+    ))
+
+
+def fit_scale(theta, data, iterations=50):
+    """
+    Find the K and B that best map the current evaluation to results.
+
+    Fits sigmoid(a * z + c) to the results by Levenberg-Marquardt steps,
+    z being the standardized evaluation, then converts back.
+
+    Returns:
+        Tuple of (K, B)
+    """
+    threats, cells, labels = data
+    values = evaluate(theta, threats, cells)
+    mean, std = values.mean(), values.std() or 1.0
+    z = (values - mean) / std
+
+    def mse(a, c):
+        return np.mean((sigmoid(a * z + c) - labels) ** 2)
+
+    a, c, damping = 1.0, 0.0, 1e-3
+    for _ in range(iterations):
+        predicted = sigmoid(a * z + c)
+        slope = predicted * (1 - predicted)
+        jacobian = np.stack((slope * z, slope), axis=1)
+        residual = predicted - labels
+        normal = jacobian.T @ jacobian
+        step = np.linalg.solve(normal + damping * np.diag(np.diag(normal)), -jacobian.T @ residual)
+        if mse(a + step[0], c + step[1]) < mse(a, c):
+            a, c = a + step[0], c + step[1]
+            damping /= 3
+        else:
+            damping *= 3
+
+    scale = a / std
+    return scale, mean - c / scale
+
+
+def tune(theta, scale, offset, data, epochs=1000, learning_rate=1.0, report_every=100):
+    """
+    Minimize the loss with full-batch Adam steps.
+
+    Args:
+        theta: Starting weight vector
+        scale: Sigmoid scale K
+        offset: Evaluation offset B
+        data: Tuple of (threats, cells, labels) arrays
+        epochs: Gradient steps
+        learning_rate: Largest change of a weight per step
+        report_every: Epochs between progress lines
+
+    Returns:
+        The tuned weight vector
+    """
+    beta1, beta2, epsilon = 0.9, 0.999, 1e-12
+    theta = theta.copy()
+    m = np.zeros_like(theta)
+    v = np.zeros_like(theta)
+
+    for epoch in range(1, epochs + 1):
+        g = gradient(theta, scale, offset, data)
+        m = beta1 * m + (1 - beta1) * g
+        v = beta2 * v + (1 - beta2) * g * g
+        m_hat = m / (1 - beta1 ** epoch)
+        v_hat = v / (1 - beta2 ** epoch)
+        theta -= learning_rate * m_hat / (np.sqrt(v_hat) + epsilon)
+
+        if epoch % report_every == 0 or epoch == epochs:
+            print(f"  epoch {epoch:>5}  loss {loss(theta, scale, offset, data):.6f}")
+    return theta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune evaluation weights on game records")
+    parser.add_argument("records", nargs="+", help="Game record files")
+    parser.add_argument("--board", default="7x6", help="Board geometry to tune for")
+    parser.add_argument("--start", metavar="PATH", help="Weights file to start from (default: built-in)")
+    parser.add_argument("--epochs", type=int, default=1000, help="Gradient steps")
+    parser.add_argument("--learning-rate", type=float, default=1.0, help="Adam step size")
+    parser.add_argument("--workers", type=int, default=cpu_count(), help="Feature extraction processes")
+    parser.add_argument("--output", default="weights.json", help="Tuned weights file")
+    args = parser.parse_args()
+
+    try:
+        geometry = parse_geometry(args.board)
+    except ValueError as error:
+        parser.error(str(error))
+    start_weights = load_weights(args.start) if args.start else EvaluationWeights(geometry=geometry)
+    if start_weights.geometry != geometry:
+        parser.error(f"Starting weights are for the {start_weights.geometry.name} board")
+
+    start_time = time.time()
+    threats, cells, labels, games = load_dataset(args.records, geometry, args.workers)
+    if not len(labels):
+        parser.error(f"No finished {geometry.name} games in the records")
+    data = (threats, cell_classes(geometry)[cells], labels)
+    print(f"Loaded {len(labels)} positions from {games} games in {time.time() - start_time:.1f}s")
+
+    theta = weights_to_vector(start_weights)
+    scale, offset = fit_scale(theta, data)
+    if scale <= 0:
+        parser.error("The starting evaluation does not predict the results (K <= 0)")
+    start_loss = loss(theta, scale, offset, data)
+    print(f"Scale K = {scale:.3e}, offset B = {offset:.1f}, starting loss {start_loss:.6f}")
+
+    start_time = time.time()
+    theta = tune(theta, scale, offset, data, args.epochs, args.learning_rate)
+    elapsed = time.time() - start_time
+    print(f"Tuned in {elapsed:.1f}s ({args.epochs * len(labels) / elapsed:.0f} position evaluations/second)")
+    print(f"Loss {start_loss:.6f} -> {loss(theta, scale, offset, data):.6f}")
+
+    weights = vector_to_weights(theta, geometry)
+    if not threats[:, 1].any():
+        # No opponent tokens in a row were seen; its weight got no gradient
+        print("Opponent threats never occur in the data; opponent_weight is unchanged")
+    print(f"player_weight {weights.player_weight}, opponent_weight {weights.opponent_weight}")
+    print("Cell values:")
+    for row in weights.cell_values:
+        print("  " + " ".join(f"{value:>8.1f}" for value in row))
+
+    save_weights(args.output, weights)
+    print(f"Weights written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()